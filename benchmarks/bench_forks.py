@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Throughput vs. forks on a simulated fleet.
+
+Every host in the fleet is a local connection running a module that sleeps
+for a fixed latency, standing in for a remote round-trip. The run goes
+through the normal ``run_module`` path, so the numbers include per-host
+task and process overhead on the controller.
+
+Usage: python benchmarks/bench_forks.py [--hosts 64] [--latency 0.1]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import ftl_automation
+
+MODULE = """#!/usr/bin/env python3
+# WANT_JSON
+import json, sys, time
+args = json.load(open(sys.argv[1]))
+time.sleep(float(args["latency"]))
+print(json.dumps(dict(changed=False)))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hosts", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--forks", type=int, nargs="+", default=[1, 4, 16, 64])
+    args = parser.parse_args()
+
+    inventory = {
+        "all": {
+            "hosts": {
+                f"host{i:05d}": {"ansible_connection": "local"}
+                for i in range(args.hosts)
+            }
+        }
+    }
+
+    with tempfile.TemporaryDirectory() as module_dir:
+        with open(os.path.join(module_dir, "latency.py"), "w") as f:
+            f.write(MODULE)
+
+        print(f"{'forks':>6} {'seconds':>9} {'hosts/s':>9}")
+        for forks in args.forks:
+            start = time.perf_counter()
+            results = ftl_automation.run_module(
+                inventory,
+                [module_dir],
+                "latency",
+                {"latency": str(args.latency)},
+                forks=forks,
+            )
+            elapsed = time.perf_counter() - start
+            assert len(results) == args.hosts
+            print(f"{forks:>6} {elapsed:>9.2f} {args.hosts / elapsed:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Per-call overhead of instrumentation hooks.
+
+Calls a tool that does no work ``--calls`` times through attribute access,
+without hooks, with a MetricsCollector and with a TraceExporter
+registered, and prints the cost per call of each and the time taken to
+write the trace.
+
+Usage: python benchmarks/bench_hooks.py [--calls 100000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from ftl_automation import AutomationTool, MetricsCollector, automation
+from ftl_automation.tracing import TraceExporter
+
+
+class NoopTool(AutomationTool):
+    name = "noop"
+
+    def __call__(self, **kwargs):
+        return kwargs
+
+
+def per_call(ftl, calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        ftl.noop(i=i)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with automation(inventory={}, gate_cache_dir=False) as ftl:
+        ftl._tools_dict["noop"] = NoopTool(ftl)
+        print(f"no hooks          {per_call(ftl, args.calls):6.2f} us/call")
+        collector = ftl.hooks.register(MetricsCollector())
+        print(f"MetricsCollector  {per_call(ftl, args.calls):6.2f} us/call")
+        ftl.hooks.unregister(collector)
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = os.path.join(tempdir, "trace.jsonl")
+            tracer = ftl.hooks.register(TraceExporter(path))
+            print(f"TraceExporter     {per_call(ftl, args.calls):6.2f} us/call")
+            start = time.perf_counter()
+            tracer.finish()
+            size = os.path.getsize(path) / 1024 / 1024
+            print(f"write {len(tracer.spans) + 1} spans, {size:.1f} MB: "
+                  f"{time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Import time of ftl_automation entry points.
+
+Runs each import statement in a fresh interpreter with ``-X importtime``,
+subtracts the modules every interpreter loads at startup, and reports the
+total and the slowest imports it pulled in. Heavy dependencies
+(faster_than_light, asyncssh, rich, yaml) should only appear once a
+context is opened.
+
+Usage: python benchmarks/bench_import.py [--runs 5] [--top 10]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+STATEMENTS = [
+    "import ftl_automation",
+    "from ftl_automation import automation",
+    "import ftl_automation.cli",
+]
+
+
+def import_times(statement: str) -> dict:
+    """Return module -> (self us, cumulative us, depth) for one statement."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        times[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    baseline = set(import_times("pass"))
+    for statement in STATEMENTS:
+        totals = []
+        for _ in range(args.runs):
+            times = import_times(statement)
+            added = {name: t for name, t in times.items() if name not in baseline}
+            totals.append(sum(cum for _, cum, depth in added.values() if depth == 0))
+        print(f"{statement}: {statistics.median(totals) / 1000:.1f} ms median of {args.runs}")
+        slowest = sorted(added.items(), key=lambda item: item[1][0], reverse=True)
+        for name, (self_us, cumulative_us, _) in slowest[:args.top]:
+            print(f"  {self_us / 1000:7.1f} ms self {cumulative_us / 1000:7.1f} ms cumulative  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Inventory load time, cold and warm, on a synthetic inventory.
+
+Writes an inventory of ``--hosts`` hosts spread over a few groups with a
+handful of variables each, then times parsing it with PyYAML's pure-Python
+SafeLoader, with libyaml's CSafeLoader, a cold ``load_inventory`` (parse
+and write the compiled cache) and a warm one (read the compiled cache).
+
+Usage: python benchmarks/bench_inventory.py [--hosts 100000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import yaml
+
+from ftl_automation.inventory import cache_path, load_inventory_file
+
+GROUPS = ["web", "db", "cache", "queue", "batch"]
+
+
+def write_inventory(path: str, hosts: int):
+    inventory = {"all": {"children": {group: {"hosts": {}} for group in GROUPS}}}
+    for i in range(hosts):
+        group = GROUPS[i % len(GROUPS)]
+        inventory["all"]["children"][group]["hosts"][f"{group}{i:06d}.example.com"] = {
+            "ansible_host": f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}",
+            "ansible_user": "deploy",
+            "rack": f"r{i % 40:02d}",
+            "env": "prod" if i % 3 else "staging",
+        }
+    with open(path, "w") as f:
+        yaml.dump(inventory, f, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper))
+
+
+def timed(label: str, function):
+    start = time.perf_counter()
+    function()
+    print(f"{label:<28} {time.perf_counter() - start:8.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hosts", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = os.path.join(tempdir, "inventory.yml")
+        write_inventory(path, args.hosts)
+        size = os.path.getsize(path) / 1024 / 1024
+        print(f"{args.hosts} hosts, {size:.1f} MB of YAML")
+
+        def parse(loader):
+            with open(path, "rb") as f:
+                yaml.load(f.read(), Loader=loader)
+
+        timed("SafeLoader", lambda: parse(yaml.SafeLoader))
+        if hasattr(yaml, "CSafeLoader"):
+            timed("CSafeLoader", lambda: parse(yaml.CSafeLoader))
+        else:
+            print("CSafeLoader                  unavailable (PyYAML without libyaml)")
+
+        timed("load_inventory cold", lambda: load_inventory_file(path))
+        # Age the file so the cache is trusted without hashing it
+        old = time.time() - 60
+        os.utime(path, (old, old))
+        load_inventory_file(path)
+        timed("load_inventory warm", lambda: load_inventory_file(path))
+        size = os.path.getsize(cache_path(path)) / 1024 / 1024
+        print(f"compiled cache {size:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Dynamic inventory refresh and merge time.
+
+Writes ``--sources`` inventory scripts, each printing ``--hosts`` hosts
+as Ansible dynamic inventory JSON after ``--latency`` seconds (standing
+in for a slow cloud API), then times fetching them one at a time, all at
+once, from the TTL cache, and merging the results alone.
+
+Usage: python benchmarks/bench_inventory_sources.py [--sources 20] [--hosts 5000]
+"""
+
+import argparse
+import os
+import stat
+import sys
+import tempfile
+import time
+
+from ftl_automation.inventory_sources import DynamicInventory, merge_inventories
+
+SCRIPT = """#!{python}
+import json, time
+time.sleep({latency})
+hosts = [f"{prefix}{{i:05d}}" for i in range({hosts})]
+print(json.dumps({{
+    "{prefix}": hosts,
+    "prod": hosts[::2],
+    "_meta": {{"hostvars": {{
+        name: {{"ansible_host": f"10.{index}.{{i >> 8}}.{{i & 255}}", "rack": i % 40}}
+        for i, name in enumerate(hosts)
+    }}}},
+}}))
+"""
+
+
+def timed(label: str, function):
+    start = time.perf_counter()
+    result = function()
+    print(f"{label:<24} {time.perf_counter() - start:8.3f}s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sources", type=int, default=20)
+    parser.add_argument("--hosts", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        scripts = []
+        for index in range(args.sources):
+            path = os.path.join(tempdir, f"source{index:02d}.py")
+            with open(path, "w") as f:
+                f.write(SCRIPT.format(
+                    python=sys.executable, latency=args.latency, hosts=args.hosts,
+                    prefix=f"s{index:02d}-", index=index,
+                ))
+            os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+            scripts.append(path)
+        cache_dir = os.path.join(tempdir, "cache")
+        print(f"{args.sources} sources x {args.hosts} hosts, {args.latency}s latency each")
+
+        timed("serial fetch", lambda: DynamicInventory(scripts, ttl=0, max_workers=1).load())
+        sources = DynamicInventory(scripts, cache_dir=cache_dir)
+        inventory = timed("parallel fetch", sources.load)
+        timed("cached (within TTL)", sources.load)
+
+        results = [sources._read_cache(source)["inventory"] for source in sources.sources]
+        timed("merge only", lambda: merge_inventories(results))
+        hosts = {name for group in inventory.values() for name in group["hosts"]}
+        print(f"merged {len(hosts)} hosts in {len(inventory)} groups")
+
+
+if __name__ == "__main__":
+    main()
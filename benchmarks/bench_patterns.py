@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Host pattern resolution on a synthetic inventory.
+
+Builds an Inventory of ``--hosts`` hosts in role, environment and rack
+groups and times resolving a few patterns, first on a fresh index and
+then from the pattern cache, plus building the limited inventory dict.
+
+Usage: python benchmarks/bench_patterns.py [--hosts 100000]
+"""
+
+import argparse
+import time
+
+from ftl_automation.inventory import Inventory
+
+ROLES = ["web", "db", "cache", "queue", "batch"]
+
+PATTERNS = [
+    "web",
+    "web:&prod",
+    "web*:&prod:!canary",
+    "db0001*",
+    "~^cache00012",
+    "all:!staging",
+]
+
+
+def build_inventory(hosts: int) -> dict:
+    inventory = {name: {"hosts": {}} for name in ROLES + ["prod", "staging", "canary"]}
+    for i in range(hosts):
+        role = ROLES[i % len(ROLES)]
+        name = f"{role}{i:06d}"
+        host = {"ansible_host": f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"}
+        inventory[role]["hosts"][name] = host
+        inventory["prod" if i % 3 else "staging"]["hosts"][name] = host
+        if i % 100 == 0:
+            inventory["canary"]["hosts"][name] = host
+    return inventory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hosts", type=int, default=100_000)
+    args = parser.parse_args()
+
+    data = build_inventory(args.hosts)
+    start = time.perf_counter()
+    inventory = Inventory(data)
+    print(f"index {args.hosts} hosts: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    print(f"{'pattern':<22} {'hosts':>7} {'first':>10} {'cached':>10} {'subset':>10}")
+    for pattern in PATTERNS:
+        start = time.perf_counter()
+        hosts = inventory.resolve(pattern)
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        inventory.resolve(pattern)
+        cached = time.perf_counter() - start
+        start = time.perf_counter()
+        inventory.subset(hosts)
+        subset = time.perf_counter() - start
+        print(
+            f"{pattern:<22} {len(hosts):>7} {first * 1000:>8.3f}ms "
+            f"{cached * 1000:>8.4f}ms {subset * 1000:>8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
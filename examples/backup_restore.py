@@ -66,19 +66,23 @@ def main():
             "/opt/backups/scripts"
         ]
         
-        for directory in backup_dirs:
-            try:
-                result = ftl.file(
-                    path=directory,
-                    state="directory",
-                    owner="root",
-                    group="backup",
-                    mode="0750"
-                )
-                status = "✅ Created" if result.get("changed") else "ℹ️  Already exists"
-                print(f"{status}: {directory}")
-            except Exception as e:
-                print(f"⚠️  Failed to create {directory}: {e}")
+        # Create all directories concurrently; results come back in order
+        results = ftl.file.map(
+            dict(
+                path=directory,
+                state="directory",
+                owner="root",
+                group="backup",
+                mode="0750"
+            )
+            for directory in backup_dirs
+        )
+        for directory, result in zip(backup_dirs, results):
+            if isinstance(result, Exception):
+                print(f"⚠️  Failed to create {directory}: {result}")
+                continue
+            status = "✅ Created" if result.get("changed") else "ℹ️  Already exists"
+            print(f"{status}: {directory}")
         
         # Create backup user
         try:
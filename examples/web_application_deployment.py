@@ -50,7 +50,12 @@ def main():
             "systemd_service"
         ],
         tool_packages=["ftl_tools.tools"],
-        modules=("modules",)
+        modules=("modules",),
+        # Ride out package mirror and download hiccups
+        tool_options={
+            "dnf": {"retry": ftl_automation.RetryPolicy(retries=3, backoff=2.0)},
+            "get_url": {"retry": ftl_automation.RetryPolicy(retries=3, backoff=2.0)},
+        },
     ) as ftl:
         
         print("\n📦 Step 1: Install System Dependencies")
@@ -62,9 +67,15 @@ def main():
             "postgresql", "postgresql-server", "git", "certbot"
         ]
         
-        for package in packages:
+        # Consecutive dnf calls are merged into a single transaction
+        with ftl.coalesce():
+            results = {
+                package: ftl.dnf(name=package, state="present")
+                for package in packages
+            }
+
+        for package, result in results.items():
             try:
-                result = ftl.dnf(name=package, state="present")
                 status = "✅ Installed" if result.get("changed") else "ℹ️  Already installed"
                 print(f"{status}: {package}")
             except Exception as e:
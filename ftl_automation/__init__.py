@@ -2,34 +2,85 @@
 FTL Automation - Pure Python automation library built on Faster Than Light.
 
 Provides simple, function-based automation capabilities without AI dependencies.
+
+Public names are imported from their submodules on first access (PEP 562),
+so ``import ftl_automation`` stays cheap for short CLI invocations and
+faster_than_light, rich and yaml are only loaded when they are used.
 """
 
-from .core import automation, load_inventory, load_modules, run_module
-from .tools import load_tools_by_name
-from .context import AutomationContext
-from .tool_base import AutomationTool
-from .exceptions import CompletionException, ImpossibleException
-from .builtin_tools import (
-    UserInputTool, CompleteTool, ImpossibleTool, DebugTool,
-    get_builtin_tools, get_builtin_tool_classes
-)
+import importlib
+from typing import TYPE_CHECKING
 
 __version__ = "0.1.0"
 
-__all__ = [
-    "automation",
-    "load_inventory",
-    "load_modules",
-    "run_module",
-    "load_tools_by_name",
-    "AutomationContext",
-    "AutomationTool",
-    "CompletionException",
-    "ImpossibleException",
-    "UserInputTool",
-    "CompleteTool",
-    "ImpossibleTool",
-    "DebugTool",
-    "get_builtin_tools",
-    "get_builtin_tool_classes",
-]
+# Public name -> submodule that defines it
+_LAZY_ATTRIBUTES = {
+    "automation": "core",
+    "automation_async": "core",
+    "load_inventory": "core",
+    "load_modules": "core",
+    "run_module": "core",
+    "load_tools_by_name": "tools",
+    "AutomationContext": "context",
+    "Runtime": "runtime",
+    "shared_runtime": "runtime",
+    "AutomationTool": "tool_base",
+    "CompletionException": "exceptions",
+    "ImpossibleException": "exceptions",
+    "PlanError": "exceptions",
+    "SecretError": "exceptions",
+    "Plan": "plan",
+    "PlanNode": "plan",
+    "Hooks": "hooks",
+    "MetricsCollector": "hooks",
+    "TraceExporter": "tracing",
+    "RetryBudget": "retry",
+    "RetryPolicy": "retry",
+    "Secrets": "secret_providers",
+    "SecretProvider": "secret_providers",
+    "EnvProvider": "secret_providers",
+    "FileProvider": "secret_providers",
+    "CommandProvider": "secret_providers",
+    "UserInputTool": "builtin_tools",
+    "CompleteTool": "builtin_tools",
+    "ImpossibleTool": "builtin_tools",
+    "DebugTool": "builtin_tools",
+    "get_builtin_tools": "builtin_tools",
+    "get_builtin_tool_classes": "builtin_tools",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .core import automation, automation_async, load_inventory, load_modules, run_module
+    from .tools import load_tools_by_name
+    from .context import AutomationContext
+    from .runtime import Runtime, shared_runtime
+    from .tool_base import AutomationTool
+    from .exceptions import CompletionException, ImpossibleException, PlanError, SecretError
+    from .plan import Plan, PlanNode
+    from .hooks import Hooks, MetricsCollector
+    from .tracing import TraceExporter
+    from .retry import RetryBudget, RetryPolicy
+    from .secret_providers import (
+        Secrets, SecretProvider, EnvProvider, FileProvider, CommandProvider
+    )
+    from .builtin_tools import (
+        UserInputTool, CompleteTool, ImpossibleTool, DebugTool,
+        get_builtin_tools, get_builtin_tool_classes
+    )
@@ -5,9 +5,7 @@ These tools provide essential functionality like user input, completion signalin
 and other common automation tasks.
 """
 
-import yaml
 from typing import Dict, Any, Optional
-from rich.prompt import Prompt
 
 from .tool_base import AutomationTool
 from .exceptions import CompletionException, ImpossibleException
@@ -29,6 +27,8 @@ class UserInputTool(AutomationTool):
 
     def __call__(self, question: str, default: Optional[str] = None):
         """Prompt user for input during automation execution."""
+        from rich.prompt import Prompt
+
         return Prompt.ask(question, default=default)
 
 
@@ -45,7 +45,7 @@ class CompleteTool(AutomationTool):
     def __call__(self, message: str = "Task completed successfully"):
         """Signal that the automation task has completed successfully."""
         if self.context.console:
-            self.context.console.print(f"[green]✓ {message}[/green]")
+            self.context.print(f"[green]✓ {message}[/green]")
         else:
             print(f"✓ {message}")
         
@@ -65,7 +65,7 @@ class ImpossibleTool(AutomationTool):
     def __call__(self, reason: str = "Task cannot be completed"):
         """Signal that the automation task is impossible."""
         if self.context.console:
-            self.context.console.print(f"[red]✗ {reason}[/red]")
+            self.context.print(f"[red]✗ {reason}[/red]")
         else:
             print(f"✗ {reason}")
         
@@ -85,7 +85,7 @@ class DebugTool(AutomationTool):
     def __call__(self, message: str):
         """Print debug message during automation."""
         if self.context.console:
-            self.context.console.print(f"[dim]DEBUG: {message}[/dim]")
+            self.context.print(f"[dim]DEBUG: {message}[/dim]")
         else:
             print(f"DEBUG: {message}")
 
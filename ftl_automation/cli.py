@@ -2,13 +2,20 @@
 Simple CLI for FTL automation without AI dependencies.
 """
 
+import os
+import time
 import click
-from typing import List
+from typing import List, Optional
 from .core import automation, run_module
+from .gates import GateArtifactCache
+from .retry import RetryPolicy
 
 
-@click.command()
-@click.option("--inventory", "-i", default="inventory.yml", help="Inventory file path")
+@click.group(invoke_without_command=True)
+@click.option(
+    "--inventory", "-i", multiple=True, default=["inventory.yml"],
+    help="Inventory file, directory, script or SQLite database (repeatable)",
+)
 @click.option(
     "--modules", "-m", multiple=True, default=["modules"], help="Module directories"
 )
@@ -18,8 +25,15 @@ from .core import automation, run_module
 @click.option("--module-name", "-n", help="Module name to execute")
 @click.option("--module-args", "-a", help="Module arguments as key=value pairs")
 @click.option("--extra-vars", "-e", multiple=True, help="Extra variables as key=value")
+@click.option("--limit", "-l", help="Host pattern to run on, e.g. 'web*:&prod:!canary'")
+@click.option("--forks", type=click.IntRange(min=1), help="Maximum number of hosts contacted at once")
+@click.option("--timeout", type=click.FloatRange(min=0, min_open=True), help="Seconds each host may run a module before it is cancelled")
+@click.option("--retries", type=click.IntRange(min=0), default=0, help="Retries for hosts that fail with connection errors")
+@click.option("--trace", type=click.Path(dir_okay=False), help="Append an OTLP JSON trace of the run to this file")
+@click.pass_context
 def main(
-    inventory: str,
+    ctx: click.Context,
+    inventory: List[str],
     modules: List[str],
     tools: List[str],
     tool_packages: List[str],
@@ -27,9 +41,17 @@ def main(
     module_name: str,
     module_args: str,
     extra_vars: List[str],
+    limit: Optional[str],
+    forks: Optional[int],
+    timeout: Optional[float],
+    retries: int,
+    trace: Optional[str],
 ):
     """Simple FTL automation CLI."""
 
+    if ctx.invoked_subcommand is not None:
+        return
+
     # Parse extra vars
     parsed_extra_vars = {}
     for var in extra_vars:
@@ -46,12 +68,17 @@ def main(
                 parsed_module_args[key] = value
 
     with automation(
-        inventory=inventory,
+        inventory=inventory[0] if len(inventory) == 1 else list(inventory),
         modules=list(modules),
         tools=list(tools),
         tool_packages=list(tool_packages) if tool_packages else None,
         tools_files=list(tools_files),
         extra_vars=parsed_extra_vars,
+        limit=limit,
+        forks=forks,
+        timeout=timeout,
+        retry=RetryPolicy(retries=retries) if retries else None,
+        trace=trace,
     ) as ftl:
 
         if module_name:
@@ -65,5 +92,51 @@ def main(
             ftl.print(f"Inventory loaded: {len(ftl.inventory)} groups")
 
 
+def parse_size(value: str) -> int:
+    """Parse a size like 512M or 2G into bytes."""
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    value = value.strip().upper().rstrip("B")
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+@main.group()
+@click.option("--dir", "cache_dir", help="Gate cache directory")
+@click.pass_context
+def cache(ctx: click.Context, cache_dir: Optional[str]):
+    """Inspect and prune the gate artifact cache."""
+    ctx.obj = GateArtifactCache(cache_dir)
+
+
+@cache.command("list")
+@click.pass_obj
+def cache_list(gate_cache: GateArtifactCache):
+    """List cached gate archives, least recently used first."""
+    entries = gate_cache.entries()
+    for path, size, last_used in entries:
+        used = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(last_used))
+        click.echo(f"{used}  {size:>12,}  {os.path.basename(path)}")
+    total = sum(size for _, size, _ in entries)
+    click.echo(f"{len(entries)} archives, {total:,} bytes in {gate_cache.path}")
+
+
+@cache.command("prune")
+@click.option("--max-size", default="512M", help="Size to prune the cache down to, e.g. 200M")
+@click.pass_obj
+def cache_prune(gate_cache: GateArtifactCache, max_size: str):
+    """Remove least recently used archives until the cache fits."""
+    removed = gate_cache.evict(parse_size(max_size))
+    click.echo(f"Removed {len(removed)} archives")
+
+
+@cache.command("clear")
+@click.pass_obj
+def cache_clear(gate_cache: GateArtifactCache):
+    """Remove every cached archive."""
+    removed = gate_cache.clear()
+    click.echo(f"Removed {len(removed)} archives")
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,322 @@
+"""
+Coalescing of consecutive package-manager tool calls.
+
+Inside ``with ftl.coalesce():`` consecutive calls such as
+``ftl.dnf(name="nginx", state="present")`` are buffered and flushed as a
+single ``ftl.dnf(name=["nginx", ...], state="present")`` call, so one
+module round-trip and one package transaction installs every package.
+Each buffered call returns a PackageResult that resolves to the result for
+its own package when it is first read. ``async with ftl.coalesce():`` does
+the same for automation_async() contexts, where results are awaited.
+"""
+
+import asyncio
+import contextvars
+import re
+import threading
+from collections.abc import Mapping
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Tools that can be coalesced, mapped to their package-name parameter
+COALESCIBLE_TOOLS = {
+    "dnf": "name",
+    "apt": "name",
+    "pip": "name",
+}
+
+_active_coalescer: contextvars.ContextVar = contextvars.ContextVar(
+    "ftl_automation_coalescer", default=None
+)
+
+_PENDING = object()
+
+# Architecture suffixes that may follow a package name, as in nginx.x86_64
+_ARCHES = "x86_64|i686|aarch64|armv7hl|ppc64le|s390x|noarch"
+
+
+def package_pattern(package: str) -> "re.Pattern":
+    """Return a regex matching a package name as a whole word.
+
+    The name must not be part of a longer name, so ``git`` matches
+    ``git-2.43.0`` and ``git.x86_64`` but not ``git-lfs`` or ``libgit2``.
+    Version constraints such as ``requests>=2`` are ignored.
+    """
+    name = re.split(r"[<>=!~\s]", str(package), maxsplit=1)[0]
+    return re.compile(
+        r"(?<![\w.+-])" + re.escape(name)
+        + rf"(?=$|[^\w.+-]|[-.]\d|\.(?:{_ARCHES})\b)"
+    )
+
+
+def split_package_result(result: Any, package: str) -> Any:
+    """Narrow a combined package-manager result down to one package.
+
+    Works on a single module result or on a host-to-result mapping. Entries
+    of a ``results`` list that do not name the package (see
+    package_pattern()) are dropped and ``changed`` reflects whether any
+    entry for the package remains.
+    """
+    if not isinstance(result, dict):
+        return result
+    if isinstance(result.get("results"), list):
+        pattern = package_pattern(package)
+        entries = [entry for entry in result["results"] if pattern.search(str(entry))]
+        narrowed = dict(result, results=entries)
+        if "changed" in result:
+            narrowed["changed"] = bool(result["changed"] and entries)
+        return narrowed
+    if result and all(isinstance(value, dict) for value in result.values()):
+        return {host: split_package_result(value, package) for host, value in result.items()}
+    return result
+
+
+class PackageResult(Mapping):
+    """
+    Result of a coalesced tool call.
+
+    Behaves like the tool result mapping; reading it flushes the pending
+    batch if needed, and re-raises the batch's exception if it failed.
+    Errors are raised when the result is read, or when the coalesce()
+    block exits for results nobody read. If another thread is
+    already running the batch, reading waits for it. On an event loop a
+    pending result must be awaited instead, which runs the batch on the
+    context's executor.
+    """
+
+    def __init__(self, coalescer: "Coalescer", package: Any):
+        self._coalescer = coalescer
+        self._package = package
+        self._value = _PENDING
+        self._error: Optional[BaseException] = None
+        self._error_seen = False
+        self._done = threading.Event()
+
+    def _set(self, value: Any = None, error: Optional[BaseException] = None):
+        self._value = value
+        self._error = error
+        if error is not None:
+            self._coalescer._failed.append(self)
+        self._done.set()
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def result(self) -> Any:
+        """Return the result for this package, flushing the batch if needed."""
+        if not self.done():
+            if _running_loop():
+                raise RuntimeError(
+                    "reading a pending PackageResult would block the event loop; "
+                    "await it instead"
+                )
+            self._coalescer.flush()
+            self._done.wait()
+        if self._error is not None:
+            self._error_seen = True
+            raise self._error
+        return self._value
+
+    async def _result_async(self) -> Any:
+        if not self.done():
+            run = self._coalescer.run_async
+            if run is None:
+                await asyncio.get_running_loop().run_in_executor(None, self._wait)
+            else:
+                await run(self._wait)
+        return self.result()
+
+    def _wait(self):
+        self._coalescer.flush()
+        self._done.wait()
+
+    def __await__(self):
+        return self._result_async().__await__()
+
+    def __getitem__(self, key):
+        return self.result()[key]
+
+    def __iter__(self):
+        return iter(self.result())
+
+    def __len__(self):
+        return len(self.result())
+
+    def __repr__(self):
+        if not self.done():
+            return f"<PackageResult {self._package!r} pending>"
+        return repr(self._error or self._value)
+
+
+class _Batch:
+    """Buffered calls taken out of a Coalescer, run as one tool call."""
+
+    __slots__ = ("tool", "name_arg", "common", "pending")
+
+    def __init__(self, tool: Callable, name_arg: str, common: Dict[str, Any],
+                 pending: List[Tuple[Any, PackageResult]]):
+        self.tool = tool
+        self.name_arg = name_arg
+        self.common = common
+        self.pending = pending
+
+    def run(self):
+        names = []
+        for package, _ in self.pending:
+            names.extend(package if isinstance(package, (list, tuple)) else [package])
+        try:
+            combined = self.tool(**self.common, **{self.name_arg: names})
+        except BaseException as e:
+            # Readers must not wait forever, also after KeyboardInterrupt
+            for _, result in self.pending:
+                result._set(error=e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        for package, result in self.pending:
+            if isinstance(package, (list, tuple)):
+                result._set(combined)
+            else:
+                result._set(split_package_result(combined, package))
+
+
+class Coalescer:
+    """
+    Buffers consecutive compatible package-manager calls.
+
+    The buffer is shared by the threads the block's tool calls run on,
+    e.g. a module run from a submit() worker flushes it, so it is guarded
+    by a lock. Batches are taken out under the lock and run outside it.
+    """
+
+    def __init__(
+        self,
+        tools: Optional[Dict[str, str]] = None,
+        run_async: Optional[Callable[..., Awaitable]] = None,
+    ):
+        self.tools = dict(COALESCIBLE_TOOLS if tools is None else tools)
+        # Runs a blocking call off the event loop, e.g. call_tool_async
+        self.run_async = run_async
+        self._tool_name: Optional[str] = None
+        self._tool: Optional[Callable] = None
+        self._common: Dict[str, Any] = {}
+        self._pending: List[Tuple[Any, PackageResult]] = []
+        self._failed: List[PackageResult] = []
+        self._lock = threading.Lock()
+
+    def _take(self) -> Optional[_Batch]:
+        """Remove and return the pending batch; the lock must be held."""
+        if not self._pending:
+            return None
+        batch = _Batch(self._tool, self.tools[self._tool_name], self._common, self._pending)
+        self._pending = []
+        return batch
+
+    def add(
+        self, tool_name: str, tool: Callable, kwargs: Dict[str, Any]
+    ) -> Tuple[Optional[_Batch], Optional[PackageResult]]:
+        """
+        Buffer a tool call without running anything.
+
+        Returns:
+            The batch the call displaced, which must be run before it, and
+            the call's PackageResult, or None if the call has no package
+            to merge and must be run on its own
+        """
+        name_arg = self.tools[tool_name]
+        kwargs = dict(kwargs)
+        with self._lock:
+            if name_arg not in kwargs:
+                # Nothing to merge, e.g. dnf(update_cache=True)
+                return self._take(), None
+
+            package = kwargs.pop(name_arg)
+            displaced = None
+            if self._pending and (tool_name != self._tool_name or kwargs != self._common):
+                displaced = self._take()
+            self._tool_name = tool_name
+            self._tool = tool
+            self._common = kwargs
+
+            result = PackageResult(self, package)
+            self._pending.append((package, result))
+            return displaced, result
+
+    def call(self, tool_name: str, tool: Callable, kwargs: Dict[str, Any]) -> Any:
+        """Buffer a tool call, flushing first if it cannot join the batch."""
+        displaced, result = self.add(tool_name, tool, kwargs)
+        if displaced is not None:
+            displaced.run()
+        if result is None:
+            return tool(**kwargs)
+        return result
+
+    def flush(self):
+        """Run the buffered calls as one invocation."""
+        with self._lock:
+            batch = self._take()
+        if batch is not None:
+            batch.run()
+
+    def raise_unread(self):
+        """Raise the error of a failed batch whose results nobody read.
+
+        Called when the coalesce() block exits, so fire-and-forget calls
+        such as ``ftl.dnf(name="nginx")`` do not fail silently.
+        """
+        unread = [result for result in self._failed if not result._error_seen]
+        for result in unread:
+            result._error_seen = True
+        if unread:
+            raise unread[0]._error
+
+
+class CoalescingTool:
+    """Tool wrapper that routes calls through the active Coalescer."""
+
+    def __init__(self, coalescer: Coalescer, name: str, tool: Callable):
+        self._coalescer = coalescer
+        self._name = name
+        self._tool = tool
+
+    def __call__(self, **kwargs):
+        return self._coalescer.call(self._name, self._tool, kwargs)
+
+    def __getattr__(self, name: str):
+        return getattr(self._tool, name)
+
+
+class AsyncCoalescingTool:
+    """
+    Awaitable tool wrapper that routes calls through the active Coalescer.
+
+    Calls are buffered on the event loop; batches they displace and calls
+    that cannot be merged run on the context's executor.
+    """
+
+    def __init__(self, coalescer: Coalescer, name: str, tool: Callable, context):
+        from .tool_base import AsyncTool
+
+        self._coalescer = coalescer
+        self._name = name
+        self._tool = tool
+        self._context = context
+        self._async_tool = AsyncTool(tool, context)
+
+    async def __call__(self, **kwargs):
+        displaced, result = self._coalescer.add(self._name, self._tool, kwargs)
+        if displaced is not None:
+            await self._context.call_tool_async(displaced.run)
+        if result is None:
+            return await self._context.call_tool_async(self._tool, **kwargs)
+        return result
+
+    def __getattr__(self, name: str):
+        return getattr(self._async_tool, name)
+
+
+def _running_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
@@ -0,0 +1,61 @@
+"""
+Concurrency limits for module execution.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager, AsyncExitStack
+from typing import Dict, Iterable, Optional
+
+
+class ForkLimiter:
+    """
+    Limits how many hosts are contacted at once.
+
+    A global ``forks`` limit applies to every host; ``group_forks`` sets a
+    tighter limit for the hosts of specific inventory groups. One limiter is
+    shared by all module executions of a context, so concurrent tool calls
+    draw from the same budget.
+    """
+
+    def __init__(
+        self,
+        forks: Optional[int] = None,
+        group_forks: Optional[Dict[str, int]] = None,
+    ):
+        for name, value in [("forks", forks), *(group_forks or {}).items()]:
+            if value is not None and value < 1:
+                raise ValueError(f"forks for '{name}' must be at least 1, got {value}")
+        self.forks = forks
+        self.group_forks = dict(group_forks or {})
+        self._semaphore = None
+        self._group_semaphores = {}
+
+    def __bool__(self):
+        return self.forks is not None or bool(self.group_forks)
+
+    def _global(self) -> Optional[asyncio.Semaphore]:
+        if self.forks is None:
+            return None
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.forks)
+        return self._semaphore
+
+    def _group(self, group: str) -> asyncio.Semaphore:
+        semaphore = self._group_semaphores.get(group)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.group_forks[group])
+            self._group_semaphores[group] = semaphore
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(self, groups: Iterable[str] = ()):
+        """Hold a fork slot for one host in ``groups`` while the block runs."""
+        async with AsyncExitStack() as stack:
+            # Acquire group slots in a fixed order so hosts in several
+            # limited groups cannot deadlock each other.
+            for group in sorted(set(groups) & self.group_forks.keys()):
+                await stack.enter_async_context(self._group(group))
+            semaphore = self._global()
+            if semaphore is not None:
+                await stack.enter_async_context(semaphore)
+            yield
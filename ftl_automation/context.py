@@ -2,8 +2,42 @@
 Automation context and state management.
 """
 
-from typing import Dict, Any, Optional, List
-from rich.console import Console
+import asyncio
+import contextvars
+import functools
+import concurrent.futures
+from collections.abc import Mapping
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, Iterable, Union, Callable
+
+from .concurrency import ForkLimiter
+from .exceptions import CompletionException
+from .coalesce import AsyncCoalescingTool, Coalescer, CoalescingTool, _active_coalescer
+from .hooks import Hooks, InstrumentedTool, current_call
+from .tool_base import AutomationTool
+from .inventory import HostVars, Inventory, inventory_signature
+from .retry import RetryBudget, RetryPolicy
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+# Options applied to module executions made by tool calls in this context,
+# see AutomationContext.options()
+_call_options: contextvars.ContextVar = contextvars.ContextVar(
+    "ftl_automation_call_options", default={}
+)
+
+# True while a tool body runs on a context's executor. Tool calls nested in
+# it run inline on that worker: waiting for other workers could deadlock
+# once every worker is waiting.
+_in_tool_call: contextvars.ContextVar = contextvars.ContextVar(
+    "ftl_automation_in_tool_call", default=False
+)
+
+
+def _run_tool_call(tool, *args, **kwargs):
+    _in_tool_call.set(True)
+    return tool(*args, **kwargs)
 
 
 class ToolsProxy:
@@ -15,7 +49,7 @@ class ToolsProxy:
 
     def __getattr__(self, name):
         if name in self._tools:
-            return self.tools[name]
+            return self._context._resolve_tool(name)
         raise AttributeError(f"Tool '{name}' not found")
 
     def __contains__(self, name):
@@ -42,10 +76,19 @@ class AutomationContext:
         tools: Dict[str, Any],
         localhost: Any,
         extra_vars: Optional[Dict[str, Any]] = None,
-        console: Optional[Console] = None,
-        secrets: Optional[Dict[str, str]] = None,
+        console: Optional["Console"] = None,
+        secrets: Optional[Mapping] = None,
         inventory_file: Optional[str] = None,
         tool_packages: Optional[List[str]] = None,
+        forks: Optional[int] = None,
+        group_forks: Optional[Dict[str, int]] = None,
+        timeout: Optional[float] = None,
+        retry: Optional[RetryPolicy] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        tool_options: Optional[Dict[str, Dict[str, Any]]] = None,
+        limit: Optional[str] = None,
+        hooks: Optional[Iterable[Any]] = None,
+        trace: Optional[str] = None,
         **kwargs,
     ):
         self.inventory = inventory
@@ -54,49 +97,670 @@ class AutomationContext:
         self.tools = ToolsProxy(tools, self)  # Enable ftl.tools.tool_name syntax
         self.localhost = localhost
         self.extra_vars = extra_vars or {}
-        self.console = console or Console()
-        self.secrets = secrets or {}
+        if console is None:
+            from rich.console import Console
+
+            console = Console()
+        self.console = console
+        self.secrets = secrets if secrets is not None else {}
         self.inventory_file = inventory_file
         self.tool_packages = tool_packages or ["ftl_tools.tools"]
         self.gate_cache = {}
         self.use_gate = kwargs.get("use_gate", False)
+        self.gate_artifacts = None
+        self.loop = None
+        self.executor = None
+        self.runtime = None
+        self.limiter = ForkLimiter(forks, group_forks)
+        self.timeout = timeout
+        self.retry = retry
+        self.retry_budget = retry_budget or RetryBudget()
+        self.tool_options = tool_options or {}
+        self.limit = limit
+        self._inventory_index = None
+        self._inventory_signature = None
+        self._inventory_writer = None
+        self._redactor = None
+        self.hooks = Hooks()
+        for hook in hooks or ():
+            self.hooks.register(hook)
+        self.tracer = None
+        if trace:
+            from .tracing import TraceExporter
+
+            self.tracer = self.hooks.register(TraceExporter(trace, redact=self.redact))
+        self._redactor_values = frozenset()
 
         # Store additional context variables
         for key, value in kwargs.items():
             setattr(self, key, value)
 
     def get_tool(self, name: str):
-        """Get a tool by name."""
-        return self._tools_dict.get(name)
+        """Get a tool by name, with its ``tool_options`` and hooks applied."""
+        _flush_coalesced()
+        if name not in self._tools_dict:
+            return None
+        return self._configured_tool(name)
+
+    def _configured_tool(self, name: str):
+        """Return the tool with its ``tool_options`` bound, if it has any,
+        and reporting to ``hooks`` when hooks are registered."""
+        tool = self._tools_dict[name]
+        options = self.tool_options.get(name)
+        if options and hasattr(tool, "options"):
+            tool = tool.options(**options)
+        if self.hooks and isinstance(tool, AutomationTool):
+            tool = InstrumentedTool(tool, self.hooks)
+        return tool
+
+    def _resolve_tool(self, name: str):
+        """Return the callable used for attribute access to a tool."""
+        tool = self._configured_tool(name)
+        coalescer = _active_coalescer.get()
+        if coalescer is not None:
+            if name in coalescer.tools:
+                return CoalescingTool(coalescer, name, tool)
+            coalescer.flush()
+        return tool
 
     def __getattr__(self, name: str):
-        """Allow direct tool calls like ftl.bash(...)"""
+        """Allow direct tool calls like ftl.bash(...)
+
+        Tools named in ``automation(tools=...)`` are imported on first access.
+        """
         if name in self._tools_dict:
-            return self._tools_dict[name]
+            return self._resolve_tool(name)
         raise AttributeError(
             f"'{self.__class__.__name__}' object has no attribute '{name}'"
         )
 
     def run_module(self, module_name: str, **module_args):
-        """Execute an FTL module."""
+        """Execute an FTL module.
+
+        When the context has a background event loop the module runs there,
+        so gates in ``gate_cache`` are reused across calls.
+        """
         from .core import run_module
 
-        return run_module(
-            self.inventory,
+        _flush_coalesced()
+
+        if self.loop is None:
+            with self._track_module(module_name, module_args):
+                return run_module(
+                    self._target_inventory(),
+                    self.modules,
+                    module_name,
+                    module_args,
+                    gate_cache=self.gate_cache,
+                    use_gate=self.use_gate,
+                    forks=self.limiter.forks,
+                    group_forks=self.limiter.group_forks,
+                    timeout=self._call_option("timeout"),
+                    retry=self._call_option("retry"),
+                    retry_budget=self.retry_budget,
+                    hooks=self.hooks or None,
+                )
+
+        if _running_loop() is self.loop:
+            raise RuntimeError(
+                f"run_module('{module_name}') would block the event loop; "
+                "use 'await ftl.run_module_async(...)' instead"
+            )
+
+        return asyncio.run_coroutine_threadsafe(
+            self.run_module_async(module_name, **module_args), self.loop
+        ).result()
+
+    async def run_module_async(self, module_name: str, **module_args):
+        """Execute an FTL module on the context's event loop."""
+        from .core import run_module_async
+
+        with self._track_module(module_name, module_args):
+            return await self.run_on_loop(
+                run_module_async(
+                    self._target_inventory(),
+                    self.modules,
+                    module_name,
+                    module_args,
+                    gate_cache=self.gate_cache,
+                    use_gate=self.use_gate,
+                    limiter=self.limiter,
+                    timeout=self._call_option("timeout"),
+                    retry=self._call_option("retry"),
+                    retry_budget=self.retry_budget,
+                    hooks=self.hooks or None,
+                )
+            )
+
+    def _track_module(self, module_name: str, module_args: Dict[str, Any]):
+        """Report a module run made outside any tool call to ``hooks``."""
+        if not self.hooks or current_call() is not None:
+            return nullcontext()
+        return self.hooks.track(module_name, module_name, module_args)
+
+    @contextmanager
+    def options(self, **options):
+        """Apply call options to tool calls made inside the block.
+
+        Options:
+            hosts: Host names to run on instead of the whole inventory
+            limit: Host pattern restricting the hosts to run on, applied
+                on top of the context's ``limit``, e.g. "web*:&prod:!canary"
+            timeout: Seconds each host may spend on a module before it is
+                cancelled and reported as timed out (None disables the
+                context's default)
+            retry: RetryPolicy for hosts that fail transiently (None
+                disables the context's default)
+        """
+        token = _call_options.set({**_call_options.get(), **options})
+        try:
+            yield
+        finally:
+            _call_options.reset(token)
+
+    @property
+    def inventory_index(self) -> Inventory:
+        """Indexed view of ``inventory``, rebuilt when its hosts change."""
+        signature = (id(self.inventory), inventory_signature(self.inventory))
+        if self._inventory_index is None or signature != self._inventory_signature:
+            self._inventory_index = Inventory(self.inventory)
+            self._inventory_signature = signature
+        return self._inventory_index
+
+    @property
+    def hostvars(self) -> HostVars:
+        """Flattened variables of each host with ``extra_vars`` on top.
+
+        For example ``ftl.hostvars["backup-server"]["backup_root"]``.
+        """
+        return HostVars(self.inventory_index, self.extra_vars)
+
+    @property
+    def inventory_writer(self):
+        """InventoryWriter for ``inventory_file``, or None without a file."""
+        if self._inventory_writer is None and self.inventory_file:
+            from .inventory_writer import InventoryWriter
+
+            self._inventory_writer = InventoryWriter(self.inventory_file)
+        return self._inventory_writer
+
+    def _edited(self):
+        """Mark in-place edits of the index as seen so it is not rebuilt."""
+        self._inventory_signature = (id(self.inventory), inventory_signature(self.inventory))
+
+    def add_host(
+        self,
+        host_name: str,
+        host_vars: Optional[Dict[str, Any]] = None,
+        groups: Iterable[str] = ("all",),
+    ) -> Dict[str, Any]:
+        """Add a host to the inventory, e.g. after provisioning it.
+
+        When the inventory was loaded from a file the change is written
+        back to it, batched with other changes (see inventory_writer).
+
+        Args:
+            host_name: Host to add
+            host_vars: Variables such as ansible_host for the host
+            groups: Groups to add the host to
+
+        Returns:
+            The host's dict
+        """
+        host = self.inventory_index.add_host(host_name, host_vars, groups)
+        self._edited()
+        if self.inventory_writer is not None:
+            self.inventory_writer.add_host(host_name, host_vars, groups)
+        return host
+
+    def remove_host(self, host_name: str):
+        """Remove a host from the inventory."""
+        self.inventory_index.remove_host(host_name)
+        self._edited()
+        if self.inventory_writer is not None:
+            self.inventory_writer.remove_host(host_name)
+
+    def update_host(self, host_name: str, **host_vars: Any):
+        """Set variables on a host in the inventory."""
+        self.inventory_index.update_host(host_name, **host_vars)
+        if self.inventory_writer is not None:
+            self.inventory_writer.update_host(host_name, **host_vars)
+
+    def update_group(self, group_name: str, **group_vars: Any):
+        """Set variables on a group in the inventory."""
+        self.inventory_index.update_group(group_name, **group_vars)
+        self._edited()
+        if self.inventory_writer is not None:
+            self.inventory_writer.update_group(group_name, **group_vars)
+
+    def select(self, pattern: str) -> List[str]:
+        """Return the host names a pattern selects, in inventory order."""
+        index = self.inventory_index
+        return sorted(index.resolve(pattern), key=index.order.__getitem__)
+
+    def _target_inventory(self) -> Dict[str, Any]:
+        """Return the inventory selected by ``limit`` and the call options."""
+        options = _call_options.get()
+        limit = options.get("limit")
+        hosts = options.get("hosts")
+        if self.limit is None and limit is None and hosts is None:
+            return self.inventory
+
+        index = self.inventory_index
+        if limit is None and hosts is None:
+            return index.limit(self.limit)
+        selected = None
+        for pattern in (self.limit, limit):
+            if pattern is not None:
+                resolved = index.resolve(pattern)
+                selected = resolved if selected is None else selected & resolved
+        if hosts is not None:
+            selected = set(hosts) if selected is None else selected & set(hosts)
+        return index.subset(selected)
+
+    def _call_option(self, name: str) -> Any:
+        """Return a call option, falling back to the context's default."""
+        return _call_options.get().get(name, getattr(self, name))
+
+    @contextmanager
+    def coalesce(self, tools: Optional[Dict[str, str]] = None):
+        """Merge consecutive package-manager calls inside the block.
+
+        Consecutive calls to the same tool (``dnf``, ``apt`` and ``pip`` by
+        default) whose arguments only differ in the package name are run as
+        one call with a list of packages. Each call returns a PackageResult
+        that resolves to that package's result when read, raising the
+        batch's error if it failed. Pending calls are flushed when another
+        tool is used and when the block exits, also when it exits with an
+        exception. A failed batch whose results were never read raises its
+        error when the block exits.
+
+        Args:
+            tools: Tool names to coalesce, mapped to their package parameter
+        """
+        _flush_coalesced()
+        coalescer = Coalescer(tools)
+        token = _active_coalescer.set(coalescer)
+        failed = False
+        try:
+            yield coalescer
+        except CompletionException:
+            raise  # Finishing the automation early is not a failure
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            _active_coalescer.reset(token)
+            coalescer.flush()
+            if not failed:
+                coalescer.raise_unread()
+
+    def plan(self):
+        """Create a Plan that runs tool calls as a dependency graph."""
+        from .plan import Plan
+
+        return Plan(self)
+
+    async def call_tool_async(self, tool, *args, **kwargs):
+        """Run a tool call without blocking the event loop.
+
+        The tool body runs on the context's executor; module executions it
+        makes are scheduled back onto ``self.loop``, so many tool calls can
+        be in flight at once.
+        """
+        call = functools.partial(
+            contextvars.copy_context().run, _run_tool_call, tool, *args, **kwargs
+        )
+        return await asyncio.get_running_loop().run_in_executor(self.executor, call)
+
+    async def map_calls_async(
+        self,
+        tool: Callable,
+        calls: Iterable,
+        max_concurrency: Optional[int] = None,
+        return_exceptions: bool = True,
+    ) -> List[Any]:
+        """Run many calls of one tool concurrently.
+
+        Args:
+            tool: Tool instance
+            calls: (args, kwargs) pairs, one per call
+            max_concurrency: Maximum number of calls in flight
+            return_exceptions: Put a failed call's exception in its result
+                slot instead of raising it
+
+        Returns:
+            Results in the order of ``calls``
+        """
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+        async def call(args, kwargs):
+            if semaphore is None:
+                return await self.call_tool_async(tool, *args, **kwargs)
+            async with semaphore:
+                return await self.call_tool_async(tool, *args, **kwargs)
+
+        return await asyncio.gather(
+            *(call(args, kwargs) for args, kwargs in calls),
+            return_exceptions=return_exceptions,
+        )
+
+    def map_calls(
+        self,
+        tool: Callable,
+        calls: Iterable,
+        max_concurrency: Optional[int] = None,
+        return_exceptions: bool = True,
+    ) -> List[Any]:
+        """Run many calls of one tool concurrently on the context's event loop.
+
+        See map_calls_async(). Without an event loop, and when called from
+        a tool body running on the executor, the calls run one after
+        another on the calling thread.
+        """
+        if self.loop is None or _in_tool_call.get():
+            results = []
+            for args, kwargs in calls:
+                try:
+                    results.append(tool(*args, **kwargs))
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    results.append(e)
+            return results
+
+        return asyncio.run_coroutine_threadsafe(
+            self.map_calls_async(tool, list(calls), max_concurrency, return_exceptions),
+            self.loop,
+        ).result()
+
+    def submit(self, tool: Union[str, Callable], **kwargs) -> concurrent.futures.Future:
+        """Schedule a tool call on the context's event loop.
+
+        Called from a tool body running on the executor, the call runs
+        right away on the calling thread and the returned future is done.
+
+        Args:
+            tool: Tool name or tool instance
+            **kwargs: Tool parameters
+
+        Returns:
+            Future resolving to the tool result
+        """
+        tool = self._lookup_tool(tool)
+        if self.loop is None:
+            raise RuntimeError("submit() requires a context with an event loop")
+        if _in_tool_call.get():
+            future = concurrent.futures.Future()
+            try:
+                future.set_result(tool(**kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        return asyncio.run_coroutine_threadsafe(
+            self.call_tool_async(tool, **kwargs), self.loop
+        )
+
+    def _lookup_tool(self, tool: Union[str, Callable]) -> Callable:
+        """Return the tool instance for a tool name or instance."""
+        if not isinstance(tool, str):
+            return tool
+        _flush_coalesced()
+        if tool not in self._tools_dict:
+            raise AttributeError(f"Tool '{tool}' not found")
+        return self._configured_tool(tool)
+
+    async def stream_async(self, tool: Union[str, Callable], **kwargs):
+        """Call a tool once per host, yielding (host, result) as each finishes.
+
+        Each host gets its own tool call restricted to that host, so early
+        finishers can be acted on while slow hosts are still running. The
+        tool bodies run on the context's executor, so at most ``workers``
+        hosts (32 by default) run at once whatever ``forks`` allows; raise
+        ``workers`` for large inventories, or use stream_module_async(),
+        which runs every host on the event loop within ``forks``.
+
+        Args:
+            tool: Tool name or tool instance
+            **kwargs: Tool parameters
+        """
+        from .core import host_groups
+
+        tool = self._lookup_tool(tool)
+
+        async def call(host_name):
+            with self.options(hosts=[host_name]):
+                result = await self.call_tool_async(tool, **kwargs)
+            if isinstance(result, Mapping) and host_name in result:
+                result = result[host_name]
+            return host_name, result
+
+        pending = {
+            asyncio.ensure_future(call(host_name))
+            for host_name in host_groups(self._target_inventory())
+        }
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stream(self, tool: Union[str, Callable], **kwargs):
+        """Synchronous generator version of stream_async().
+
+        Called from a tool body running on the executor, the hosts are
+        called one after another on the calling thread.
+        """
+        if _in_tool_call.get():
+            return self._stream_inline(self._lookup_tool(tool), **kwargs)
+        return self._iterate_on_loop(self.stream_async(tool, **kwargs))
+
+    def _stream_inline(self, tool: Callable, **kwargs):
+        from .core import host_groups
+
+        for host_name in host_groups(self._target_inventory()):
+            with self.options(hosts=[host_name]):
+                result = tool(**kwargs)
+            if isinstance(result, Mapping) and host_name in result:
+                result = result[host_name]
+            yield host_name, result
+
+    async def stream_module_async(self, module_name: str, **module_args):
+        """Execute an FTL module, yielding (host, result) as each host finishes."""
+        from .core import stream_module_async
+
+        _flush_coalesced()
+        stream = stream_module_async(
+            self._target_inventory(),
             self.modules,
             module_name,
             module_args,
             gate_cache=self.gate_cache,
             use_gate=self.use_gate,
+            limiter=self.limiter,
+            timeout=self._call_option("timeout"),
+            retry=self._call_option("retry"),
+            retry_budget=self.retry_budget,
+            hooks=self.hooks or None,
         )
+        try:
+            while True:
+                try:
+                    item = await self.run_on_loop(stream.__anext__())
+                except StopAsyncIteration:
+                    return
+                yield item
+        finally:
+            await self.run_on_loop(stream.aclose())
+
+    def stream_module(self, module_name: str, **module_args):
+        """Synchronous generator version of stream_module_async()."""
+        return self._iterate_on_loop(self.stream_module_async(module_name, **module_args))
+
+    def _iterate_on_loop(self, stream):
+        """Iterate an async generator on the context's loop from this thread."""
+        if self.loop is None:
+            raise RuntimeError("streaming requires a context with an event loop")
+        if _running_loop() is self.loop:
+            raise RuntimeError("use 'async for' with the *_async stream variants instead")
+        try:
+            while True:
+                try:
+                    item = asyncio.run_coroutine_threadsafe(stream.__anext__(), self.loop).result()
+                except StopAsyncIteration:
+                    return
+                yield item
+        finally:
+            asyncio.run_coroutine_threadsafe(stream.aclose(), self.loop).result()
+
+    def wait(
+        self,
+        futures: Iterable[concurrent.futures.Future],
+        timeout: Optional[float] = None,
+        return_when: str = concurrent.futures.ALL_COMPLETED,
+    ):
+        """Wait for submitted tool calls, see ``concurrent.futures.wait``."""
+        return concurrent.futures.wait(futures, timeout=timeout, return_when=return_when)
+
+    def as_completed(
+        self,
+        futures: Iterable[concurrent.futures.Future],
+        timeout: Optional[float] = None,
+    ):
+        """Iterate submitted tool calls as they finish, see ``concurrent.futures.as_completed``."""
+        return concurrent.futures.as_completed(futures, timeout=timeout)
+
+    @property
+    def redactor(self):
+        """Redactor for the secret values known so far.
+
+        Secrets are resolved lazily, so only values that have been looked
+        up are masked; the redactor is rebuilt when new ones appear.
+        """
+        from .redaction import Redactor
+
+        known = getattr(self.secrets, "known_values", None)
+        values = frozenset(str(v) for v in (known() if known else self.secrets.values()) if v)
+        if self._redactor is None or values != self._redactor_values:
+            self._redactor = Redactor(values)
+            self._redactor_values = values
+        return self._redactor
+
+    def redact(self, data: Any) -> Any:
+        """Return text or result data with known secret values masked."""
+        return self.redactor.redact_data(data)
 
     def print(self, *args, **kwargs):
-        """Print to the console."""
+        """Print to the console, masking known secret values."""
+        redactor = self.redactor
+        if redactor:
+            args = [redactor.redact_data(arg) for arg in args]
         self.console.print(*args, **kwargs)
 
     def cleanup(self):
-        """Cleanup resources."""
-        # Close any open gates
-        if hasattr(self, "gate_cache"):
-            # Add cleanup logic for gates if needed
-            pass
+        """Cleanup resources.
+
+        Writes back pending inventory changes and releases the context's
+        runtime; when no other context shares it, every open gate is closed
+        concurrently within a deadline and the event loop is stopped. The
+        trace, if one is recorded, is written last.
+        """
+        try:
+            if self._inventory_writer is not None:
+                self._inventory_writer.close()
+        finally:
+            runtime, self.runtime = self.runtime, None
+            try:
+                if runtime is not None:
+                    runtime.release()
+            finally:
+                if self.tracer is not None:
+                    self.tracer.finish()
+
+    async def cleanup_async(self):
+        """Cleanup resources from a coroutine, see cleanup()."""
+        try:
+            if self._inventory_writer is not None:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, self._inventory_writer.close)
+        finally:
+            runtime, self.runtime = self.runtime, None
+            try:
+                if runtime is not None:
+                    await runtime.release_async()
+            finally:
+                if self.tracer is not None:
+                    self.tracer.finish()
+
+    async def run_on_loop(self, coro):
+        """Await a coroutine on the context's event loop from any loop."""
+        if _running_loop() is self.loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+
+class AsyncAutomationContext(AutomationContext):
+    """
+    Automation context for use with ``automation_async``.
+
+    Tool attribute access returns awaitable tool wrappers, so
+    ``await ftl.dnf(...)`` runs without blocking the event loop.
+    """
+
+    def _resolve_tool(self, name: str):
+        """Allow direct awaitable tool calls like await ftl.bash(...)"""
+        from .tool_base import AsyncTool
+
+        tool = self._configured_tool(name)
+        coalescer = _active_coalescer.get()
+        if coalescer is not None and name in coalescer.tools:
+            return AsyncCoalescingTool(coalescer, name, tool, self)
+        # Other tools flush pending package calls when they run a module
+        return AsyncTool(tool, self)
+
+    @asynccontextmanager
+    async def coalesce(self, tools: Optional[Dict[str, str]] = None):
+        """Merge consecutive package-manager calls inside the ``async with`` block.
+
+        Works like AutomationContext.coalesce(), but ``await ftl.dnf(...)``
+        returns the PackageResult without running anything, and a pending
+        result is read with ``await result``. Batches run on the context's
+        executor, so the event loop is never blocked.
+
+        Args:
+            tools: Tool names to coalesce, mapped to their package parameter
+        """
+        await self.call_tool_async(_flush_coalesced)
+        coalescer = Coalescer(tools, run_async=self.call_tool_async)
+        token = _active_coalescer.set(coalescer)
+        failed = False
+        try:
+            yield coalescer
+        except CompletionException:
+            raise  # Finishing the automation early is not a failure
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            _active_coalescer.reset(token)
+            await self.call_tool_async(coalescer.flush)
+            if not failed:
+                coalescer.raise_unread()
+
+
+def _flush_coalesced():
+    """Flush package calls buffered by an active coalesce() block."""
+    coalescer = _active_coalescer.get()
+    if coalescer is not None:
+        coalescer.flush()
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """Return the event loop running in this thread, if any."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
@@ -3,21 +3,33 @@ Core automation functions and context management.
 """
 
 import os
+import signal
+import time
 import asyncio
-from threading import Thread
-from typing import Dict, Any, List, Optional
-from contextlib import contextmanager
-import faster_than_light as ftl
+from functools import partial
+from typing import Dict, Any, List, Optional, Union
+from contextlib import contextmanager, asynccontextmanager
 from .exceptions import CompletionException
+from .concurrency import ForkLimiter
+from .inventory import Inventory, load_inventory_file
+from .hooks import Hooks, HostResult, current_call
+from .gates import (
+    DEFAULT_IDLE_TIMEOUT, GateArtifactCache, kill_gate_later, prewarm_gates, tool_modules,
+)
+from .retry import RetryBudget, RetryPolicy
+from .runtime import DEFAULT_WORKERS, Runtime
+from .secret_providers import SecretProvider, Secrets
 
 
-def load_inventory(inventory_path: str) -> Dict[str, Any]:
+def load_inventory(inventory_path: str, cache: bool = True) -> Dict[str, Any]:
     """Load FTL inventory from file.
 
-    If the inventory file doesn't exist, create an empty one.
+    If the inventory file doesn't exist, create an empty one. The parsed
+    inventory is cached next to the file, see inventory.load_inventory_file().
 
     Args:
         inventory_path: Path to inventory file
+        cache: Use the compiled inventory cache
 
     Returns:
         Loaded inventory dictionary
@@ -30,7 +42,7 @@ def load_inventory(inventory_path: str) -> Dict[str, Any]:
         with open(inventory_path, 'w') as f:
             f.write('{}\n')
     
-    return ftl.load_inventory(inventory_path)
+    return load_inventory_file(inventory_path, cache=cache)
 
 
 def load_modules(module_paths: List[str]) -> List[str]:
@@ -51,114 +63,453 @@ def load_modules(module_paths: List[str]) -> List[str]:
     return existing_paths
 
 
-@contextmanager
-def automation(
-    inventory: str,
-    modules: Optional[List[str]] = None,
-    tools: Optional[List[str]] = None,
-    tool_packages: Optional[List[str]] = None,
-    extra_vars: Optional[Dict[str, Any]] = None,
-    secrets: Optional[List[str]] = None,
-    user_input: Optional[str] = None,
+def _build_context(
+    context_class,
+    inventory,
+    modules: Optional[List[str]],
+    tools: Optional[List[str]],
+    tool_packages: Optional[List[str]],
+    extra_vars: Optional[Dict[str, Any]],
+    secrets: Optional[List[str]],
+    user_input: Optional[str],
+    runtime: Runtime,
+    gate_cache_dir: Union[str, bool, None] = None,
+    secret_providers: Optional[List[SecretProvider]] = None,
+    secret_ttl: Optional[float] = None,
     **kwargs
 ):
-    """
-    Automation context manager that provides a configured environment.
-
-    Args:
-        inventory: Path to inventory file or inventory dict
-        modules: List of module paths
-        tools: List of tool names to load
-        tool_packages: List of package names to search for tools (defaults to ["ftl_tools.tools"])
-        extra_vars: Additional variables
-        secrets: List of secret names to load from environment
-        user_input: Path to user input file
-        **kwargs: Additional context variables
+    """Create a context with inventory, modules, secrets and tools loaded.
 
-    Yields:
-        AutomationContext object with loaded resources
+    Shared by the synchronous and asynchronous entry points. The context
+    runs on ``runtime``, which the caller has already acquired.
     """
-    from .context import AutomationContext
-    from .tools import load_tools_by_name
+    import faster_than_light as ftl
+    from .tools import ToolRegistry
     from .builtin_tools import get_builtin_tools
-    import os
 
     print(f"{inventory=}")
 
     # Load inventory
-    if isinstance(inventory, str):
-        inventory_file_path = inventory
-        inv = load_inventory(inventory)
+    inventory_file_path = None
+    if isinstance(inventory, (str, list, tuple)):
+        from .inventory_sources import DynamicInventory, FileSource, inventory_source
+
+        specs = [inventory] if isinstance(inventory, str) else inventory
+        sources = [inventory_source(spec) for spec in specs]
+        if len(sources) == 1 and isinstance(sources[0], FileSource):
+            inventory_file_path = specs[0]
+            inv = load_inventory(specs[0])
+        else:
+            inv = DynamicInventory(sources).load()
+    elif hasattr(inventory, "load") and not isinstance(inventory, dict):
+        # DynamicInventory configured by the caller
+        inv = inventory.load()
     else:
-        inventory_file_path = None
         inv = inventory
 
     # Load modules
     mods = load_modules(modules or ["modules"])
 
-    # Load secrets from environment
-    secrets_dict = {}
-    if secrets:
-        for secret_name in secrets:
-            secrets_dict[secret_name] = os.environ.get(secret_name)
+    # Secrets are looked up on first use
+    if isinstance(secrets, Secrets):
+        secrets_dict = secrets
+    else:
+        secrets_dict = Secrets(secrets or [], secret_providers, secret_ttl)
 
     # Set default tool packages if none provided
     if tool_packages is None:
         tool_packages = ["ftl_tools.tools"]
 
-    # Set up asyncio event loop for FTL gate cache
-    gate_cache = {}
-    loop = asyncio.new_event_loop()
-    thread = Thread(target=loop.run_forever, daemon=True)
-    thread.start()
-
     # Create context first (without tools)
-    context = AutomationContext(
+    context = context_class(
         inventory=inv,
         modules=mods,
-        tools={},  # Start empty, will add tools after context creation
+        tools=ToolRegistry(),  # Start empty, will add tools after context creation
         localhost=ftl.localhost,
         extra_vars=extra_vars or {},
         secrets=secrets_dict,
         user_input=user_input,
         inventory_file=inventory_file_path,
         tool_packages=tool_packages,
-        gate_cache=gate_cache,
-        loop=loop,
+        gate_cache=runtime.gate_pool,
+        loop=runtime.loop,
+        executor=runtime.executor,
+        runtime=runtime,
         **kwargs
     )
 
-    # Load tools
-    tool_instances = {}
-    
     # Add builtin tools (instantiate classes with context)
     builtin_tool_classes = get_builtin_tools()
     for name, tool_class in builtin_tool_classes.items():
-        tool_instances[name] = tool_class(context)
+        context._tools_dict[name] = tool_class(context)
 
-    # Load additional tools
+    # Additional tools are imported on first use
     if tools:
-        tool_instances.update(load_tools_by_name(tools, context, tool_packages))
-    
-    # Update context with all loaded tools
-    context._tools_dict.update(tool_instances)
+        context._tools_dict.register_by_name(tools, context, tool_packages)
+
+    # Reuse gate archives across runs unless a gate builder was given
+    if not context.use_gate and gate_cache_dir is not False:
+        context.gate_artifacts = GateArtifactCache(gate_cache_dir or None)
+        context.use_gate = context.gate_artifacts.builder(
+            partial(tool_modules, context), context.modules, tool_packages=tool_packages
+        )
+
+    return context
+
+
+@contextmanager
+def automation(
+    inventory: str,
+    modules: Optional[List[str]] = None,
+    tools: Optional[List[str]] = None,
+    tool_packages: Optional[List[str]] = None,
+    extra_vars: Optional[Dict[str, Any]] = None,
+    secrets: Union[List[str], Secrets, None] = None,
+    secret_providers: Optional[List[SecretProvider]] = None,
+    secret_ttl: Optional[float] = None,
+    user_input: Optional[str] = None,
+    workers: int = DEFAULT_WORKERS,
+    forks: Optional[int] = None,
+    group_forks: Optional[Dict[str, int]] = None,
+    timeout: Optional[float] = None,
+    retry: Optional[RetryPolicy] = None,
+    retry_budget: Optional[RetryBudget] = None,
+    tool_options: Optional[Dict[str, Dict[str, Any]]] = None,
+    limit: Optional[str] = None,
+    hooks: Optional[List[Any]] = None,
+    trace: Optional[str] = None,
+    coalesce: bool = False,
+    prewarm: bool = False,
+    gate_cache_dir: Union[str, bool, None] = None,
+    gate_idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT,
+    max_connections_per_host: Optional[int] = None,
+    runtime: Optional[Runtime] = None,
+    **kwargs
+):
+    """
+    Automation context manager that provides a configured environment.
+
+    Args:
+        inventory: Path to inventory file or inventory dict. A directory of
+            YAML fragments, an executable inventory script, a SQLite
+            database, a list of such paths or a DynamicInventory is loaded
+            through inventory_sources
+        modules: List of module paths
+        tools: List of tool names to load
+        tool_packages: List of package names to search for tools (defaults to ["ftl_tools.tools"])
+        extra_vars: Additional variables
+        secrets: Names of the secrets the run uses, looked up on first
+            access (or a Secrets mapping)
+        secret_providers: Where secrets are looked up, in order (defaults
+            to environment variables), see secret_providers
+        secret_ttl: Seconds a secret value is cached (for the whole run
+            by default)
+        user_input: Path to user input file
+        workers: Number of threads available for concurrent tool calls,
+            which also caps how many hosts ftl.stream() runs at once
+        forks: Maximum number of hosts contacted at once (unlimited by default)
+        group_forks: Per-group overrides of ``forks``, e.g. {"db": 2}
+        timeout: Default seconds a host may spend on one module call before
+            it is cancelled and reported as timed out (no limit by default)
+        retry: Default RetryPolicy for hosts that fail transiently (no
+            retries by default)
+        retry_budget: Run-wide limit on retries (defaults to RetryBudget())
+        tool_options: Call options applied to every call of a tool, e.g.
+            {"dnf": {"retry": RetryPolicy(retries=5), "timeout": 1800}}
+        limit: Host pattern restricting every call to matching hosts, e.g.
+            "web*:&prod:!canary" (see inventory.Inventory)
+        hooks: Hook objects to register, e.g. [MetricsCollector()] (see
+            hooks)
+        trace: File to append an OTLP JSON trace of the run to (see
+            tracing)
+        coalesce: Merge consecutive dnf/apt/pip calls for the whole run,
+            see AutomationContext.coalesce()
+        prewarm: Build gates and connect to all remote hosts before yielding
+        gate_cache_dir: Directory of the on-disk gate archive cache
+            (defaults to ~/.cache/ftl-automation/gates, False disables it)
+        gate_idle_timeout: Seconds before an unused gate is closed (None keeps
+            gates open until the context exits)
+        max_connections_per_host: Maximum concurrent connections to one host
+        runtime: Runtime to share with other contexts. By default the context
+            gets its own, built from workers, gate_idle_timeout and
+            max_connections_per_host
+        **kwargs: Additional context variables
+
+    Yields:
+        AutomationContext object with loaded resources
+    """
+    from .context import AutomationContext
+
+    if runtime is None:
+        runtime = Runtime(workers, gate_idle_timeout, max_connections_per_host)
+    runtime.acquire()
+
+    try:
+        context = _build_context(
+            AutomationContext,
+            inventory,
+            modules,
+            tools,
+            tool_packages,
+            extra_vars,
+            secrets,
+            user_input,
+            runtime,
+            gate_cache_dir=gate_cache_dir,
+            secret_providers=secret_providers,
+            secret_ttl=secret_ttl,
+            forks=forks,
+            group_forks=group_forks,
+            timeout=timeout,
+            retry=retry,
+            retry_budget=retry_budget,
+            tool_options=tool_options,
+            limit=limit,
+            hooks=hooks,
+            trace=trace,
+            **kwargs
+        )
+    except BaseException:
+        runtime.release()
+        raise
 
     try:
+        if prewarm:
+            asyncio.run_coroutine_threadsafe(prewarm_gates(context), context.loop).result()
+        if coalesce:
+            with context.coalesce():
+                yield context
+        else:
+            yield context
+    except CompletionException:
+        # This is expected - the automation completed successfully
+        pass
+    finally:
+        # Releases the runtime, closing its gates and loop if this was the
+        # last context using it
+        context.cleanup()
+
+
+@asynccontextmanager
+async def automation_async(
+    inventory: str,
+    modules: Optional[List[str]] = None,
+    tools: Optional[List[str]] = None,
+    tool_packages: Optional[List[str]] = None,
+    extra_vars: Optional[Dict[str, Any]] = None,
+    secrets: Union[List[str], Secrets, None] = None,
+    secret_providers: Optional[List[SecretProvider]] = None,
+    secret_ttl: Optional[float] = None,
+    user_input: Optional[str] = None,
+    workers: int = DEFAULT_WORKERS,
+    forks: Optional[int] = None,
+    group_forks: Optional[Dict[str, int]] = None,
+    timeout: Optional[float] = None,
+    retry: Optional[RetryPolicy] = None,
+    retry_budget: Optional[RetryBudget] = None,
+    tool_options: Optional[Dict[str, Dict[str, Any]]] = None,
+    limit: Optional[str] = None,
+    hooks: Optional[List[Any]] = None,
+    trace: Optional[str] = None,
+    prewarm: bool = False,
+    gate_cache_dir: Union[str, bool, None] = None,
+    gate_idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT,
+    max_connections_per_host: Optional[int] = None,
+    runtime: Optional[Runtime] = None,
+    **kwargs
+):
+    """
+    Asynchronous automation context manager.
+
+    Tools run on the caller's event loop (or the loop of a shared
+    ``runtime``), so every tool call is awaitable and independent calls can
+    be overlapped with ``asyncio.gather``::
+
+        async with automation_async(inventory="inventory.yml", tools=["dnf"]) as ftl:
+            await asyncio.gather(*(ftl.dnf(name=p, state="present") for p in packages))
+
+    Args:
+        inventory: Path to inventory file or inventory dict. A directory of
+            YAML fragments, an executable inventory script, a SQLite
+            database, a list of such paths or a DynamicInventory is loaded
+            through inventory_sources
+        modules: List of module paths
+        tools: List of tool names to load
+        tool_packages: List of package names to search for tools (defaults to ["ftl_tools.tools"])
+        extra_vars: Additional variables
+        secrets: Names of the secrets the run uses, looked up on first
+            access (or a Secrets mapping)
+        secret_providers: Where secrets are looked up, in order (defaults
+            to environment variables), see secret_providers
+        secret_ttl: Seconds a secret value is cached (for the whole run
+            by default)
+        user_input: Path to user input file
+        workers: Number of threads available for concurrent tool calls,
+            which also caps how many hosts ftl.stream() runs at once
+        forks: Maximum number of hosts contacted at once (unlimited by default)
+        group_forks: Per-group overrides of ``forks``, e.g. {"db": 2}
+        timeout: Default seconds a host may spend on one module call before
+            it is cancelled and reported as timed out (no limit by default)
+        retry: Default RetryPolicy for hosts that fail transiently (no
+            retries by default)
+        retry_budget: Run-wide limit on retries (defaults to RetryBudget())
+        tool_options: Call options applied to every call of a tool, e.g.
+            {"dnf": {"retry": RetryPolicy(retries=5), "timeout": 1800}}
+        limit: Host pattern restricting every call to matching hosts, e.g.
+            "web*:&prod:!canary" (see inventory.Inventory)
+        hooks: Hook objects to register, e.g. [MetricsCollector()] (see
+            hooks)
+        trace: File to append an OTLP JSON trace of the run to (see
+            tracing)
+        prewarm: Build gates and connect to all remote hosts before yielding
+        gate_cache_dir: Directory of the on-disk gate archive cache
+            (defaults to ~/.cache/ftl-automation/gates, False disables it)
+        gate_idle_timeout: Seconds before an unused gate is closed (None keeps
+            gates open until the context exits)
+        max_connections_per_host: Maximum concurrent connections to one host
+        runtime: Runtime to share with other contexts. By default the context
+            gets its own, built from workers, gate_idle_timeout and
+            max_connections_per_host
+        **kwargs: Additional context variables
+
+    Yields:
+        AsyncAutomationContext object with loaded resources
+    """
+    from .context import AsyncAutomationContext
+
+    if runtime is None:
+        runtime = Runtime(
+            workers, gate_idle_timeout, max_connections_per_host,
+            loop=asyncio.get_running_loop(),
+        )
+    runtime.acquire()
+
+    try:
+        context = _build_context(
+            AsyncAutomationContext,
+            inventory,
+            modules,
+            tools,
+            tool_packages,
+            extra_vars,
+            secrets,
+            user_input,
+            runtime,
+            gate_cache_dir=gate_cache_dir,
+            secret_providers=secret_providers,
+            secret_ttl=secret_ttl,
+            forks=forks,
+            group_forks=group_forks,
+            timeout=timeout,
+            retry=retry,
+            retry_budget=retry_budget,
+            tool_options=tool_options,
+            limit=limit,
+            hooks=hooks,
+            trace=trace,
+            **kwargs
+        )
+    except BaseException:
+        await runtime.release_async()
+        raise
+
+    try:
+        if prewarm:
+            await context.run_on_loop(prewarm_gates(context))
         yield context
     except CompletionException:
         # This is expected - the automation completed successfully
         pass
     finally:
-        # Cleanup event loop
+        await context.cleanup_async()
+
+
+def host_groups(inventory: Dict[str, Any]) -> Dict[str, Any]:
+    """Map each host in an inventory to its variables and group names.
+
+    Args:
+        inventory: FTL inventory
+
+    Returns:
+        Dictionary of host name to (host variables, list of group names)
+    """
+    hosts = {}
+    for group_name, group in inventory.items():
+        for host_name, host in ((group or {}).get("hosts") or {}).items():
+            if host_name in hosts:
+                hosts[host_name][1].append(group_name)
+            else:
+                hosts[host_name] = (host or {}, [group_name])
+    return hosts
+
+
+@asynccontextmanager
+async def _no_slot():
+    yield
+
+
+def host_gates(gate_cache: Optional[Dict], host_name: str, host: Dict[str, Any]) -> Optional[Dict]:
+    """Return the gate cache to give FTL for one host.
+
+    A GatePool is shared between contexts whose inventories may reuse a
+    host alias for different machines, so FTL gets a view keyed by the
+    host's connection target instead of the pool itself.
+    """
+    for_host = getattr(gate_cache, "for_host", None)
+    return gate_cache if for_host is None else for_host(host_name, host)
+
+
+def timed_out(module_name: str, timeout: float) -> Dict[str, Any]:
+    """Return the result reported for a host that hit its timeout."""
+    return {
+        "failed": True,
+        "timed_out": True,
+        "msg": f"{module_name} timed out after {timeout}s",
+    }
+
+
+def discard_gate(gate_cache: Optional[Dict], host_name: str):
+    """Drop a host's gate that was interrupted mid-module.
+
+    FTL puts the gate back into the cache even when the module call is
+    cancelled, but its pipe still carries the unfinished request, so the
+    gate and the module it is running are killed (see gates.kill_gate())
+    and the gate is not reused.
+    """
+    if gate_cache is None:
+        return
+    discard = getattr(gate_cache, "discard", None)
+    if discard is not None:
+        discard(host_name)
+        return
+    gate = gate_cache.pop(host_name, None)
+    if gate is not None:
+        kill_gate_later(gate)
+
+
+async def check_output(cmd: str, stdin=None) -> bytes:
+    """Run a local module command, killing it if the call is cancelled.
+
+    Replaces FTL's local.check_output(), which leaves the module running
+    when a host times out. The command gets its own process group so the
+    shell and the module it starts are killed together.
+    """
+    proc = await asyncio.create_subprocess_shell(
+        cmd,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        start_new_session=True,
+    )
+    try:
+        stdout, _ = await proc.communicate(stdin)
+    except BaseException:
         try:
-            loop.call_soon_threadsafe(loop.stop)
-            thread.join(timeout=1.0)  # Give thread time to stop gracefully
-        except:
-            pass  # Ignore cleanup errors
-        
-        # Cleanup if needed
-        if hasattr(context, "cleanup"):
-            context.cleanup()
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass  # Already exited
+        raise
+    return stdout
 
 
 def run_module(
@@ -168,6 +519,14 @@ def run_module(
     module_args: Dict[str, Any],
     gate_cache: Optional[Dict] = None,
     use_gate: bool = False,
+    forks: Optional[int] = None,
+    group_forks: Optional[Dict[str, int]] = None,
+    loop: Optional[asyncio.AbstractEventLoop] = None,
+    timeout: Optional[float] = None,
+    retry: Optional[RetryPolicy] = None,
+    retry_budget: Optional[RetryBudget] = None,
+    limit: Optional[str] = None,
+    hooks: Optional[Hooks] = None,
     **kwargs
 ) -> Any:
     """
@@ -180,17 +539,224 @@ def run_module(
         module_args: Arguments for the module
         gate_cache: Optional gate cache for connection reuse
         use_gate: Whether to use FTL gates
+        forks: Maximum number of hosts contacted at once
+        group_forks: Per-group overrides of ``forks``
+        loop: Event loop running in another thread to execute on. Without
+            one a temporary loop is used and gates are not cached.
+        timeout: Seconds each host may run the module for; hosts that take
+            longer are cancelled and reported with timed_out()
+        retry: Policy for retrying hosts that fail transiently
+        retry_budget: Run-wide limit on the retries ``retry`` may make
+        limit: Host pattern restricting the hosts to run on, e.g.
+            "web*:&prod:!canary" (see inventory.Inventory)
+        hooks: Hooks told about each host's result (see hooks)
+        **kwargs: Additional arguments passed to FTL
+
+    Returns:
+        Module execution results
+    """
+    if loop is None:
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(
+                run_module_async(
+                    inventory,
+                    modules,
+                    module_name,
+                    module_args,
+                    use_gate=use_gate,
+                    forks=forks,
+                    group_forks=group_forks,
+                    timeout=timeout,
+                    retry=retry,
+                    retry_budget=retry_budget,
+                    limit=limit,
+                    hooks=hooks,
+                    **kwargs
+                )
+            )
+        finally:
+            loop.close()
+
+    return asyncio.run_coroutine_threadsafe(
+        run_module_async(
+            inventory,
+            modules,
+            module_name,
+            module_args,
+            gate_cache=gate_cache,
+            use_gate=use_gate,
+            forks=forks,
+            group_forks=group_forks,
+            timeout=timeout,
+            retry=retry,
+            retry_budget=retry_budget,
+            limit=limit,
+            hooks=hooks,
+            **kwargs
+        ),
+        loop,
+    ).result()
+
+
+async def run_module_async(
+    inventory: Dict[str, Any],
+    modules: List[str],
+    module_name: str,
+    module_args: Dict[str, Any],
+    gate_cache: Optional[Dict] = None,
+    use_gate: bool = False,
+    forks: Optional[int] = None,
+    group_forks: Optional[Dict[str, int]] = None,
+    limiter: Optional[ForkLimiter] = None,
+    timeout: Optional[float] = None,
+    retry: Optional[RetryPolicy] = None,
+    retry_budget: Optional[RetryBudget] = None,
+    limit: Optional[str] = None,
+    hooks: Optional[Hooks] = None,
+    **kwargs
+) -> Any:
+    """
+    Execute an FTL module on the running event loop.
+
+    Each host runs as its own task so that ``forks`` bounds how many hosts
+    are contacted at once.
+
+    Args:
+        inventory: FTL inventory
+        modules: Available modules
+        module_name: Name of module to run
+        module_args: Arguments for the module
+        gate_cache: Optional gate cache for connection reuse
+        use_gate: Whether to use FTL gates
+        forks: Maximum number of hosts contacted at once
+        group_forks: Per-group overrides of ``forks``
+        limiter: Shared ForkLimiter, takes precedence over forks/group_forks
+        timeout: Seconds each host may run the module for; hosts that take
+            longer are cancelled and reported with timed_out()
+        retry: Policy for retrying hosts that fail transiently
+        retry_budget: Run-wide limit on the retries ``retry`` may make
+        limit: Host pattern restricting the hosts to run on, e.g.
+            "web*:&prod:!canary" (see inventory.Inventory)
+        hooks: Hooks told about each host's result (see hooks)
         **kwargs: Additional arguments passed to FTL
 
     Returns:
         Module execution results
     """
-    return ftl.run_module_sync(
+    results = {}
+    async for host_name, result in stream_module_async(
         inventory,
         modules,
         module_name,
-        gate_cache,
-        module_args=module_args,
+        module_args,
+        gate_cache=gate_cache,
         use_gate=use_gate,
+        forks=forks,
+        group_forks=group_forks,
+        limiter=limiter,
+        timeout=timeout,
+        retry=retry,
+        retry_budget=retry_budget,
+        limit=limit,
+        hooks=hooks,
         **kwargs
-    )
+    ):
+        results[host_name] = result
+    # Report hosts in inventory order rather than completion order
+    return {name: results[name] for name in host_groups(inventory) if name in results}
+
+
+async def stream_module_async(
+    inventory: Dict[str, Any],
+    modules: List[str],
+    module_name: str,
+    module_args: Dict[str, Any],
+    gate_cache: Optional[Dict] = None,
+    use_gate: bool = False,
+    forks: Optional[int] = None,
+    group_forks: Optional[Dict[str, int]] = None,
+    limiter: Optional[ForkLimiter] = None,
+    timeout: Optional[float] = None,
+    retry: Optional[RetryPolicy] = None,
+    retry_budget: Optional[RetryBudget] = None,
+    limit: Optional[str] = None,
+    hooks: Optional[Hooks] = None,
+    **kwargs
+):
+    """
+    Execute an FTL module, yielding (host, result) as each host finishes.
+
+    Takes the same arguments as run_module_async(). Results are not
+    accumulated, and hosts still running are cancelled if the consumer
+    stops iterating early.
+    """
+    import faster_than_light as ftl
+    import faster_than_light.local
+
+    # run_module_locally() looks check_output up on its module at call time
+    faster_than_light.local.check_output = check_output
+
+    if limit is not None:
+        inventory = Inventory(inventory).limit(limit)
+    if limiter is None:
+        limiter = ForkLimiter(forks, group_forks)
+
+    async def attempt(host_name, host, groups):
+        gates = host_gates(gate_cache, host_name, host)
+        async with limiter.slot(groups), getattr(gates, "slot", _no_slot)():
+            try:
+                result = await asyncio.wait_for(
+                    ftl.run_module(
+                        {"all": {"hosts": {host_name: host}}},
+                        modules,
+                        module_name,
+                        gates,
+                        module_args=module_args,
+                        use_gate=use_gate,
+                        **kwargs
+                    ),
+                    timeout,
+                )
+            except asyncio.TimeoutError:
+                discard_gate(gates, host_name)
+                return timed_out(module_name, timeout)
+            except asyncio.CancelledError:
+                discard_gate(gates, host_name)
+                raise
+        return result[host_name]
+
+    async def run_on_host(host_name, host, groups):
+        if retry is None:
+            return host_name, await attempt(host_name, host, groups)
+        # Fork slots are released while waiting to retry
+        return host_name, await retry.run(
+            partial(attempt, host_name, host, groups), retry_budget
+        )
+
+    if hooks:
+        call = current_call()
+        run_untracked = run_on_host
+
+        async def run_on_host(host_name, host, groups):
+            start = time.perf_counter()
+            gates = host_gates(gate_cache, host_name, host)
+            gate_reused = gates is not None and host_name in gates
+            result = await run_untracked(host_name, host, groups)
+            hooks.host_result(call, HostResult(
+                host_name, module_name, result[1], start, time.perf_counter(), gate_reused
+            ))
+            return result
+
+    pending = {
+        asyncio.ensure_future(run_on_host(name, host, groups))
+        for name, (host, groups) in host_groups(inventory).items()
+    }
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
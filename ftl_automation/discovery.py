@@ -0,0 +1,315 @@
+"""
+Cached discovery of tools.
+
+Finding a tool used to mean importing ``<package>.<tool>`` from each tool
+package in turn and probing its members. The ToolIndex instead maps tool
+names to ``module:Class`` references, built once from a static (AST) scan
+of each tool package and from ``ftl_automation.tools`` entry points, and
+persisted so that later runs resolve a tool with a dictionary lookup.
+Each package's entry is invalidated when its files or installed version
+change; names that could not be found are remembered as well.
+"""
+
+import ast
+import hashlib
+import importlib
+import importlib.util
+import inspect
+import json
+import os
+import sys
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional
+
+# Entry point group third-party packages register tools under, e.g.
+# [project.entry-points."ftl_automation.tools"] dnf = "my_tools.dnf:DnfTool"
+ENTRY_POINT_GROUP = "ftl_automation.tools"
+
+# Bumped when the layout of the index file or how packages are scanned
+# changes
+INDEX_VERSION = 2
+
+
+def default_index_path() -> str:
+    """Return the tool index file, honouring XDG_CACHE_HOME."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache_home, "ftl-automation", "tools.json")
+
+
+def _package_version(package: str) -> str:
+    """Return the installed distribution version of a package, if known."""
+    from importlib import metadata
+
+    try:
+        return metadata.version(package.split(".")[0])
+    except metadata.PackageNotFoundError:
+        return ""
+
+
+def _package_files(package: str) -> Optional[List[str]]:
+    """Return the .py files of a package, or None if it cannot be found."""
+    try:
+        spec = importlib.util.find_spec(package)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    files = []
+    for directory in spec.submodule_search_locations:
+        try:
+            entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+        except OSError:
+            continue
+        files.extend(
+            entry.path for entry in entries
+            if entry.name.endswith(".py") and entry.is_file()
+        )
+    return files
+
+
+def _fingerprint(paths: List[str], *extra: str) -> str:
+    """Hash the names, sizes and modification times of ``paths``."""
+    digest = hashlib.sha256()
+    for value in extra:
+        digest.update(f"{value}\0".encode())
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        digest.update(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode())
+    return digest.hexdigest()
+
+
+def scan_tool_file(path: str) -> Dict[str, str]:
+    """Return tool name -> class name for classes assigning a literal ``name``."""
+    try:
+        with open(path, "rb") as f:
+            tree = ast.parse(f.read(), filename=path)
+    except (OSError, SyntaxError, ValueError):
+        return {}
+    tools = {}
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        for statement in node.body:
+            if isinstance(statement, ast.Assign):
+                targets, value = statement.targets, statement.value
+            elif isinstance(statement, ast.AnnAssign) and statement.value is not None:
+                targets, value = [statement.target], statement.value
+            else:
+                continue
+            if (
+                any(isinstance(t, ast.Name) and t.id == "name" for t in targets)
+                and isinstance(value, ast.Constant)
+                and isinstance(value.value, str)
+            ):
+                tools.setdefault(value.value, node.name)
+    return tools
+
+
+def scan_package(package: str, files: List[str]) -> Dict[str, str]:
+    """Return tool name -> ``module:Class`` for the tools defined in a package.
+
+    Like the imports used before the index existed, a tool is only found
+    in the module of its own name, ``<package>.<tool_name>``; a class with
+    the same ``name`` in another module of the package is not a match.
+    """
+    tools = {}
+    for path in files:
+        module_name = os.path.splitext(os.path.basename(path))[0]
+        class_name = scan_tool_file(path).get(module_name)
+        if class_name is not None:
+            tools[module_name] = f"{package}.{module_name}:{class_name}"
+    return tools
+
+
+def module_missing(error: ImportError, module_name: str) -> bool:
+    """Whether ``error`` means ``module_name`` itself does not exist.
+
+    False for errors raised while importing the module, such as a third
+    party dependency of the module that is not installed.
+    """
+    missing = getattr(error, "name", None)
+    return isinstance(error, ModuleNotFoundError) and missing is not None and (
+        module_name == missing or module_name.startswith(f"{missing}.")
+    )
+
+
+def probe_package(package: str, tool_name: str) -> Optional[str]:
+    """Import ``<package>.<tool_name>`` and look for the tool class in it.
+
+    Raises:
+        ImportError: If the module exists but fails to import
+    """
+    module_path = f"{package}.{tool_name}"
+    try:
+        module = importlib.import_module(module_path)
+    except ImportError as e:
+        if not module_missing(e, module_path):
+            raise
+        return None
+    for name, obj in inspect.getmembers(module):
+        if inspect.isclass(obj) and getattr(obj, "name", None) == tool_name:
+            return f"{module_path}:{name}"
+    return None
+
+
+def scan_entry_points() -> Dict[str, str]:
+    """Return tool name -> ``module:Class`` registered through entry points."""
+    from importlib import metadata
+
+    return {ep.name: ep.value for ep in metadata.entry_points(group=ENTRY_POINT_GROUP)}
+
+
+def resolve_reference(reference: str) -> Any:
+    """Import and return the object a ``module:attribute`` reference names."""
+    module_name, _, attribute = reference.partition(":")
+    obj = importlib.import_module(module_name)
+    for part in attribute.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+class ToolIndex:
+    """
+    Persistent map of tool names to the classes that implement them.
+
+    Each tool package is scanned without importing its modules and stored
+    with a fingerprint of its files and installed version; the entry is
+    rebuilt when the fingerprint changes. Entry points are stored with a
+    fingerprint of the ``sys.path`` directories, which change when
+    distributions are installed or removed. A name the scan does not know
+    is probed with an import once and the outcome, found or not, is kept
+    in the index.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = os.path.abspath(os.path.expanduser(path or default_index_path()))
+        self._data: Optional[Dict[str, Any]] = None
+        self._checked: set = set()
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    def _load(self) -> Dict[str, Any]:
+        if self._data is None:
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+                if data.get("version") != INDEX_VERSION:
+                    raise ValueError("stale index")
+            except (OSError, ValueError):
+                data = {"version": INDEX_VERSION, "packages": {}, "entry_points": None}
+            self._data = data
+        return self._data
+
+    def _save(self):
+        if not self._dirty:
+            return
+        directory = os.path.dirname(self.path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tools-", suffix=".json")
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._data, f, indent=1, sort_keys=True)
+            os.replace(temp_path, self.path)
+        except OSError:
+            return  # The index is only a cache
+        self._dirty = False
+
+    def _package_entry(self, package: str) -> Optional[Dict[str, Any]]:
+        """Return the package's index entry, rescanning it if it changed."""
+        packages = self._load()["packages"]
+        if package in self._checked:
+            return packages.get(package)
+        self._checked.add(package)
+
+        files = _package_files(package)
+        if files is None:
+            packages.pop(package, None)
+            return None
+        fingerprint = _fingerprint(files, package, _package_version(package))
+        entry = packages.get(package)
+        if entry is None or entry.get("fingerprint") != fingerprint:
+            entry = packages[package] = {
+                "fingerprint": fingerprint,
+                "tools": scan_package(package, files),
+                "missing": [],
+            }
+            self._dirty = True
+        return entry
+
+    def _entry_points(self) -> Dict[str, str]:
+        data = self._load()
+        if "entry_points" in self._checked:
+            return data["entry_points"]["tools"]
+        self._checked.add("entry_points")
+
+        fingerprint = _fingerprint([p for p in sys.path if p and os.path.isdir(p)])
+        cached = data.get("entry_points")
+        if cached is None or cached.get("fingerprint") != fingerprint:
+            data["entry_points"] = {"fingerprint": fingerprint, "tools": scan_entry_points()}
+            self._dirty = True
+        return data["entry_points"]["tools"]
+
+    def lookup(self, tool_name: str, tool_packages: List[str]) -> Optional[str]:
+        """
+        Find the class implementing a tool.
+
+        Args:
+            tool_name: Name of the tool
+            tool_packages: Packages to search, in order, before entry points
+
+        Returns:
+            ``module:Class`` reference, or None if no package provides the tool
+        """
+        with self._lock:
+            try:
+                for package in tool_packages:
+                    entry = self._package_entry(package)
+                    if entry is None:
+                        continue
+                    if tool_name in entry["tools"]:
+                        return entry["tools"][tool_name]
+                    if tool_name in entry["missing"]:
+                        continue
+                    # Not visible to the static scan, e.g. a computed name
+                    reference = probe_package(package, tool_name)
+                    if reference is not None:
+                        entry["tools"][tool_name] = reference
+                    else:
+                        entry["missing"].append(tool_name)
+                    self._dirty = True
+                    if reference is not None:
+                        return reference
+                return self._entry_points().get(tool_name)
+            finally:
+                self._save()
+
+    def invalidate(self, package: Optional[str] = None):
+        """Forget one package, or every entry when no package is given."""
+        with self._lock:
+            data = self._load()
+            if package is None:
+                data["packages"] = {}
+                data["entry_points"] = None
+                self._checked.clear()
+            else:
+                data["packages"].pop(package, None)
+                self._checked.discard(package)
+            self._dirty = True
+            self._save()
+
+
+_default_index: Optional[ToolIndex] = None
+_default_lock = threading.Lock()
+
+
+def default_tool_index() -> ToolIndex:
+    """Return the process-wide ToolIndex stored at default_index_path()."""
+    global _default_index
+    with _default_lock:
+        if _default_index is None:
+            _default_index = ToolIndex()
+        return _default_index
@@ -12,4 +12,21 @@ class CompletionException(Exception):
 
 class ImpossibleException(Exception):
     """Exception raised to signal that a task is impossible to complete."""
-    pass
\ No newline at end of file
+    pass
+
+
+class PlanError(Exception):
+    """Exception raised when steps of a Plan failed or were skipped."""
+
+    def __init__(self, failed, skipped):
+        self.failed = failed
+        self.skipped = skipped
+        summary = ", ".join(f"{node.tool_name}: {node.error}" for node in failed)
+        super().__init__(
+            f"{len(failed)} plan step(s) failed, {len(skipped)} skipped: {summary}"
+        )
+
+
+class SecretError(Exception):
+    """Exception raised when a secret provider cannot be read."""
+    pass
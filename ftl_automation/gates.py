@@ -0,0 +1,594 @@
+"""
+FTL gate management.
+
+Gates are the small Python programs FTL deploys to remote hosts to run
+modules over a persistent SSH connection.
+"""
+
+import asyncio
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipapp
+from collections.abc import MutableMapping
+from functools import partial
+from getpass import getuser
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from contextlib import asynccontextmanager
+
+from .discovery import _package_version
+
+# Default size limit of the on-disk gate artifact cache
+DEFAULT_GATE_CACHE_BYTES = 512 * 1024 * 1024
+
+# Seconds an unused gate stays open before it is closed
+DEFAULT_IDLE_TIMEOUT = 300.0
+
+# Seconds allowed for closing all gates when a context exits
+DEFAULT_CLOSE_TIMEOUT = 5.0
+
+
+def default_gate_cache_dir() -> str:
+    """Return the gate artifact cache directory, honouring XDG_CACHE_HOME."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache_home, "ftl-automation", "gates")
+
+
+def gate_target(host_name: str, host: Dict[str, Any]) -> Tuple[str, str, str]:
+    """Return the (ssh host, ssh user, interpreter) FTL uses for a host."""
+    host = host or {}
+    return (
+        host.get("ansible_host") or host_name,
+        host.get("ansible_user") or getuser(),
+        host.get("ansible_python_interpreter") or sys.executable,
+    )
+
+
+def tool_modules(context) -> List[str]:
+    """Return the names of modules used by the context's loaded tools.
+
+    Tools that have not been loaded yet are left out; gates are sent the
+    module of such a tool the first time it runs.
+    """
+    from faster_than_light.util import find_module
+
+    names = []
+    for tool in context._tools_dict.values():
+        module = getattr(tool, "module", None)
+        if module and module not in names and find_module(context.modules, module):
+            names.append(module)
+    return names
+
+
+class HostGates(MutableMapping):
+    """
+    One host's view of a GatePool, used as FTL's ``gate_cache``.
+
+    FTL looks gates up by inventory alias, but contexts sharing a pool can
+    use the same alias for different machines. The view maps the alias to
+    the pooled gate of the host's connection target, so a gate is only
+    reused for the same address, user and interpreter.
+    """
+
+    def __init__(self, pool: "GatePool", host_name: str, key: Tuple[str, str, str]):
+        self.pool = pool
+        self.host_name = host_name
+        self.key = key
+
+    def _check(self, host_name: str):
+        if host_name != self.host_name:
+            raise KeyError(host_name)
+
+    def __getitem__(self, host_name: str):
+        self._check(host_name)
+        return self.pool[self.key]
+
+    def __setitem__(self, host_name: str, gate):
+        self._check(host_name)
+        self.pool[self.key] = gate
+
+    def __delitem__(self, host_name: str):
+        self._check(host_name)
+        del self.pool[self.key]
+
+    def __iter__(self) -> Iterator[str]:
+        if self.key in self.pool:
+            yield self.host_name
+
+    def __len__(self) -> int:
+        return int(self.key in self.pool)
+
+    def discard(self, host_name: str):
+        """Discard the host's gate, see GatePool.discard()."""
+        self._check(host_name)
+        self.pool.discard(self.key)
+
+    def slot(self):
+        """Hold one of the target machine's connection slots."""
+        return self.pool.host_slot(self.key[0])
+
+
+class GatePool(dict):
+    """
+    Gate cache that manages the lifecycle of open gates.
+
+    Gates are keyed by connection target (see gate_target()), so contexts
+    sharing the pool never reuse a gate for a different machine that has
+    the same inventory alias; FTL is given a HostGates view per host. On
+    top of that the pool closes gates that are displaced by a second
+    connection to the same target, closes gates idle for longer than
+    ``idle_timeout``, caps concurrent connections per machine with
+    ``max_per_host``, and closes every gate concurrently within a deadline
+    on ``close()``.
+    """
+
+    def __init__(
+        self,
+        idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT,
+        max_per_host: Optional[int] = None,
+    ):
+        super().__init__()
+        self.idle_timeout = idle_timeout
+        self.max_per_host = max_per_host
+        self.closed = False
+        self._last_used: Dict[str, float] = {}
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._closing: set = set()
+        self._orphans: List[Any] = []
+        self._reaper = None
+
+    def for_host(self, host_name: str, host: Dict[str, Any]) -> HostGates:
+        """Return the gate cache FTL uses for one inventory host."""
+        return HostGates(self, host_name, gate_target(host_name, host))
+
+    def __setitem__(self, host: str, gate):
+        displaced = self.get(host)
+        if self.closed:
+            self._close_later(gate)
+            return
+        super().__setitem__(host, gate)
+        self._last_used[host] = time.monotonic()
+        if displaced is not None and displaced is not gate:
+            self._close_later(displaced)
+
+    def __delitem__(self, host: str):
+        super().__delitem__(host)
+        self._last_used.pop(host, None)
+
+    def pop(self, host: str, *default):
+        self._last_used.pop(host, None)
+        return super().pop(host, *default)
+
+    def popitem(self):
+        host, gate = super().popitem()
+        self._last_used.pop(host, None)
+        return host, gate
+
+    def discard(self, host: str):
+        """Kill the host's gate instead of shutting it down.
+
+        Used for gates interrupted mid-module, whose pipe can no longer be
+        trusted: the gate and the module it is running are killed (see
+        kill_gate()) and the gate is not reused.
+        """
+        gate = self.pop(host, None)
+        if gate is None:
+            return
+        task = kill_gate_later(gate)
+        if task is not None:
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    def _close_later(self, gate):
+        try:
+            task = asyncio.get_running_loop().create_task(self._close_gate(gate))
+        except RuntimeError:
+            self._orphans.append(gate)
+            return
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close_gate(gate):
+        from faster_than_light.ssh import close_gate
+
+        try:
+            await close_gate(gate.conn, gate.gate_process, gate.temp_dir)
+            await gate.conn.wait_closed()
+        except Exception:
+            pass  # The connection is going away either way
+
+    @asynccontextmanager
+    async def host_slot(self, host: str):
+        """Hold one of the host's connection slots while the block runs."""
+        if self.max_per_host is None:
+            yield
+            return
+        semaphore = self._host_slots.get(host)
+        if semaphore is None:
+            semaphore = self._host_slots[host] = asyncio.Semaphore(self.max_per_host)
+        async with semaphore:
+            yield
+
+    async def evict_idle(self) -> List[str]:
+        """Close gates unused for longer than ``idle_timeout``.
+
+        Returns:
+            Host names whose gates were closed
+        """
+        if self.idle_timeout is None:
+            return []
+        deadline = time.monotonic() - self.idle_timeout
+        idle = [host for host, used in self._last_used.items() if used < deadline]
+        gates = [self.pop(host) for host in idle]
+        await asyncio.gather(*(self._close_gate(gate) for gate in gates))
+        return idle
+
+    async def _reap(self):
+        while True:
+            await asyncio.sleep(max(self.idle_timeout / 2, 1.0))
+            await self.evict_idle()
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        """Start closing idle gates in the background on ``loop``."""
+        if self.idle_timeout is not None:
+            loop.call_soon_threadsafe(self._start_reaper)
+
+    def _start_reaper(self):
+        if self._reaper is None and not self.closed:
+            self._reaper = asyncio.ensure_future(self._reap())
+
+    async def close(self, timeout: float = DEFAULT_CLOSE_TIMEOUT) -> int:
+        """Close every gate concurrently, waiting at most ``timeout`` seconds.
+
+        Gates returned to the pool after this are closed immediately.
+
+        Returns:
+            Number of gates that were closed
+        """
+        self.closed = True
+        if self._reaper is not None:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+            self._reaper = None
+        gates = list(self.values()) + self._orphans
+        self.clear()
+        self._last_used.clear()
+        self._orphans = []
+        tasks = {asyncio.ensure_future(self._close_gate(gate)): gate for gate in gates}
+        waiting = set(tasks) | self._closing
+        if waiting:
+            _, pending = await asyncio.wait(waiting, timeout=timeout)
+            for task in pending:
+                task.cancel()
+                if task in tasks:
+                    # Drop the connection without waiting for the remote end
+                    tasks[task].conn.abort()
+        return len(gates)
+
+
+# Run on a new channel of a gate's connection: kills the process groups of
+# the connection's other sessions, that is the gate and the module it runs.
+# sshd starts each session in its own process group as a child of the
+# connection's sshd process, the parent of this shell.
+KILL_SESSIONS = (
+    "for pid in $(pgrep -P $(ps -o ppid= -p $$)); do "
+    '[ "$pid" = $$ ] || kill -s KILL -- "-$pid"; done'
+)
+
+_killing: set = set()
+
+
+async def kill_gate(gate, timeout: float = DEFAULT_CLOSE_TIMEOUT):
+    """Kill a gate and the module it is running, then drop its connection.
+
+    The gate is sent a KILL signal request, which sshd only honours from
+    OpenSSH 7.9 on, and KILL_SESSIONS is run over the same connection
+    for the sshd builds that ignore it. The connection is aborted after at
+    most ``timeout`` seconds either way.
+    """
+    try:
+        if gate.gate_process is not None:
+            gate.gate_process.kill()
+    except Exception:
+        pass  # KILL_SESSIONS is run regardless
+    try:
+        await asyncio.wait_for(gate.conn.run(KILL_SESSIONS), timeout)
+    except Exception:
+        pass  # The connection is going away either way
+    finally:
+        gate.conn.abort()
+
+
+def kill_gate_later(gate) -> Optional[asyncio.Task]:
+    """Start kill_gate() on the running loop and return its task.
+
+    Without a running loop the connection is only aborted, and None is
+    returned.
+    """
+    try:
+        task = asyncio.get_running_loop().create_task(kill_gate(gate))
+    except RuntimeError:
+        gate.conn.abort()
+        return None
+    _killing.add(task)
+    task.add_done_callback(_killing.discard)
+    return task
+
+
+def _gate_main() -> bytes:
+    """Return the source of the FTL gate entry point."""
+    from importlib_resources import files
+    import faster_than_light.ftl_gate
+
+    return files(faster_than_light.ftl_gate).joinpath("__main__.py").read_bytes()
+
+
+class GateArtifactCache:
+    """
+    Content-addressed on-disk cache of built gate archives.
+
+    Archives are keyed by a hash of the gate entry point, the contents of
+    the bundled module files, dependencies, tool package versions and the
+    target interpreter, so a CLI run with an unchanged module set reuses
+    the archive built by the previous run. The least recently used
+    archives are evicted when the cache grows beyond ``max_bytes``.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = DEFAULT_GATE_CACHE_BYTES):
+        self.path = os.path.abspath(os.path.expanduser(path or default_gate_cache_dir()))
+        self.max_bytes = max_bytes
+
+    def key(
+        self,
+        modules: List[str],
+        module_dirs: List[str],
+        dependencies: Optional[List[str]] = None,
+        interpreter: str = sys.executable,
+        tool_packages: Optional[List[str]] = None,
+    ) -> str:
+        """Return the content hash identifying a gate archive."""
+        from faster_than_light.util import find_module
+
+        digest = hashlib.sha256()
+        digest.update(_gate_main())
+        for module in sorted(modules):
+            digest.update(b"\0module\0" + module.encode())
+            with open(find_module(module_dirs, module), "rb") as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+        for dependency in sorted(dependencies or []):
+            digest.update(b"\0dependency\0" + dependency.encode())
+        for package in sorted(tool_packages or []):
+            digest.update(f"\0package\0{package}={_package_version(package)}".encode())
+        digest.update(f"\0interpreter\0{interpreter}\0{sys.version}".encode())
+        return digest.hexdigest()
+
+    def archive_path(self, key: str) -> str:
+        return os.path.join(self.path, f"ftl_gate_{key}.pyz")
+
+    def get_or_build(
+        self,
+        modules: List[str],
+        module_dirs: List[str],
+        dependencies: Optional[List[str]] = None,
+        interpreter: str = sys.executable,
+        tool_packages: Optional[List[str]] = None,
+    ) -> Tuple[str, str]:
+        """Return (archive path, key), building the archive on a cache miss."""
+        key = self.key(modules, module_dirs, dependencies, interpreter, tool_packages)
+        archive = self.archive_path(key)
+        if os.path.exists(archive):
+            # Record the hit for LRU eviction
+            os.utime(archive)
+            return archive, key
+
+        os.makedirs(self.path, exist_ok=True)
+        build_gate(archive, modules, module_dirs, dependencies, interpreter)
+        self.evict()
+        return archive, key
+
+    def builder(
+        self,
+        modules: Callable[[], List[str]],
+        module_dirs: List[str],
+        dependencies: Optional[List[str]] = None,
+        tool_packages: Optional[List[str]] = None,
+    ) -> Callable:
+        """Return a gate builder for FTL's ``use_gate`` hook.
+
+        Args:
+            modules: Callable returning the module names to bundle, called
+                when the first gate is needed
+            module_dirs: Directories containing the modules
+            dependencies: Python requirements to install into the gate
+            tool_packages: Tool packages whose versions are part of the key
+        """
+        built = {}
+        lock = threading.Lock()
+
+        def gate_builder(interpreter: str = sys.executable) -> Tuple[str, str]:
+            with lock:
+                if interpreter not in built:
+                    built[interpreter] = self.get_or_build(
+                        modules(), module_dirs, dependencies, interpreter, tool_packages
+                    )
+                return built[interpreter]
+
+        return gate_builder
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        """Return (path, size, last used) for cached archives, oldest first."""
+        if not os.path.isdir(self.path):
+            return []
+        entries = []
+        for name in os.listdir(self.path):
+            if name.startswith("ftl_gate_") and name.endswith(".pyz"):
+                stat = os.stat(os.path.join(self.path, name))
+                entries.append((os.path.join(self.path, name), stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def evict(self, max_bytes: Optional[int] = None) -> List[str]:
+        """Remove least recently used archives until the cache fits.
+
+        Returns:
+            Paths of removed archives
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for path, size, _ in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed.append(path)
+        return removed
+
+    def clear(self) -> List[str]:
+        """Remove every cached archive."""
+        return self.evict(0)
+
+
+def build_gate(
+    archive: str,
+    modules: List[str],
+    module_dirs: List[str],
+    dependencies: Optional[List[str]] = None,
+    interpreter: str = sys.executable,
+) -> str:
+    """Build a gate archive at ``archive``.
+
+    Produces the same layout as ``faster_than_light.gate.build_ftl_gate``
+    but writes to the given path atomically instead of FTL's name-keyed
+    cache, so concurrent runs never see a partial archive.
+    """
+    from faster_than_light.util import find_module
+
+    tempdir = tempfile.mkdtemp(prefix="ftl-automation-gate-")
+    try:
+        gate_dir = os.path.join(tempdir, "ftl_gate")
+        module_dir = os.path.join(gate_dir, "ftl_gate")
+        os.makedirs(module_dir)
+        with open(os.path.join(gate_dir, "__main__.py"), "wb") as f:
+            f.write(_gate_main())
+        with open(os.path.join(module_dir, "__init__.py"), "w") as f:
+            f.write("")
+
+        for module in modules:
+            path = find_module(module_dirs, module)
+            shutil.copy(path, os.path.join(module_dir, os.path.basename(path)))
+
+        if dependencies:
+            requirements = os.path.join(tempdir, "requirements.txt")
+            with open(requirements, "w") as f:
+                f.write("\n".join(dependencies))
+            subprocess.check_call(
+                [sys.executable, "-m", "pip", "install", "-q", "-r", requirements,
+                 "--target", gate_dir]
+            )
+
+        partial_archive = os.path.join(
+            os.path.dirname(archive),
+            f".{os.path.basename(archive)}.{os.getpid()}.{threading.get_ident()}",
+        )
+        zipapp.create_archive(gate_dir, partial_archive, interpreter)
+        os.replace(partial_archive, archive)
+        return archive
+    finally:
+        shutil.rmtree(tempdir, ignore_errors=True)
+
+
+async def prewarm_gates(context) -> Dict[str, Any]:
+    """Build gates and open connections to every targeted remote host concurrently.
+
+    Tools registered for lazy loading are loaded first so that gates bundle
+    the modules of every tool. Gates are built once per remote interpreter
+    and stored in ``context.gate_cache`` so the first call to each module
+    does not pay for gate deployment. Connections are opened within the
+    context's fork limits and the pool's ``max_per_host`` slots. Hosts that
+    cannot be reached are reported and left for the normal lazy path.
+
+    Returns:
+        Timing report with build/connect seconds and failed hosts
+    """
+    from faster_than_light.gate import build_ftl_gate
+    from faster_than_light.ssh import connect_gate
+    from rich.progress import Progress
+    from .core import _no_slot, host_gates, host_groups
+
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+
+    load_all = getattr(context._tools_dict, "load_all", None)
+    if load_all is not None:
+        await loop.run_in_executor(context.executor, load_all)
+
+    if context.use_gate:
+        gate_builder = context.use_gate
+    else:
+        gate_builder = partial(
+            build_ftl_gate, modules=tool_modules(context), module_dirs=context.modules
+        )
+
+    remote = {
+        name: (host, groups)
+        for name, (host, groups) in host_groups(context._target_inventory()).items()
+        if (host or {}).get("ansible_connection") != "local"
+    }
+
+    # Build each distinct gate off the loop before connecting
+    interpreters = {gate_target(name, host)[2] for name, (host, _) in remote.items()}
+    await asyncio.gather(
+        *(
+            loop.run_in_executor(context.executor, partial(gate_builder, interpreter=i))
+            for i in interpreters
+        )
+    )
+    built = time.perf_counter()
+
+    failed = {}
+    with Progress(console=context.console, transient=True) as progress:
+        task = progress.add_task("Opening gates", total=len(remote))
+
+        async def connect(name, host, groups):
+            ssh_host, ssh_user, interpreter = gate_target(name, host)
+            try:
+                gates = host_gates(context.gate_cache, name, host)
+                async with context.limiter.slot(groups), getattr(gates, "slot", _no_slot)():
+                    gates[name] = await connect_gate(
+                        gate_builder, ssh_host, ssh_user, gates, interpreter
+                    )
+            except Exception as e:
+                failed[name] = e
+            finally:
+                progress.advance(task)
+
+        await asyncio.gather(
+            *(connect(name, host, groups) for name, (host, groups) in remote.items())
+        )
+
+    report = {
+        "hosts": len(remote),
+        "gates": len(interpreters),
+        "build_seconds": built - start,
+        "connect_seconds": time.perf_counter() - built,
+        "failed": failed,
+    }
+    context.print(
+        f"Pre-warmed {len(remote) - len(failed)}/{len(remote)} hosts in "
+        f"{time.perf_counter() - start:.2f}s "
+        f"(build {report['build_seconds']:.2f}s, connect {report['connect_seconds']:.2f}s)"
+    )
+    for name, error in failed.items():
+        context.print(f"[yellow]Could not pre-warm {name}: {error}[/yellow]")
+    return report
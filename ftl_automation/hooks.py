@@ -0,0 +1,331 @@
+"""
+Instrumentation hooks for tool calls and module executions.
+
+Hooks are objects (or functions) registered on ``AutomationContext.hooks``
+and called at three points:
+
+- ``on_call_start(call)`` when a tool call, or a module run made outside
+  any tool, begins
+- ``on_call_end(call)`` when it returns or raises
+- ``on_host_result(call, host)`` as each host finishes a module
+
+``call`` is a Call and ``host`` a HostResult. When no hooks are
+registered tools are not wrapped and module runs skip all bookkeeping.
+MetricsCollector is a ready-made hook aggregating timings and counts.
+"""
+
+import contextvars
+import itertools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from .tool_base import AutomationTool
+
+# Call being made in the current thread or task
+_current_call: contextvars.ContextVar = contextvars.ContextVar(
+    "ftl_automation_current_call", default=None
+)
+
+_call_ids = itertools.count(1)
+
+
+def current_call() -> Optional["Call"]:
+    """Return the Call in progress, if any."""
+    return _current_call.get()
+
+
+class Call:
+    """
+    One tool call or top-level module run.
+
+    Attributes:
+        id: Number unique within the process
+        parent: Call this one was made from, if any
+        tool: Tool name, or the module name for module runs
+        module: Module the tool runs, if known
+        args: Keyword arguments of the call
+        start: time.perf_counter() when the call began
+        end: time.perf_counter() when it finished, None while running
+        result: Return value
+        error: Exception raised, if any
+    """
+
+    __slots__ = ("id", "parent", "tool", "module", "args", "start", "end", "result", "error",
+                 "data")
+
+    def __init__(self, tool: str, module: Optional[str] = None, args: Optional[Dict] = None):
+        self.id = next(_call_ids)
+        self.parent = _current_call.get()
+        self.tool = tool
+        self.module = module
+        self.args = args or {}
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        # Per-call storage for hooks, e.g. a span
+        self.data: Dict[str, Any] = {}
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Wall time in seconds, None while running."""
+        return None if self.end is None else self.end - self.start
+
+
+class HostResult:
+    """
+    A host's result for one module run.
+
+    Attributes:
+        host: Host name
+        module: Module that ran
+        result: The host's result dict
+        start: time.perf_counter() when the host's first attempt began
+        end: time.perf_counter() when its result arrived
+        gate_reused: True if a cached gate was available for the host
+    """
+
+    __slots__ = ("host", "module", "result", "start", "end", "gate_reused", "_bytes")
+
+    def __init__(self, host: str, module: str, result: Any, start: float, end: float,
+                 gate_reused: bool):
+        self.host = host
+        self.module = module
+        self.result = result
+        self.start = start
+        self.end = end
+        self.gate_reused = gate_reused
+        self._bytes: Optional[int] = None
+
+    @property
+    def duration(self) -> float:
+        """Seconds from the first attempt to the result."""
+        return self.end - self.start
+
+    @property
+    def bytes(self) -> int:
+        """Size of the result serialized as JSON, computed on first use."""
+        if self._bytes is None:
+            self._bytes = len(json.dumps(self.result, default=str).encode())
+        return self._bytes
+
+    @property
+    def changed(self) -> bool:
+        return isinstance(self.result, dict) and bool(self.result.get("changed"))
+
+    @property
+    def failed(self) -> bool:
+        return isinstance(self.result, dict) and bool(
+            self.result.get("failed") or self.result.get("unreachable")
+        )
+
+
+class Hooks:
+    """Registered hook functions, called in registration order."""
+
+    EVENTS = ("on_call_start", "on_call_end", "on_host_result")
+
+    def __init__(self):
+        self.on_call_start: List[Callable] = []
+        self.on_call_end: List[Callable] = []
+        self.on_host_result: List[Callable] = []
+
+    def __bool__(self):
+        return bool(self.on_call_start or self.on_call_end or self.on_host_result)
+
+    def register(self, hook: Any = None, **functions: Callable) -> Any:
+        """
+        Register a hook object and/or hook functions.
+
+        Args:
+            hook: Object with any of the on_call_start, on_call_end and
+                on_host_result methods
+            **functions: Functions keyed by event name
+
+        Returns:
+            ``hook``, so this can be used as ``collector = register(...)``
+        """
+        for event in self.EVENTS:
+            function = getattr(hook, event, None) if hook is not None else None
+            if function is not None:
+                getattr(self, event).append(function)
+        for event, function in functions.items():
+            if event not in self.EVENTS:
+                raise ValueError(f"Unknown hook event {event!r}")
+            getattr(self, event).append(function)
+        return hook
+
+    def unregister(self, hook: Any):
+        """Remove a hook object registered with register()."""
+        for event in self.EVENTS:
+            function = getattr(hook, event, None)
+            functions = getattr(self, event)
+            if function in functions:
+                functions.remove(function)
+
+    def _emit(self, functions: List[Callable], *args):
+        for function in functions:
+            try:
+                function(*args)
+            except Exception as e:
+                # Instrumentation must not break the run
+                print(f"Warning: hook {function!r} failed: {e}")
+
+    def call_start(self, call: Call):
+        if self.on_call_start:
+            self._emit(self.on_call_start, call)
+
+    def call_end(self, call: Call):
+        if self.on_call_end:
+            self._emit(self.on_call_end, call)
+
+    def host_result(self, call: Optional[Call], host: HostResult):
+        if self.on_host_result:
+            self._emit(self.on_host_result, call, host)
+
+    @contextmanager
+    def track(self, tool: str, module: Optional[str] = None, args: Optional[Dict] = None):
+        """Report a call around the block and make it the current call."""
+        call = Call(tool, module, args)
+        self.call_start(call)
+        token = _current_call.set(call)
+        try:
+            yield call
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            _current_call.reset(token)
+            call.end = time.perf_counter()
+            self.call_end(call)
+
+
+class InstrumentedTool(AutomationTool):
+    """Tool wrapper reporting each call to the context's hooks."""
+
+    def __init__(self, tool: AutomationTool, hooks: Hooks):
+        super().__init__(tool.context)
+        self._tool = tool
+        self._hooks = hooks
+        self.name = tool.name
+        self.module = tool.module
+        self.description = tool.description
+
+    def __call__(self, *args, **kwargs) -> Any:
+        with self._hooks.track(self.name, self.module, kwargs) as call:
+            call.result = self._tool(*args, **kwargs)
+            return call.result
+
+    def __getattr__(self, name: str):
+        return getattr(self._tool, name)
+
+
+class _Metrics:
+    __slots__ = ("calls", "errors", "wall_time", "max_wall_time", "hosts", "latencies",
+                 "bytes", "gate_hits", "gate_misses", "changed", "failed")
+
+    def __init__(self):
+        self.calls = self.errors = 0
+        self.wall_time = self.max_wall_time = 0.0
+        self.hosts = self.bytes = self.gate_hits = self.gate_misses = 0
+        self.changed = self.failed = 0
+        self.latencies: List[float] = []
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class MetricsCollector:
+    """
+    Hook aggregating per-tool timings and host outcomes.
+
+    Register it with ``ftl.hooks.register(MetricsCollector())`` or
+    ``automation(hooks=[...])`` and read summary() or report() after the
+    run. Host results of module runs are counted under the tool that made
+    them, or the module name when run directly.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metrics] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name: str) -> _Metrics:
+        metrics = self._metrics.get(name)
+        if metrics is None:
+            metrics = self._metrics.setdefault(name, _Metrics())
+        return metrics
+
+    def on_call_end(self, call: Call):
+        with self._lock:
+            metrics = self._get(call.tool)
+            metrics.calls += 1
+            metrics.errors += call.error is not None
+            metrics.wall_time += call.duration
+            metrics.max_wall_time = max(metrics.max_wall_time, call.duration)
+
+    def on_host_result(self, call: Optional[Call], host: HostResult):
+        size = host.bytes
+        with self._lock:
+            metrics = self._get(call.tool if call is not None else host.module)
+            metrics.hosts += 1
+            metrics.latencies.append(host.duration)
+            metrics.bytes += size
+            if host.gate_reused:
+                metrics.gate_hits += 1
+            else:
+                metrics.gate_misses += 1
+            metrics.changed += host.changed
+            metrics.failed += host.failed
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the collected metrics.
+
+        Returns:
+            Dict of tool name to calls, errors, wall_time, max_wall_time,
+            hosts, host_latency_p50/p95/max, bytes, gate_hits,
+            gate_misses, changed and failed
+        """
+        with self._lock:
+            return {
+                name: {
+                    "calls": m.calls,
+                    "errors": m.errors,
+                    "wall_time": m.wall_time,
+                    "max_wall_time": m.max_wall_time,
+                    "hosts": m.hosts,
+                    "host_latency_p50": _percentile(m.latencies, 0.5),
+                    "host_latency_p95": _percentile(m.latencies, 0.95),
+                    "host_latency_max": max(m.latencies) if m.latencies else None,
+                    "bytes": m.bytes,
+                    "gate_hits": m.gate_hits,
+                    "gate_misses": m.gate_misses,
+                    "changed": m.changed,
+                    "failed": m.failed,
+                }
+                for name, m in self._metrics.items()
+            }
+
+    def report(self) -> str:
+        """Return the summary as a text table, slowest tools first."""
+        rows = sorted(self.summary().items(), key=lambda item: -item[1]["wall_time"])
+        lines = [
+            f"{'tool':<20} {'calls':>6} {'wall s':>8} {'hosts':>6} {'p95 s':>7} "
+            f"{'bytes':>10} {'gate hit':>8} {'changed':>7} {'failed':>6}"
+        ]
+        for name, m in rows:
+            p95 = m["host_latency_p95"]
+            lines.append(
+                f"{name:<20} {m['calls']:>6} {m['wall_time']:>8.3f} {m['hosts']:>6} "
+                f"{'-' if p95 is None else f'{p95:.3f}':>7} {m['bytes']:>10} "
+                f"{m['gate_hits']:>4}/{m['gate_hits'] + m['gate_misses']:<3} "
+                f"{m['changed']:>7} {m['failed']:>6}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,567 @@
+"""
+Inventory loading and host targeting.
+
+Large YAML inventories are slow to parse in pure Python, so a parsed
+inventory is pickled next to its file (``.<name>.ftlcache``) together
+with the file's path, modification time, size and content hash, and
+loaded from there while the file is unchanged. Parsing uses libyaml's
+CSafeLoader when PyYAML was built with it.
+
+Inventory wraps a loaded inventory with host and group indexes,
+resolves host patterns such as ``web*:&prod:!canary`` against them and
+keeps each host's variables flattened, updating only what a runtime
+change to a host or group affects.
+"""
+
+import bisect
+import fnmatch
+import hashlib
+import os
+import pickle
+import re
+import tempfile
+import threading
+import time
+from collections import ChainMap
+from collections.abc import Mapping
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Bumped when the layout of the cache file changes
+CACHE_VERSION = 1
+
+# Files modified this close to when their cache was written may have been
+# changed again within the same timestamp tick, so their hash is checked
+RACY_NS = 2_000_000_000
+
+_MISSING = object()
+
+
+def yaml_loader():
+    """Return the fastest safe YAML loader available."""
+    import yaml
+
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def parse_inventory(data: bytes) -> Any:
+    """Parse inventory YAML."""
+    import yaml
+
+    return yaml.load(data, Loader=yaml_loader())
+
+
+def cache_path(inventory_path: str) -> str:
+    """Return the compiled cache file kept next to an inventory file."""
+    directory, name = os.path.split(os.path.abspath(inventory_path))
+    return os.path.join(directory, f".{name}.ftlcache")
+
+
+def _file_key(path: str, stat: os.stat_result) -> Dict[str, Any]:
+    return {
+        "version": CACHE_VERSION,
+        "path": path,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+    }
+
+
+def _read_cache(cache_file: str) -> Optional[Dict[str, Any]]:
+    """Return the header of a cache file, or None if it cannot be trusted."""
+    try:
+        stat = os.stat(cache_file)
+        # Unpickling runs code, so only trust caches we wrote ourselves
+        if hasattr(os, "getuid") and stat.st_uid != os.getuid():
+            return None
+        with open(cache_file, "rb") as f:
+            header = pickle.load(f)
+            if not isinstance(header, dict) or header.get("version") != CACHE_VERSION:
+                return None
+            header["offset"] = f.tell()
+        return header
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        return None
+
+
+def _load_payload(cache_file: str, offset: int) -> Any:
+    with open(cache_file, "rb") as f:
+        f.seek(offset)
+        return pickle.load(f)
+
+
+def _write_cache(cache_file: str, header: Dict[str, Any], inventory: Any):
+    directory = os.path.dirname(cache_file)
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".ftlcache-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(inventory, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_file)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except OSError:
+        pass  # Read-only directory; the cache is only an optimisation
+
+
+def load_inventory_file(inventory_path: str, cache: bool = True) -> Any:
+    """
+    Load an inventory file, using its compiled cache when it is fresh.
+
+    The cache is used without reading the inventory when the file's path,
+    modification time and size match; otherwise, or when the file changed
+    shortly before the cache was written, the content hash decides. The
+    cache is refreshed whenever the fast check fails.
+
+    Args:
+        inventory_path: Path to the YAML inventory
+        cache: Read and write the compiled cache
+
+    Returns:
+        Parsed inventory
+    """
+    path = os.path.abspath(inventory_path)
+    if not cache:
+        with open(path, "rb") as f:
+            return parse_inventory(f.read())
+
+    stat = os.stat(path)
+    key = _file_key(path, stat)
+    cache_file = cache_path(path)
+    header = _read_cache(cache_file)
+
+    if (
+        header is not None
+        and all(header.get(k) == v for k, v in key.items())
+        and header.get("written_ns", 0) - stat.st_mtime_ns > RACY_NS
+    ):
+        try:
+            return _load_payload(cache_file, header["offset"])
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            pass
+
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.blake2b(data, digest_size=20).hexdigest()
+
+    inventory = _MISSING
+    if header is not None and header.get("path") == path and header.get("hash") == digest:
+        # Touched but unchanged
+        try:
+            inventory = _load_payload(cache_file, header["offset"])
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            inventory = _MISSING
+    if inventory is _MISSING:
+        inventory = parse_inventory(data)
+
+    _write_cache(cache_file, dict(key, hash=digest, written_ns=time.time_ns()), inventory)
+    return inventory
+
+
+def dump_inventory(inventory: Any) -> bytes:
+    """Serialize an inventory as YAML.
+
+    A host dict shared between groups is written once and referenced with
+    a YAML alias, so it is still shared when the file is loaded again.
+    """
+    import yaml
+
+    Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    return yaml.dump(inventory, Dumper=Dumper, default_flow_style=False).encode()
+
+
+def save_inventory_file(inventory_path: str, inventory: Any, cache: bool = True):
+    """
+    Write an inventory file atomically and refresh its compiled cache.
+
+    The YAML is written to a temporary file in the same directory and
+    renamed over the inventory, so readers see either the old or the new
+    file, never a partial one. The caller is responsible for locking
+    against other writers, see inventory_writer.InventoryWriter.
+
+    Args:
+        inventory_path: Path to the YAML inventory
+        inventory: Inventory dict to write
+        cache: Also write the compiled cache, saving the next load a parse
+    """
+    path = os.path.abspath(inventory_path)
+    data = dump_inventory(inventory)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".inventory-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(temp_path, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    if cache:
+        digest = hashlib.blake2b(data, digest_size=20).hexdigest()
+        header = dict(_file_key(path, os.stat(path)), hash=digest, written_ns=time.time_ns())
+        _write_cache(cache_path(path), header, inventory)
+
+
+class Inventory(Mapping):
+    """
+    View of an inventory dict with host and group indexes.
+
+    Behaves like the group mapping it wraps. The indexes are built once,
+    so edits made to the wrapped dict directly are not seen until a new
+    Inventory is created; add_host(), remove_host(), update_host() and
+    update_group() edit the dict and update the indexes in place.
+
+    Host patterns are Ansible-style terms separated by ``:`` or ``,``:
+
+    - ``all`` or ``*``: every host
+    - a group or host name
+    - a glob such as ``web*`` or ``db[0-9]``, matched against group and
+      host names
+    - ``~regex``, searched in group and host names
+    - a term prefixed with ``&`` intersects, ``!`` excludes
+
+    Plain terms are unioned first, then intersections and exclusions are
+    applied, so ``web*:&prod:!canary`` is every host in a group or with a
+    name matching ``web*`` that is also in ``prod`` but not in ``canary``.
+    Resolved patterns are cached.
+
+    host_vars() flattens a host's variables: the ``vars`` of ``all``, then
+    those of its other groups in inventory order, then the host's own
+    entries, later ones taking precedence.
+    """
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None):
+        self.data = data if data is not None else {}
+        self.hosts: Dict[str, Any] = {}
+        self.host_groups: Dict[str, List[str]] = {}
+        self.groups: Dict[str, List[str]] = {}
+        for group_name, group in self.data.items():
+            group_hosts = (group or {}).get("hosts") or {}
+            self.groups[group_name] = list(group_hosts)
+            for host_name, host in group_hosts.items():
+                if host is None:
+                    # Give hosts listed without variables a dict of their
+                    # own, so edits through this index reach the data
+                    host = group_hosts[host_name] = self.hosts.get(host_name, {})
+                if host_name in self.host_groups:
+                    self.host_groups[host_name].append(group_name)
+                else:
+                    self.hosts[host_name] = host
+                    self.host_groups[host_name] = [group_name]
+        self.order = {name: i for i, name in enumerate(self.hosts)}
+        self._next_order = len(self.order)
+        self._all = frozenset(self.hosts)
+        self._group_sets = {name: frozenset(hosts) for name, hosts in self.groups.items()}
+        self._sorted_hosts = sorted(self.hosts)
+        self._sorted_groups = sorted(self.groups)
+        self._resolved: Dict[str, FrozenSet[str]] = {}
+        self._limited: Dict[str, Dict[str, Any]] = {}
+        self._flat: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+
+    def __getitem__(self, group_name: str):
+        return self.data[group_name]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def _match_names(self, names: List[str], term: str) -> List[str]:
+        """Return the names in a sorted list matching a glob or ~regex term."""
+        if term.startswith("~"):
+            expression = term[1:]
+            # An anchored literal prefix narrows the search like a glob's
+            prefix = re.match(r"\^([\w\-]*)(?![*?{])", expression)
+            prefix = prefix.group(1) if prefix and "|" not in expression else ""
+            regex = re.compile(expression)
+            return [name for name in self._prefixed(names, prefix) if regex.search(name)]
+
+        # Only names sharing the glob's literal prefix can match
+        prefix = re.split(r"[*?\[]", term, maxsplit=1)[0]
+        candidates = self._prefixed(names, prefix)
+        if term == prefix + "*":
+            return candidates
+        regex = re.compile(fnmatch.translate(term))
+        return [name for name in candidates if regex.match(name)]
+
+    @staticmethod
+    def _prefixed(names: List[str], prefix: str) -> List[str]:
+        """Return the names in a sorted list that start with ``prefix``."""
+        if not prefix:
+            return names
+        start = bisect.bisect_left(names, prefix)
+        end = bisect.bisect_left(names, prefix + "\U0010ffff", start)
+        return names[start:end]
+
+    def _resolve_term(self, term: str) -> FrozenSet[str]:
+        if term in ("all", "*"):
+            return self._all
+        if term in self._group_sets:
+            return self._group_sets[term]
+        if term in self.hosts:
+            return frozenset((term,))
+        if term.startswith("~") or any(c in term for c in "*?["):
+            hosts = set(self._match_names(self._sorted_hosts, term))
+            for group in self._match_names(self._sorted_groups, term):
+                hosts |= self._group_sets[group]
+            return frozenset(hosts)
+        return frozenset()
+
+    def resolve(self, pattern: str) -> FrozenSet[str]:
+        """
+        Return the host names a pattern selects.
+
+        Args:
+            pattern: Host pattern, see the class docstring
+
+        Returns:
+            Set of host names
+        """
+        resolved = self._resolved.get(pattern)
+        if resolved is not None:
+            return resolved
+
+        union: Optional[FrozenSet[str]] = None
+        intersections = []
+        exclusions = []
+        for term in re.split(r"[:,]", pattern):
+            term = term.strip()
+            if not term:
+                continue
+            if term[0] == "&":
+                intersections.append(self._resolve_term(term[1:]))
+            elif term[0] == "!":
+                exclusions.append(self._resolve_term(term[1:]))
+            else:
+                hosts = self._resolve_term(term)
+                union = hosts if union is None else union | hosts
+        if union is None:
+            union = self._all if (intersections or exclusions) else frozenset()
+        for hosts in sorted(intersections, key=len):
+            union = union & hosts
+        for hosts in exclusions:
+            union = union - hosts
+
+        self._resolved[pattern] = union
+        return union
+
+    def subset(self, hosts: Iterable[str]) -> Dict[str, Any]:
+        """
+        Return an inventory dict containing only the given hosts.
+
+        Args:
+            hosts: Host names to keep; names not in the inventory are ignored
+
+        Returns:
+            Inventory dict with the selected hosts in their groups, in
+            inventory order
+        """
+        selected = sorted(
+            (name for name in hosts if name in self.order), key=self.order.__getitem__
+        )
+        subset: Dict[str, Any] = {}
+        for host_name in selected:
+            host = self.hosts[host_name]
+            for group_name in self.host_groups[host_name]:
+                group = subset.get(group_name)
+                if group is None:
+                    group = subset[group_name] = {**(self.data[group_name] or {}), "hosts": {}}
+                group["hosts"][host_name] = host
+        return subset
+
+    def limit(self, pattern: str) -> Dict[str, Any]:
+        """Return the inventory dict restricted to a host pattern (cached)."""
+        limited = self._limited.get(pattern)
+        if limited is None:
+            limited = self._limited[pattern] = self.subset(self.resolve(pattern))
+        return limited
+
+    def host_vars(self, host_name: str) -> Dict[str, Any]:
+        """
+        Return a host's flattened variables.
+
+        Computed on first use and kept until the host or one of its groups
+        changes. The returned dict is shared; use HostVars for a view that
+        can be written to.
+
+        Args:
+            host_name: Host in the inventory
+
+        Returns:
+            Variables from the host's groups and the host itself
+
+        Raises:
+            KeyError: If the host is not in the inventory
+        """
+        flat = self._flat.get(host_name)
+        if flat is None:
+            host = self.hosts[host_name]
+            groups = self.host_groups[host_name]
+            flat = {}
+            if "all" in self.data and "all" not in groups:
+                flat.update((self.data["all"] or {}).get("vars") or {})
+            for group_name in sorted(groups, key=lambda name: name != "all"):
+                flat.update((self.data[group_name] or {}).get("vars") or {})
+            flat.update(host)
+            self._flat[host_name] = flat
+        return flat
+
+    def _changed(self, host_names: Iterable[str]):
+        """Drop cached patterns and the flattened vars of changed hosts."""
+        self._resolved = {}
+        self._limited = {}
+        for host_name in host_names:
+            self._flat.pop(host_name, None)
+
+    def _group(self, group_name: str) -> Dict[str, Any]:
+        """Return a group's dict, creating the group if needed."""
+        group = self.data.get(group_name)
+        if group is None:
+            group = self.data[group_name] = {}
+        if group_name not in self.groups:
+            self.groups[group_name] = []
+            self._group_sets[group_name] = frozenset()
+            bisect.insort(self._sorted_groups, group_name)
+        return group
+
+    def add_host(
+        self,
+        host_name: str,
+        host_vars: Optional[Dict[str, Any]] = None,
+        groups: Iterable[str] = ("all",),
+    ) -> Dict[str, Any]:
+        """
+        Add a host to groups, creating the host and groups as needed.
+
+        An existing host keeps its dict, updated with ``host_vars``, so
+        every group it is in sees the same variables.
+
+        Args:
+            host_name: Host to add
+            host_vars: Variables such as ansible_host for the host
+            groups: Groups to add the host to
+
+        Returns:
+            The host's dict
+        """
+        with self._lock:
+            host = self.hosts.get(host_name)
+            if host is None:
+                host = self.hosts[host_name] = dict(host_vars or {})
+                self.host_groups[host_name] = []
+                self.order[host_name] = self._next_order
+                self._next_order += 1
+                self._all = self._all | {host_name}
+                bisect.insort(self._sorted_hosts, host_name)
+            elif host_vars:
+                host.update(host_vars)
+            for group_name in groups:
+                group = self._group(group_name)
+                members = group.get("hosts")
+                if members is None:
+                    members = group["hosts"] = {}
+                if host_name in members:
+                    continue
+                members[host_name] = host
+                self.groups[group_name].append(host_name)
+                self._group_sets[group_name] = self._group_sets[group_name] | {host_name}
+                self.host_groups[host_name].append(group_name)
+            self._changed((host_name,))
+            return host
+
+    def remove_host(self, host_name: str):
+        """Remove a host from every group; unknown hosts are ignored."""
+        with self._lock:
+            if host_name not in self.hosts:
+                return
+            for group_name in self.host_groups.pop(host_name):
+                del self.data[group_name]["hosts"][host_name]
+                self.groups[group_name].remove(host_name)
+                self._group_sets[group_name] = self._group_sets[group_name] - {host_name}
+            del self.hosts[host_name]
+            del self.order[host_name]
+            self._all = self._all - {host_name}
+            self._sorted_hosts.pop(bisect.bisect_left(self._sorted_hosts, host_name))
+            self._changed((host_name,))
+
+    def update_host(self, host_name: str, **host_vars: Any):
+        """Set variables on a host.
+
+        Raises:
+            KeyError: If the host is not in the inventory
+        """
+        with self._lock:
+            self.hosts[host_name].update(host_vars)
+            self._flat.pop(host_name, None)
+
+    def update_group(self, group_name: str, **group_vars: Any):
+        """Set a group's ``vars``, creating the group if needed.
+
+        Only hosts in the group have their flattened variables recomputed,
+        or every host for ``all``.
+        """
+        with self._lock:
+            group = self._group(group_name)
+            if group.get("vars") is None:
+                group["vars"] = {}
+            group["vars"].update(group_vars)
+            if group_name == "all":
+                self._flat = {}
+            else:
+                for host_name in self.groups[group_name]:
+                    self._flat.pop(host_name, None)
+
+    def signature(self) -> Tuple:
+        """Cheap fingerprint of the wrapped dict's group and host membership."""
+        return inventory_signature(self.data)
+
+
+class HostVars(Mapping):
+    """
+    Per-host variables with extra vars layered on top.
+
+    ``hostvars[name]`` is a ChainMap of a fresh dict, the extra vars and
+    the host's flattened variables, so nothing is copied per host and
+    writes land only in that host's view.
+
+    Args:
+        inventory: Indexed inventory
+        extra_vars: Variables overriding every host's, e.g. from ``-e``
+    """
+
+    def __init__(self, inventory: Inventory, extra_vars: Optional[Dict[str, Any]] = None):
+        self.inventory = inventory
+        self.extra_vars = extra_vars or {}
+
+    def __getitem__(self, host_name: str) -> ChainMap:
+        return ChainMap({}, self.extra_vars, self.inventory.host_vars(host_name))
+
+    def __iter__(self):
+        return iter(self.inventory.hosts)
+
+    def __len__(self):
+        return len(self.inventory.hosts)
+
+    def __contains__(self, host_name):
+        return host_name in self.inventory.hosts
+
+
+def inventory_signature(data: Dict[str, Any]) -> Tuple:
+    """Return a fingerprint that changes when groups or their host dicts change.
+
+    Only identities and sizes are compared, so the cost is proportional to
+    the number of groups, not hosts. Replacing a host with another one in
+    place without changing the group size is not detected.
+    """
+    return tuple(
+        (name, id(hosts), len(hosts))
+        for name, group in data.items()
+        for hosts in [((group or {}).get("hosts") or {})]
+    )
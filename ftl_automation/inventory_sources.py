@@ -0,0 +1,404 @@
+"""
+Dynamic inventory sources.
+
+An inventory can be assembled from several sources: executable scripts
+printing Ansible-style JSON, directories of YAML fragments and SQLite
+databases standing in for a CMDB. DynamicInventory fetches the sources
+concurrently, keeps each result on disk for a TTL so short runs do not
+query every source again, and merges them into one inventory dict.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import subprocess
+import tempfile
+import time
+import concurrent.futures
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+from .inventory import load_inventory_file
+
+# Bumped when the layout of cached source results changes
+CACHE_VERSION = 1
+
+
+def default_cache_dir() -> str:
+    """Return the directory where fetched sources are cached."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "ftl-automation", "inventory")
+
+
+def normalize_inventory(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert Ansible dynamic inventory JSON to the inventory format.
+
+    Groups may list their hosts as a list or a mapping, and host variables
+    may be given under ``_meta.hostvars``. Each host gets one dict shared
+    by every group it is in.
+
+    Args:
+        data: Parsed ``--list`` output
+
+    Returns:
+        Inventory dict of groups with ``hosts`` mappings
+    """
+    hostvars = (data.get("_meta") or {}).get("hostvars") or {}
+    hosts: Dict[str, Dict[str, Any]] = {}
+
+    def host(name: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if name not in hosts:
+            hosts[name] = dict(hostvars.get(name) or {})
+        if variables:
+            hosts[name].update(variables)
+        return hosts[name]
+
+    inventory: Dict[str, Any] = {}
+    for group_name, group in data.items():
+        if group_name == "_meta":
+            continue
+        if isinstance(group, list):
+            group = {"hosts": group}
+        group = dict(group or {})
+        members = group.get("hosts") or {}
+        if isinstance(members, list):
+            group["hosts"] = {name: host(name) for name in members}
+        else:
+            group["hosts"] = {name: host(name, variables) for name, variables in members.items()}
+        inventory[group_name] = group
+    return inventory
+
+
+def merge_inventories(inventories: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge inventory dicts into one.
+
+    Groups with the same name are combined. A host appearing in several
+    inventories keeps a single dict, with variables from later inventories
+    taking precedence, as do later group ``vars``.
+
+    Args:
+        inventories: Inventory dicts in increasing order of precedence
+
+    Returns:
+        Merged inventory dict
+    """
+    merged: Dict[str, Any] = {}
+    hosts: Dict[str, Dict[str, Any]] = {}
+    for inventory in inventories:
+        for group_name, group in (inventory or {}).items():
+            group = group or {}
+            target = merged.get(group_name)
+            if target is None:
+                target = merged[group_name] = {"hosts": {}}
+            for key, value in group.items():
+                if key == "hosts":
+                    continue
+                if key == "vars" and isinstance(target.get("vars"), dict):
+                    target["vars"].update(value or {})
+                else:
+                    target[key] = dict(value) if isinstance(value, dict) else value
+            for host_name, variables in (group.get("hosts") or {}).items():
+                host = hosts.get(host_name)
+                if host is None:
+                    host = hosts[host_name] = {}
+                if variables:
+                    host.update(variables)
+                target["hosts"][host_name] = host
+    return merged
+
+
+class InventorySource:
+    """
+    Base class for inventory sources.
+
+    Subclasses implement fetch() and key(); fetch() is called from a
+    worker thread, so it may block. Sources that are cheap to read again
+    and should reflect edits immediately set ``cacheable`` to False.
+    """
+
+    cacheable = True
+
+    def key(self) -> str:
+        """Return a string identifying the source for caching."""
+        raise NotImplementedError
+
+    def fetch(self) -> Dict[str, Any]:
+        """Return the source's current inventory dict."""
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.key()!r})"
+
+
+class ScriptSource(InventorySource):
+    """
+    Executable printing Ansible dynamic inventory JSON.
+
+    Args:
+        path: Script to run
+        args: Arguments passed to it
+        timeout: Seconds the script may run
+    """
+
+    def __init__(self, path: str, args: Sequence[str] = ("--list",), timeout: float = 60):
+        self.path = os.path.abspath(path)
+        self.args = list(args)
+        self.timeout = timeout
+
+    def key(self) -> str:
+        return "script:" + " ".join([self.path] + self.args)
+
+    def fetch(self) -> Dict[str, Any]:
+        result = subprocess.run(
+            [self.path] + self.args,
+            capture_output=True, check=True, timeout=self.timeout,
+        )
+        return normalize_inventory(json.loads(result.stdout or b"{}"))
+
+
+class DirectorySource(InventorySource):
+    """
+    Directory of YAML inventory fragments merged in file name order.
+
+    Each fragment is loaded through the compiled inventory cache, so
+    unchanged fragments are not parsed again and the TTL cache is not
+    used.
+
+    Args:
+        path: Directory to read
+        suffixes: File name endings of the fragments
+    """
+
+    cacheable = False
+
+    def __init__(self, path: str, suffixes: Sequence[str] = (".yml", ".yaml")):
+        self.path = os.path.abspath(path)
+        self.suffixes = tuple(suffixes)
+
+    def key(self) -> str:
+        return "directory:" + self.path
+
+    def fetch(self) -> Dict[str, Any]:
+        names = sorted(
+            entry.name for entry in os.scandir(self.path)
+            if entry.is_file() and entry.name.endswith(self.suffixes)
+            and not entry.name.startswith(".")
+        )
+        return merge_inventories(
+            load_inventory_file(os.path.join(self.path, name)) for name in names
+        )
+
+
+class SQLiteSource(InventorySource):
+    """
+    SQLite database of hosts, e.g. a local CMDB export.
+
+    The query returns one row per host and group: the host name, the group
+    name and the host's variables as a JSON object (or NULL).
+
+    Args:
+        path: Database file
+        query: SQL selecting host, group and variables
+    """
+
+    DEFAULT_QUERY = "SELECT host, group_name, vars FROM inventory"
+
+    def __init__(self, path: str, query: str = DEFAULT_QUERY):
+        self.path = os.path.abspath(path)
+        self.query = query
+
+    def key(self) -> str:
+        return f"sqlite:{self.path}:{self.query}"
+
+    def fetch(self) -> Dict[str, Any]:
+        import sqlite3
+
+        connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            rows = connection.execute(self.query).fetchall()
+        finally:
+            connection.close()
+        inventory: Dict[str, Any] = {}
+        hosts: Dict[str, Dict[str, Any]] = {}
+        for host_name, group_name, variables in rows:
+            host = hosts.get(host_name)
+            if host is None:
+                host = hosts[host_name] = {}
+            if variables:
+                host.update(json.loads(variables))
+            inventory.setdefault(group_name or "all", {"hosts": {}})["hosts"][host_name] = host
+        return inventory
+
+
+class FileSource(InventorySource):
+    """Static YAML inventory file, loaded through the compiled cache."""
+
+    cacheable = False
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+
+    def key(self) -> str:
+        return "file:" + self.path
+
+    def fetch(self) -> Dict[str, Any]:
+        return load_inventory_file(self.path) or {}
+
+
+def _is_script(path: str) -> bool:
+    """Return True for an executable file starting with a ``#!`` line."""
+    if not (os.path.isfile(path) and os.access(path, os.X_OK)):
+        return False
+    try:
+        with open(path, "rb") as f:
+            return f.read(2) == b"#!"
+    except OSError:
+        return False
+
+
+def inventory_source(spec: Union[str, InventorySource]) -> InventorySource:
+    """
+    Return the source for a path.
+
+    Directories are read as YAML fragments, executables with a ``#!``
+    line are run as scripts, ``.db``, ``.sqlite`` and ``.sqlite3`` files
+    are queried and anything else is loaded as a static YAML file, so a
+    YAML inventory that merely has its executable bit set still loads.
+
+    Args:
+        spec: Path, or a source which is returned unchanged
+    """
+    if isinstance(spec, InventorySource):
+        return spec
+    if os.path.isdir(spec):
+        return DirectorySource(spec)
+    if spec.endswith((".db", ".sqlite", ".sqlite3")):
+        return SQLiteSource(spec)
+    if _is_script(spec):
+        return ScriptSource(spec)
+    return FileSource(spec)
+
+
+class DynamicInventory:
+    """
+    Inventory merged from several sources, refreshed concurrently.
+
+    Each source's result is pickled in ``cache_dir`` and reused for
+    ``ttl`` seconds. Stale sources are fetched in parallel; a source that
+    fails falls back to its last cached result when there is one.
+
+    Args:
+        sources: Sources or paths (see inventory_source()), in increasing
+            order of precedence
+        ttl: Seconds a fetched source stays fresh (0 disables the cache)
+        cache_dir: Directory for cached results (defaults to
+            ~/.cache/ftl-automation/inventory)
+        max_workers: Sources fetched at once (defaults to all of them)
+    """
+
+    def __init__(
+        self,
+        sources: Iterable[Union[str, InventorySource]],
+        ttl: float = 300,
+        cache_dir: Optional[str] = None,
+        max_workers: Optional[int] = None,
+    ):
+        self.sources: List[InventorySource] = [inventory_source(s) for s in sources]
+        self.ttl = ttl
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_workers = max_workers
+        self.errors: Dict[str, BaseException] = {}
+
+    def _cache_file(self, source: InventorySource) -> str:
+        digest = hashlib.blake2b(source.key().encode(), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.pickle")
+
+    def _read_cache(self, source: InventorySource) -> Optional[Dict[str, Any]]:
+        cache_file = self._cache_file(source)
+        try:
+            # Unpickling runs code, so only trust caches we wrote ourselves
+            if hasattr(os, "getuid") and os.stat(cache_file).st_uid != os.getuid():
+                return None
+            with open(cache_file, "rb") as f:
+                entry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("version") != CACHE_VERSION:
+            return None
+        if entry.get("key") != source.key():
+            return None
+        return entry
+
+    def _write_cache(self, source: InventorySource, inventory: Dict[str, Any]):
+        entry = {
+            "version": CACHE_VERSION,
+            "key": source.key(),
+            "fetched": time.time(),
+            "inventory": inventory,
+        }
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".source-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_path, self._cache_file(source))
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError:
+            pass  # The cache is only an optimisation
+
+    def load(self, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Return the merged inventory.
+
+        Args:
+            refresh: Fetch every source even if its cached result is fresh
+
+        Returns:
+            Inventory dict
+
+        Raises:
+            Exception: The error of a source that failed and has no cached
+                result to fall back to
+        """
+        self.errors = {}
+        now = time.time()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(self.sources)
+        cached: Dict[int, Dict[str, Any]] = {}
+        stale = []
+        for i, source in enumerate(self.sources):
+            use_cache = self.ttl > 0 and source.cacheable
+            entry = self._read_cache(source) if use_cache else None
+            if entry is not None:
+                cached[i] = entry
+                if not refresh and now - entry["fetched"] < self.ttl:
+                    results[i] = entry["inventory"]
+                    continue
+            stale.append(i)
+
+        if stale:
+            workers = self.max_workers or len(stale)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(self.sources[i].fetch): i for i in stale}
+                for future in concurrent.futures.as_completed(futures):
+                    i = futures[future]
+                    source = self.sources[i]
+                    try:
+                        results[i] = future.result()
+                    except Exception as e:
+                        if i not in cached:
+                            raise
+                        self.errors[source.key()] = e
+                        print(f"Warning: using cached inventory for {source!r}: {e}")
+                        results[i] = cached[i]["inventory"]
+                        continue
+                    if self.ttl > 0 and source.cacheable:
+                        self._write_cache(source, results[i])
+
+        if len(results) == 1:
+            return results[0] or {}
+        return merge_inventories(results)
@@ -0,0 +1,183 @@
+"""
+Batched, atomic write-back of inventory changes.
+
+Provisioning many hosts in parallel would otherwise rewrite the inventory
+file once per host. InventoryWriter queues host and group changes and
+flushes them together shortly after the last one, re-reading the file
+under an advisory lock so changes written by other processes are kept.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .inventory import Inventory, load_inventory_file, save_inventory_file
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+def lock_path(inventory_path: str) -> str:
+    """Return the lock file kept next to an inventory file."""
+    directory, name = os.path.split(os.path.abspath(inventory_path))
+    return os.path.join(directory, f".{name}.lock")
+
+
+@contextmanager
+def locked(inventory_path: str):
+    """
+    Hold an exclusive advisory lock on an inventory file.
+
+    A separate lock file is locked because the inventory itself is
+    replaced on every write. Without fcntl (Windows) no lock is taken.
+
+    Args:
+        inventory_path: Path to the YAML inventory
+    """
+    if fcntl is None:
+        yield
+        return
+    fd = os.open(lock_path(inventory_path), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)  # Releases the lock
+
+
+class InventoryWriter:
+    """
+    Queue inventory changes and write them back in batches.
+
+    Each change schedules a flush ``delay`` seconds later; further changes
+    push it back, but never more than ``max_delay`` after the first
+    pending change. A flush locks the file, re-reads it, applies every
+    pending change and replaces it atomically, so concurrent provisioning
+    costs one write per batch and other writers' changes are not lost.
+
+    Args:
+        inventory_path: Path to the YAML inventory
+        delay: Seconds of quiet before pending changes are written
+        max_delay: Longest time a change may stay pending
+    """
+
+    def __init__(self, inventory_path: str, delay: float = 0.2, max_delay: float = 2.0):
+        self.inventory_path = inventory_path
+        self.delay = delay
+        self.max_delay = max_delay
+        self.flushes = 0
+        self.error: Optional[BaseException] = None
+        self._pending: List[Tuple] = []
+        self._first_pending = 0.0
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def add_host(
+        self,
+        host_name: str,
+        host_vars: Optional[Dict[str, Any]] = None,
+        groups: Iterable[str] = ("all",),
+    ):
+        """Queue adding a host, see inventory.Inventory.add_host()."""
+        self._queue(("add_host", host_name, dict(host_vars or {}), tuple(groups)))
+
+    def remove_host(self, host_name: str):
+        """Queue removing a host from every group."""
+        self._queue(("remove_host", host_name))
+
+    def update_host(self, host_name: str, **host_vars: Any):
+        """Queue setting variables on a host."""
+        self._queue(("add_host", host_name, host_vars, ()))
+
+    def update_group(self, group_name: str, **group_vars: Any):
+        """Queue setting variables on a group."""
+        self._queue(("update_group", group_name, group_vars))
+
+    def _queue(self, change: Tuple):
+        with self._lock:
+            now = time.monotonic()
+            if not self._pending:
+                self._first_pending = now
+            self._pending.append(change)
+            if self._timer is not None:
+                self._timer.cancel()
+            wait = min(self.delay, max(0.0, self._first_pending + self.max_delay - now))
+            self._timer = threading.Timer(wait, self._flush_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    @staticmethod
+    def _apply(inventory: Inventory, change: Tuple):
+        kind, name, *args = change
+        if kind == "add_host":
+            host_vars, groups = args
+            if groups or name in inventory.hosts:
+                inventory.add_host(name, host_vars, groups)
+        elif kind == "remove_host":
+            inventory.remove_host(name)
+        elif kind == "update_group":
+            inventory.update_group(name, **args[0])
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        except Exception as e:
+            # Reported by close(); the changes stay queued for the next flush
+            self.error = e
+
+    def flush(self) -> int:
+        """
+        Write all pending changes now.
+
+        Returns:
+            Number of changes written
+
+        Raises:
+            OSError: If the inventory cannot be read or written; the
+                changes stay pending
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not pending:
+                return 0
+            try:
+                with locked(self.inventory_path):
+                    if os.path.exists(self.inventory_path):
+                        data = load_inventory_file(self.inventory_path) or {}
+                    else:
+                        data = {}
+                    inventory = Inventory(data)
+                    for change in pending:
+                        self._apply(inventory, change)
+                    save_inventory_file(self.inventory_path, inventory.data)
+            except BaseException:
+                with self._lock:
+                    self._pending[:0] = pending
+                raise
+            self.flushes += 1
+            return len(pending)
+
+    def close(self):
+        """
+        Flush pending changes and stop the background timer.
+
+        Raises:
+            Exception: The error of a failed background flush, if the
+                final flush cannot write the changes either
+        """
+        try:
+            self.flush()
+        except Exception:
+            if self.error is not None:
+                raise self.error
+            raise
+        self.error = None
@@ -0,0 +1,235 @@
+"""
+Dependency-graph scheduling of tool calls.
+
+A plan collects tool calls as nodes with explicit ``after=`` dependencies
+and runs every node whose dependencies are satisfied concurrently on the
+context's event loop.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from .context import _running_loop
+from .exceptions import PlanError
+
+
+class PlanNode:
+    """A tool call registered in a Plan."""
+
+    def __init__(
+        self,
+        index: int,
+        tool_name: str,
+        tool: Callable,
+        kwargs: Dict[str, Any],
+        after: List["PlanNode"],
+        hosts: Optional[List[str]],
+    ):
+        self.index = index
+        self.tool_name = tool_name
+        self.tool = tool
+        self.kwargs = kwargs
+        self.after = after
+        self.hosts = hosts
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        """Seconds the node took to run, 0.0 if it did not run."""
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+    def __repr__(self):
+        return f"<PlanNode {self.index}: {self.tool_name}>"
+
+
+class Plan:
+    """
+    Builder and executor for a graph of tool calls.
+
+    Nodes are added with ``plan.add("tool", after=[...], **kwargs)`` or
+    ``plan.<tool>(after=[...], **kwargs)``. Nodes pinned to hosts with
+    ``hosts=`` also run in registration order on each host they share, so
+    steps on one machine keep their script order without extra ``after=``.
+    Nodes that run on the whole inventory are only ordered by ``after=``.
+    """
+
+    def __init__(self, context):
+        self.context = context
+        self.nodes: List[PlanNode] = []
+
+    def add(
+        self,
+        tool: Union[str, Callable],
+        *,
+        after: Iterable[PlanNode] = (),
+        hosts: Optional[Iterable[str]] = None,
+        **kwargs
+    ) -> PlanNode:
+        """
+        Register a tool call.
+
+        Args:
+            tool: Tool name or tool instance
+            after: Nodes that must finish before this one starts
+            hosts: Host names to run on (defaults to the whole inventory).
+                The node also runs after the last node pinned to any of
+                these hosts. Nodes without ``hosts`` get no such implicit
+                ordering, neither among themselves nor with pinned nodes.
+            **kwargs: Tool parameters
+
+        Returns:
+            The registered PlanNode
+        """
+        if isinstance(tool, str):
+            tool_name = tool
+            # Applies the tool's tool_options and hooks like a direct call
+            tool = self.context._lookup_tool(tool_name)
+        else:
+            tool_name = getattr(tool, "name", None) or repr(tool)
+
+        after = list(after)
+        for node in after:
+            if node not in self.nodes:
+                raise ValueError(f"{node!r} does not belong to this plan")
+
+        if hosts is not None:
+            hosts = list(hosts)
+            pinned = set(hosts)
+            for node in reversed(self.nodes):
+                if node.hosts is not None and pinned & set(node.hosts):
+                    if node not in after:
+                        after.append(node)
+                    pinned -= set(node.hosts)
+                    if not pinned:
+                        break
+
+        node = PlanNode(len(self.nodes), tool_name, tool, kwargs, after, hosts)
+        self.nodes.append(node)
+        return node
+
+    def __getattr__(self, name: str):
+        """Allow plan.dnf(name="nginx", after=[...])"""
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def add(**kwargs):
+            return self.add(name, **kwargs)
+
+        return add
+
+    async def _run_node(self, node: PlanNode):
+        options = {} if node.hosts is None else {"hosts": node.hosts}
+        node.started = time.perf_counter()
+        try:
+            with self.context.options(**options):
+                node.result = await self.context.call_tool_async(node.tool, **node.kwargs)
+        except Exception as e:
+            node.error = e
+        finally:
+            node.finished = time.perf_counter()
+
+    async def run_async(self, report: bool = False) -> Dict[PlanNode, Any]:
+        """
+        Run the plan on the running event loop.
+
+        Nodes whose dependencies failed are skipped; independent branches
+        still run to completion.
+
+        Args:
+            report: Print the critical path when the plan finishes
+
+        Returns:
+            Dictionary of node to tool result
+
+        Raises:
+            PlanError: If any node failed or was skipped
+        """
+        waiting = {node: len(set(node.after)) for node in self.nodes}
+        dependents: Dict[PlanNode, List[PlanNode]] = {node: [] for node in self.nodes}
+        for node in self.nodes:
+            for dependency in set(node.after):
+                dependents[dependency].append(node)
+
+        skipped = set()
+        running = {}
+
+        def start(node):
+            running[asyncio.ensure_future(self._run_node(node))] = node
+
+        def skip(node):
+            skipped.add(node)
+            for dependent in dependents[node]:
+                if dependent not in skipped:
+                    skip(dependent)
+
+        for node in self.nodes:
+            if waiting[node] == 0:
+                start(node)
+
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                node = running.pop(task)
+                if node.error is not None:
+                    for dependent in dependents[node]:
+                        if dependent not in skipped:
+                            skip(dependent)
+                    continue
+                for dependent in dependents[node]:
+                    waiting[dependent] -= 1
+                    if waiting[dependent] == 0 and dependent not in skipped:
+                        start(dependent)
+
+        if report:
+            self.report()
+
+        failed = [node for node in self.nodes if node.error is not None]
+        if failed or skipped:
+            raise PlanError(failed, [node for node in self.nodes if node in skipped])
+
+        return {node: node.result for node in self.nodes}
+
+    def run(self, report: bool = False) -> Dict[PlanNode, Any]:
+        """Run the plan on the context's event loop and wait for it to finish."""
+        if _running_loop() is self.context.loop:
+            raise RuntimeError(
+                "plan.run() would block the event loop; "
+                "use 'await plan.run_async()' instead"
+            )
+        return asyncio.run_coroutine_threadsafe(
+            self.run_async(report=report), self.context.loop
+        ).result()
+
+    def critical_path(self) -> List[PlanNode]:
+        """Return the chain of dependent nodes with the longest total duration."""
+        finish = {}
+        previous = {}
+        for node in self.nodes:
+            longest = max(node.after, key=lambda n: finish[n], default=None)
+            previous[node] = longest
+            finish[node] = node.duration + (finish[longest] if longest else 0.0)
+
+        node = max(self.nodes, key=lambda n: finish[n], default=None)
+        path = []
+        while node is not None:
+            path.append(node)
+            node = previous[node]
+        return list(reversed(path))
+
+    def report(self):
+        """Print the critical path of the last run."""
+        path = self.critical_path()
+        total = sum(node.duration for node in self.nodes)
+        length = sum(node.duration for node in path)
+        self.context.print(
+            f"[bold]Critical path[/bold] {length:.2f}s "
+            f"(sum of all steps {total:.2f}s, {len(self.nodes)} steps)"
+        )
+        for node in path:
+            self.context.print(f"  {node.duration:8.2f}s  {node.tool_name} {node.kwargs}")
@@ -0,0 +1,111 @@
+"""
+Masking of secret values in output.
+
+Redactor finds every occurrence of any known secret in one left-to-right
+pass. The secrets are arranged in a trie, as in Aho-Corasick, and the trie
+is compiled into a single regular expression whose alternatives share
+their prefixes, so the scan runs in the C regex engine and each position
+is matched against at most one branch per character instead of against
+every secret.
+"""
+
+import re
+from typing import Any, Dict, Iterable, Optional
+
+MASK = "********"
+
+# Shorter values would mask too much unrelated output
+MIN_SECRET_LENGTH = 4
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """
+    Return a regular expression matching any of ``words``.
+
+    The expression mirrors a trie of the words, preferring the longest
+    word where one is a prefix of another.
+
+    Args:
+        words: Strings to match literally
+
+    Returns:
+        Regular expression source, empty if there are no words
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        # Runs of single-child nodes become plain literals, so recursion is
+        # only as deep as the number of branch points on a path
+        literal = []
+        while len(node) == 1 and "" not in node:
+            (char, node), = node.items()
+            literal.append(re.escape(char))
+        prefix = "".join(literal)
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return prefix
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return prefix + "(?:" + body + ")?"
+        return prefix + body
+
+    return build(trie) if trie else ""
+
+
+class Redactor:
+    """
+    Replace secret values in strings and result data with a mask.
+
+    Args:
+        secrets: Secret values to mask; values shorter than
+            ``min_length`` are ignored
+        mask: Replacement text
+        min_length: Shortest value that is masked
+    """
+
+    def __init__(
+        self,
+        secrets: Iterable[Any] = (),
+        mask: str = MASK,
+        min_length: int = MIN_SECRET_LENGTH,
+    ):
+        self.mask = mask
+        self.secrets = frozenset(
+            str(value) for value in secrets
+            if value is not None and len(str(value)) >= min_length
+        )
+        pattern = trie_pattern(self.secrets)
+        self._regex: Optional[re.Pattern] = re.compile(pattern) if pattern else None
+
+    def __bool__(self):
+        return self._regex is not None
+
+    def redact(self, text: str) -> str:
+        """Return ``text`` with every secret replaced by the mask."""
+        if self._regex is None:
+            return text
+        return self._regex.sub(self.mask, text)
+
+    def redact_data(self, data: Any) -> Any:
+        """
+        Return a copy of result data with secrets masked in every string.
+
+        Dicts, lists and tuples are copied, strings are redacted and other
+        values are returned unchanged.
+        """
+        if self._regex is None:
+            return data
+        if isinstance(data, str):
+            return self._regex.sub(self.mask, data)
+        if isinstance(data, dict):
+            return {self.redact_data(k): self.redact_data(v) for k, v in data.items()}
+        if isinstance(data, list):
+            return [self.redact_data(item) for item in data]
+        if isinstance(data, tuple):
+            return tuple(self.redact_data(item) for item in data)
+        return data
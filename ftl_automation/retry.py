@@ -0,0 +1,148 @@
+"""
+Retry policies for module executions.
+
+A RetryPolicy retries a host's module call when it fails transiently,
+sleeping with exponential backoff and jitter between attempts. A
+RetryBudget shared by every call in a run caps how many retries the run
+may add on top of its first attempts, so an outage does not turn into a
+retry storm against the hosts or mirrors that are already struggling.
+"""
+
+import asyncio
+import random
+from typing import Any, Awaitable, Callable, Optional
+
+
+def is_transient(outcome: Any) -> bool:
+    """Default retry predicate: connection errors and unreachable hosts.
+
+    Args:
+        outcome: The host's module result or the exception it raised
+    """
+    if isinstance(outcome, (OSError, EOFError)):
+        return True
+    if isinstance(outcome, Exception):
+        return type(outcome).__module__.startswith("asyncssh")
+    if isinstance(outcome, dict):
+        return bool(outcome.get("unreachable"))
+    return False
+
+
+class RetryBudget:
+    """
+    Run-wide limit on retries.
+
+    Retries are allowed while they stay below ``min_retries`` plus
+    ``ratio`` times the number of first attempts made so far, so a healthy
+    run can retry freely while a run where most hosts fail cannot multiply
+    its load.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10):
+        if ratio < 0 or min_retries < 0:
+            raise ValueError("ratio and min_retries must not be negative")
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.attempts = 0
+        self.retries = 0
+
+    def record_attempt(self):
+        """Count a first attempt, which earns ``ratio`` of a retry."""
+        self.attempts += 1
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget, returning False if it is spent."""
+        if self.retries >= self.min_retries + self.ratio * self.attempts:
+            return False
+        self.retries += 1
+        return True
+
+    def __repr__(self):
+        return f"<RetryBudget {self.retries} retries for {self.attempts} attempts>"
+
+
+class RetryPolicy:
+    """
+    How often and how patiently to retry a host's module call.
+
+    The n-th retry (counting from 0) waits ``backoff * 2**n`` seconds,
+    capped at ``max_backoff``; with ``jitter`` the wait is drawn uniformly
+    from zero up to that value so retries from many hosts spread out.
+
+    Args:
+        retries: Retries after the first attempt
+        backoff: Seconds to wait before the first retry
+        max_backoff: Upper bound on the wait between attempts
+        jitter: Randomise each wait between zero and its backoff
+        retry_on: Called with the host's result or exception, returns True
+            when it is worth retrying (defaults to is_transient)
+    """
+
+    def __init__(
+        self,
+        retries: int = 3,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        jitter: bool = True,
+        retry_on: Optional[Callable[[Any], bool]] = None,
+    ):
+        if retries < 0:
+            raise ValueError("retries must not be negative")
+        if backoff < 0 or max_backoff < 0:
+            raise ValueError("backoff and max_backoff must not be negative")
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_on = retry_on or is_transient
+
+    def delay(self, retry: int) -> float:
+        """Return the seconds to wait before the given retry."""
+        delay = min(self.max_backoff, self.backoff * 2 ** retry)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def _should_retry(self, retry: int, outcome: Any, budget: Optional[RetryBudget]) -> bool:
+        if retry >= self.retries or not self.retry_on(outcome):
+            return False
+        return budget is None or budget.try_spend()
+
+    async def run(
+        self,
+        attempt: Callable[[], Awaitable[Any]],
+        budget: Optional[RetryBudget] = None,
+    ) -> Any:
+        """
+        Await ``attempt()`` until it succeeds or retrying is not allowed.
+
+        Args:
+            attempt: Coroutine function making one attempt
+            budget: Run-wide budget retries are drawn from
+
+        Returns:
+            The result of the last attempt
+
+        Raises:
+            Exception: The last attempt's exception when it is not retried
+        """
+        if budget is not None:
+            budget.record_attempt()
+        retry = 0
+        while True:
+            try:
+                outcome = await attempt()
+            except Exception as e:
+                if not self._should_retry(retry, e, budget):
+                    raise
+            else:
+                if not self._should_retry(retry, outcome, budget):
+                    return outcome
+            await asyncio.sleep(self.delay(retry))
+            retry += 1
+
+    def __repr__(self):
+        return (
+            f"RetryPolicy(retries={self.retries}, backoff={self.backoff}, "
+            f"max_backoff={self.max_backoff}, jitter={self.jitter})"
+        )
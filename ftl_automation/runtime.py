@@ -0,0 +1,152 @@
+"""
+Event loop, worker threads and gate pool shared by automation contexts.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from .gates import DEFAULT_CLOSE_TIMEOUT, DEFAULT_IDLE_TIMEOUT, GatePool
+
+# Default number of threads used to run tool calls concurrently
+DEFAULT_WORKERS = 32
+
+
+class Runtime:
+    """
+    Execution resources that one or more automation contexts run on.
+
+    A runtime owns an event loop (on a daemon thread unless an existing
+    loop is given), the thread pool tool calls run on, and the GatePool
+    holding open gates. Contexts acquire a reference on entry and release
+    it on exit; the runtime is torn down when the last reference goes
+    away, so contexts opened against the same runtime share connections.
+    Gates are pooled by connection target, so inventories that use the
+    same host alias for different machines each get their own gate::
+
+        with Runtime() as runtime:
+            with automation(inventory="staging.yml", runtime=runtime) as staging:
+                ...
+            with automation(inventory="prod.yml", runtime=runtime) as prod:
+                ...
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        gate_idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT,
+        max_connections_per_host: Optional[int] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ):
+        if loop is None:
+            self.loop = asyncio.new_event_loop()
+            self.thread = threading.Thread(
+                target=self.loop.run_forever, name="ftl-automation-loop", daemon=True
+            )
+            self.thread.start()
+        else:
+            self.loop = loop
+            self.thread = None
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="ftl-automation"
+        )
+        self.gate_pool = GatePool(gate_idle_timeout, max_connections_per_host)
+        self.gate_pool.start(self.loop)
+        self.closed = False
+        self._refs = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> "Runtime":
+        """Take a reference on the runtime."""
+        with self._lock:
+            if self.closed:
+                raise RuntimeError("Runtime is closed")
+            self._refs += 1
+        return self
+
+    def _drop(self) -> bool:
+        """Drop a reference, returning True if it was the last one."""
+        with self._lock:
+            self._refs -= 1
+            if self._refs > 0 or self.closed:
+                return False
+            self.closed = True
+            return True
+
+    def release(self):
+        """Drop a reference, closing the runtime when it was the last one."""
+        if self._drop():
+            self._close()
+
+    async def release_async(self):
+        """Drop a reference from a coroutine, see release()."""
+        if self._drop():
+            await self._close_async()
+
+    def _close(self):
+        if self.thread is None:
+            raise RuntimeError("a runtime on an existing loop must be released with release_async()")
+        future = asyncio.run_coroutine_threadsafe(
+            self.gate_pool.close(DEFAULT_CLOSE_TIMEOUT), self.loop
+        )
+        try:
+            future.result(timeout=DEFAULT_CLOSE_TIMEOUT + 1.0)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+        self._stop()
+
+    async def _close_async(self):
+        if self.thread is None:
+            await self.gate_pool.close(DEFAULT_CLOSE_TIMEOUT)
+        else:
+            await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(
+                    self.gate_pool.close(DEFAULT_CLOSE_TIMEOUT), self.loop
+                )
+            )
+        self._stop()
+
+    def _stop(self):
+        self.executor.shutdown(wait=False)
+        if self.thread is not None:
+            try:
+                self.loop.call_soon_threadsafe(self.loop.stop)
+                self.thread.join(timeout=1.0)  # Give thread time to stop gracefully
+            except RuntimeError:
+                pass  # Loop already closed
+
+    def __enter__(self) -> "Runtime":
+        return self.acquire()
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    async def __aenter__(self) -> "Runtime":
+        return self.acquire()
+
+    async def __aexit__(self, *exc_info):
+        await self.release_async()
+
+
+_shared_runtime: Optional[Runtime] = None
+_shared_lock = threading.Lock()
+
+
+def shared_runtime(**kwargs) -> Runtime:
+    """Return the process-wide runtime, creating it if needed.
+
+    Contexts opened with ``automation(runtime=shared_runtime())`` share one
+    event loop and gate pool. The runtime is torn down when the last
+    context using it exits; hold it open across sequential contexts with
+    ``with shared_runtime():``.
+
+    Args:
+        **kwargs: Runtime arguments, used only when a new runtime is created
+    """
+    global _shared_runtime
+    with _shared_lock:
+        if _shared_runtime is None or _shared_runtime.closed:
+            _shared_runtime = Runtime(**kwargs)
+        return _shared_runtime
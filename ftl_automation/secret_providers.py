@@ -0,0 +1,278 @@
+"""
+Secret providers and lazily resolved secrets.
+
+``automation(secrets=[...])`` names the secrets a run needs; their values
+come from providers (environment variables, a Fernet-encrypted file, an
+external command) and are only looked up when first used. Values are
+cached for a TTL, and a lookup fetches every declared secret that is not
+cached yet in one batch, concurrently for providers that are slow per
+lookup, so dozens of secrets cost about one round trip.
+"""
+
+import json
+import os
+import shlex
+import subprocess
+import threading
+import time
+import concurrent.futures
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+from .exceptions import SecretError
+
+
+class SecretProvider:
+    """
+    Base class for secret providers.
+
+    Subclasses implement get(); get_many() looks names up one at a time
+    unless overridden. Both return None for secrets the provider does not
+    have, so the next provider is tried.
+    """
+
+    def get(self, name: str) -> Optional[str]:
+        """Return a secret's value, or None if this provider lacks it."""
+        raise NotImplementedError
+
+    def get_many(self, names: Sequence[str]) -> Dict[str, Optional[str]]:
+        """Return the values of several secrets."""
+        return {name: self.get(name) for name in names}
+
+
+class EnvProvider(SecretProvider):
+    """
+    Secrets from environment variables.
+
+    Args:
+        prefix: Prepended to secret names, e.g. "FTL_SECRET_"
+    """
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+
+    def get(self, name: str) -> Optional[str]:
+        return os.environ.get(self.prefix + name)
+
+
+def _fernet(key: Optional[Union[str, bytes]], key_env: str):
+    try:
+        from cryptography.fernet import Fernet
+    except ImportError as e:
+        raise SecretError(
+            "Encrypted secret files need the cryptography package "
+            "(pip install ftl-automation[secrets])"
+        ) from e
+    key = key or os.environ.get(key_env)
+    if not key:
+        raise SecretError(f"No key for the encrypted secret file, set {key_env}")
+    return Fernet(key)
+
+
+def encrypt_secrets_file(
+    path: str,
+    secrets: Dict[str, str],
+    key: Optional[Union[str, bytes]] = None,
+    key_env: str = "FTL_SECRETS_KEY",
+):
+    """
+    Write secrets to a Fernet-encrypted file readable by FileProvider.
+
+    Args:
+        path: File to write
+        secrets: Secret names and values
+        key: Fernet key (defaults to the ``key_env`` environment variable)
+        key_env: Environment variable holding the key
+    """
+    token = _fernet(key, key_env).encrypt(json.dumps(secrets).encode())
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(token)
+
+
+class FileProvider(SecretProvider):
+    """
+    Secrets from a Fernet-encrypted JSON file.
+
+    The file is decrypted once, on the first lookup. Create it with
+    encrypt_secrets_file(); generate a key with
+    ``cryptography.fernet.Fernet.generate_key()``.
+
+    Args:
+        path: Encrypted file
+        key: Fernet key (defaults to the ``key_env`` environment variable)
+        key_env: Environment variable holding the key
+    """
+
+    def __init__(
+        self,
+        path: str,
+        key: Optional[Union[str, bytes]] = None,
+        key_env: str = "FTL_SECRETS_KEY",
+    ):
+        self.path = path
+        self.key = key
+        self.key_env = key_env
+        self._values: Optional[Dict[str, str]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, str]:
+        with self._lock:
+            if self._values is None:
+                fernet = _fernet(self.key, self.key_env)
+                from cryptography.fernet import InvalidToken
+
+                with open(self.path, "rb") as f:
+                    try:
+                        self._values = json.loads(fernet.decrypt(f.read()))
+                    except InvalidToken as e:
+                        raise SecretError(f"Cannot decrypt {self.path}: wrong key?") from e
+            return self._values
+
+    def get(self, name: str) -> Optional[str]:
+        return self._load().get(name)
+
+
+class CommandProvider(SecretProvider):
+    """
+    Secrets printed by an external command, e.g. a vault CLI.
+
+    ``{name}`` in the command is replaced by the secret name and the
+    command's stripped output is the value; a non-zero exit means the
+    secret is not available. Several lookups run concurrently. With
+    ``bulk`` the command is run once with all names appended and must
+    print a JSON object of names and values.
+
+    Args:
+        command: Command as a list or a shell-style string
+        bulk: Look up all names in one invocation
+        timeout: Seconds one invocation may take
+        max_workers: Lookups run at once
+    """
+
+    def __init__(
+        self,
+        command: Union[str, Sequence[str]],
+        bulk: bool = False,
+        timeout: float = 30,
+        max_workers: int = 16,
+    ):
+        self.command = shlex.split(command) if isinstance(command, str) else list(command)
+        self.bulk = bulk
+        self.timeout = timeout
+        self.max_workers = max_workers
+
+    def _run(self, argv: List[str]) -> Optional[bytes]:
+        try:
+            result = subprocess.run(argv, capture_output=True, timeout=self.timeout)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise SecretError(f"Secret command {argv[0]} failed: {e}") from e
+        if result.returncode != 0:
+            return None
+        return result.stdout
+
+    def get(self, name: str) -> Optional[str]:
+        if self.bulk:
+            return self.get_many([name])[name]
+        output = self._run([part.replace("{name}", name) for part in self.command])
+        return None if output is None else output.decode().strip()
+
+    def get_many(self, names: Sequence[str]) -> Dict[str, Optional[str]]:
+        if self.bulk:
+            output = self._run(self.command + list(names))
+            values = json.loads(output) if output else {}
+            return {name: values.get(name) for name in names}
+        if len(names) <= 1:
+            return {name: self.get(name) for name in names}
+        workers = min(self.max_workers, len(names))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(names, executor.map(self.get, names)))
+
+
+class Secrets(Mapping):
+    """
+    Mapping of declared secret names to values, resolved on first access.
+
+    Each name is looked up in the providers in order until one has it;
+    names no provider has map to None. A lookup also fetches every other
+    declared name that is not cached, so later accesses are free. Values
+    are kept for ``ttl`` seconds (forever by default).
+
+    Args:
+        names: Secret names the run uses
+        providers: Providers to search (defaults to environment variables)
+        ttl: Seconds a value is cached, None to keep it for the run
+    """
+
+    def __init__(
+        self,
+        names: Iterable[str] = (),
+        providers: Optional[Sequence[SecretProvider]] = None,
+        ttl: Optional[float] = None,
+    ):
+        self.names = list(dict.fromkeys(names))
+        self.providers = list(providers) if providers is not None else [EnvProvider()]
+        self.ttl = ttl
+        self._values: Dict[str, Any] = {}
+        self._fetched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _fresh(self, name: str, now: float) -> bool:
+        fetched = self._fetched.get(name)
+        return fetched is not None and (self.ttl is None or now - fetched < self.ttl)
+
+    def prefetch(self, names: Optional[Iterable[str]] = None):
+        """
+        Fetch secrets that are not cached, in one batch per provider.
+
+        Args:
+            names: Names to fetch (defaults to every declared name)
+        """
+        with self._lock:
+            now = time.monotonic()
+            pending = [
+                name for name in (self.names if names is None else names)
+                if not self._fresh(name, now)
+            ]
+            values: Dict[str, Any] = {}
+            for provider in self.providers:
+                if not pending:
+                    break
+                found = provider.get_many(pending)
+                values.update((name, value) for name, value in found.items() if value is not None)
+                pending = [name for name in pending if name not in values]
+            values.update((name, None) for name in pending)
+            now = time.monotonic()
+            for name, value in values.items():
+                self._values[name] = value
+                self._fetched[name] = now
+
+    def __getitem__(self, name: str):
+        if name not in self.names:
+            raise KeyError(name)
+        if not self._fresh(name, time.monotonic()):
+            # Batch the lookup with the other declared names not cached
+            self.prefetch([name] + [n for n in self.names if n != name])
+        return self._values[name]
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def known_values(self) -> List[Any]:
+        """Return the values fetched so far, without fetching any."""
+        return [value for value in self._values.values() if value is not None]
+
+    def clear(self):
+        """Forget cached values so they are fetched again."""
+        with self._lock:
+            self._values.clear()
+            self._fetched.clear()
+
+    def __repr__(self):
+        return f"Secrets({self.names!r})"
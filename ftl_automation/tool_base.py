@@ -6,7 +6,8 @@ smolagents.Tool while maintaining compatibility with existing tool patterns.
 """
 
 import inspect
-from typing import Any, Dict, Optional, Callable
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Callable, Iterable, List
 
 
 class AutomationTool:
@@ -41,3 +42,147 @@ class AutomationTool:
             Tool execution result
         """
         raise NotImplementedError("Tools must implement __call__() method")
+
+    async def call_async(self, **kwargs) -> Any:
+        """
+        Awaitable tool call that does not block the event loop.
+
+        Args:
+            **kwargs: Tool parameters
+
+        Returns:
+            Tool execution result
+        """
+        return await self.context.call_tool_async(self, **kwargs)
+
+    def submit(self, **kwargs) -> Future:
+        """
+        Schedule the tool call on the context's event loop.
+
+        Args:
+            **kwargs: Tool parameters
+
+        Returns:
+            concurrent.futures.Future resolving to the tool result
+        """
+        return self.context.submit(self, **kwargs)
+
+    def map(
+        self,
+        kwargs_list: Iterable[Dict[str, Any]],
+        max_concurrency: Optional[int] = None,
+        return_exceptions: bool = True,
+    ) -> List[Any]:
+        """
+        Call the tool once per argument dict, concurrently.
+
+        Args:
+            kwargs_list: Keyword arguments for each call
+            max_concurrency: Maximum number of calls in flight
+            return_exceptions: Return a failed call's exception in its slot
+                instead of raising it
+
+        Returns:
+            Results in input order
+        """
+        return self.context.map_calls(
+            self, [((), dict(kwargs)) for kwargs in kwargs_list],
+            max_concurrency, return_exceptions,
+        )
+
+    def starmap(
+        self,
+        args_list: Iterable[Iterable[Any]],
+        max_concurrency: Optional[int] = None,
+        return_exceptions: bool = True,
+    ) -> List[Any]:
+        """
+        Call the tool once per tuple of positional arguments, concurrently.
+
+        Args:
+            args_list: Positional arguments for each call
+            max_concurrency: Maximum number of calls in flight
+            return_exceptions: Return a failed call's exception in its slot
+                instead of raising it
+
+        Returns:
+            Results in input order
+        """
+        return self.context.map_calls(
+            self, [(tuple(args), {}) for args in args_list],
+            max_concurrency, return_exceptions,
+        )
+
+    def options(self, **options) -> "BoundTool":
+        """
+        Return the tool with call options applied to every call.
+
+        Accepts the same options as ``AutomationContext.options()``, e.g.
+        ``ftl.dnf.options(timeout=600)(name="kernel", state="latest")``.
+
+        Args:
+            **options: Call options
+
+        Returns:
+            BoundTool wrapping this tool
+        """
+        return BoundTool(self, options)
+
+
+class BoundTool(AutomationTool):
+    """Tool with call options bound by ``AutomationTool.options()``."""
+
+    def __init__(self, tool: AutomationTool, options: Dict[str, Any]):
+        super().__init__(tool.context)
+        self._tool = tool
+        self._options = options
+        self.name = tool.name
+        self.module = tool.module
+        self.description = tool.description
+
+    def __call__(self, *args, **kwargs) -> Any:
+        with self.context.options(**self._options):
+            return self._tool(*args, **kwargs)
+
+    def options(self, **options) -> "BoundTool":
+        return BoundTool(self._tool, {**self._options, **options})
+
+    def __getattr__(self, name: str):
+        return getattr(self._tool, name)
+
+
+class AsyncTool:
+    """
+    Awaitable wrapper returned for tools by ``AsyncAutomationContext``.
+
+    Calling the wrapper returns a coroutine; other attributes are delegated
+    to the wrapped tool.
+    """
+
+    def __init__(self, tool: Callable, context):
+        self._tool = tool
+        self._context = context
+
+    def __call__(self, **kwargs):
+        return self._context.call_tool_async(self._tool, **kwargs)
+
+    def map(self, kwargs_list, max_concurrency=None, return_exceptions=True):
+        """Awaitable version of AutomationTool.map()."""
+        return self._context.map_calls_async(
+            self._tool, [((), dict(kwargs)) for kwargs in kwargs_list],
+            max_concurrency, return_exceptions,
+        )
+
+    def starmap(self, args_list, max_concurrency=None, return_exceptions=True):
+        """Awaitable version of AutomationTool.starmap()."""
+        return self._context.map_calls_async(
+            self._tool, [(tuple(args), {}) for args in args_list],
+            max_concurrency, return_exceptions,
+        )
+
+    def options(self, **options) -> "AsyncTool":
+        """Awaitable version of AutomationTool.options()."""
+        return AsyncTool(self._tool.options(**options), self._context)
+
+    def __getattr__(self, name: str):
+        return getattr(self._tool, name)
@@ -3,14 +3,62 @@ Tool loading and execution without AI dependencies.
 """
 
 import os
-import importlib.util
-import inspect
+import threading
+from functools import partial
 from typing import Dict, Any, List, Callable, Optional
 from .context import AutomationContext
+from .discovery import default_tool_index, module_missing, resolve_reference
+
+
+def load_tool(
+    tool_name: str,
+    context: AutomationContext,
+    tool_packages: Optional[List[str]] = None
+) -> Optional[Callable]:
+    """
+    Import a tool from the first package that provides it.
+
+    The package is found with the cached discovery index rather than by
+    importing ``<package>.<tool_name>`` from each package in turn.
+
+    Args:
+        tool_name: Name of the tool to load
+        context: AutomationContext instance
+        tool_packages: List of package names to search for tools (defaults to ["ftl_tools.tools"])
+
+    Returns:
+        Tool instance, or None if no package provides the tool
+
+    Raises:
+        ImportError: If the tool's module exists but fails to import, e.g.
+            because a dependency of it is not installed
+    """
+    # Set default tool packages if none provided
+    if tool_packages is None:
+        tool_packages = ["ftl_tools.tools"]
+
+    index = default_tool_index()
+    for attempt in range(2):
+        reference = index.lookup(tool_name, tool_packages)
+        if reference is None:
+            break
+        module_name = reference.partition(":")[0]
+        try:
+            tool_class = resolve_reference(reference)
+        except (ImportError, AttributeError) as e:
+            if isinstance(e, ImportError) and not module_missing(e, module_name):
+                raise
+            # The index is out of date; rebuild it once
+            index.invalidate()
+            continue
+        return tool_class(context)
+
+    print(f"Warning: Tool '{tool_name}' not found in any of the specified packages: {tool_packages}")
+    return None
 
 
 def load_tools_by_name(
-    tool_names: List[str], 
+    tool_names: List[str],
     context: AutomationContext,
     tool_packages: Optional[List[str]] = None
 ) -> Dict[str, Callable]:
@@ -26,34 +74,87 @@ def load_tools_by_name(
         Dictionary of loaded tool functions
     """
     tools = {}
-    
-    # Set default tool packages if none provided
-    if tool_packages is None:
-        tool_packages = ["ftl_tools.tools"]
-
     for tool_name in tool_names:
-        tool_found = False
-        
-        # Try each package until we find the tool
-        for package in tool_packages:
+        tool = load_tool(tool_name, context, tool_packages)
+        if tool is not None:
+            tools[tool_name] = tool
+    return tools
+
+
+class ToolRegistry(dict):
+    """
+    Tool instances by name, importing registered tools on first access.
+
+    ``register()`` records a tool by name only; the tool is imported and
+    instantiated the first time it is looked up (``registry[name]``,
+    ``get()`` or ``in``) and the instance is cached. ``values()`` and
+    ``items()`` cover the tools loaded so far, while iteration and
+    ``keys()`` list every registered name.
+    """
+
+    def __init__(self, tools: Optional[Dict[str, Callable]] = None):
+        super().__init__(tools or {})
+        self._pending: Dict[str, Callable[[], Optional[Callable]]] = {}
+        # Tools may be first used from several worker threads at once
+        self._lock = threading.RLock()
+
+    def register(self, name: str, loader: Callable[[], Optional[Callable]]):
+        """Register a tool to be created by ``loader()`` on first use."""
+        if not dict.__contains__(self, name):
+            self._pending[name] = loader
+
+    def register_by_name(
+        self,
+        tool_names: List[str],
+        context: AutomationContext,
+        tool_packages: Optional[List[str]] = None,
+    ):
+        """Register tools that load_tool() imports on first use."""
+        for tool_name in tool_names:
+            self.register(tool_name, partial(load_tool, tool_name, context, tool_packages))
+
+    def _load(self, name: str) -> bool:
+        with self._lock:
+            loader = self._pending.pop(name, None)
+            if loader is None:
+                return dict.__contains__(self, name)
             try:
-                module_path = f"{package}.{tool_name}"
-                module = importlib.import_module(module_path)
-
-                for name, obj in inspect.getmembers(module):
-                    if inspect.isclass(obj) and getattr(obj, "name", None) == tool_name:
-                        tools[f"{tool_name}"] = obj(context)
-                        tool_found = True
-                        break
-                
-                if tool_found:
-                    break
-
-            except ImportError as e:
-                # Continue to next package
-                continue
-        
-        if not tool_found:
-            print(f"Warning: Tool '{tool_name}' not found in any of the specified packages: {tool_packages}")
+                tool = loader()
+            except BaseException:
+                # Report the error again on the next use, not "not found"
+                self._pending[name] = loader
+                raise
+            if tool is None:
+                return False
+            dict.__setitem__(self, name, tool)
+            return True
 
-    return tools
+    def load_all(self):
+        """Load every registered tool that has not been used yet."""
+        for name in list(self._pending):
+            self._load(name)
+
+    def loaded(self, name: str) -> bool:
+        """Return True if the tool has been loaded."""
+        return dict.__contains__(self, name)
+
+    def __missing__(self, name: str):
+        if self._load(name):
+            return dict.__getitem__(self, name)
+        raise KeyError(name)
+
+    def __contains__(self, name) -> bool:
+        return dict.__contains__(self, name) or self._load(name)
+
+    def get(self, name: str, default=None):
+        return self[name] if name in self else default
+
+    def __setitem__(self, name: str, tool: Callable):
+        self._pending.pop(name, None)
+        super().__setitem__(name, tool)
+
+    def __iter__(self):
+        return iter(list(super().keys()) + list(self._pending))
+
+    def keys(self):
+        return list(self)
@@ -0,0 +1,157 @@
+"""
+Trace export of automation runs in OpenTelemetry's JSON format.
+
+TraceExporter is a hook (see hooks) that records a root span for the
+context, a child span for each tool call and a grandchild span for each
+host a module ran on, and appends them to a file as one line of OTLP
+JSON (an ExportTraceServiceRequest) when the context exits. The file can
+be read by the OpenTelemetry Collector's otlpjsonfile receiver and tools
+built on it, without a network exporter.
+
+Recording a span only stores a tuple; ids, timestamps and attributes are
+converted to OTLP when the file is written, so tracing can stay on for
+runs with tens of thousands of calls.
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .hooks import Call, HostResult
+
+# OTLP span kind and status codes
+SPAN_KIND_INTERNAL = 1
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class TraceExporter:
+    """
+    Hook writing the spans of a run to an OTLP JSON file.
+
+    Args:
+        path: File the trace is appended to, one line per run
+        name: Name of the root span
+        service_name: ``service.name`` resource attribute
+        redact: Function masking secrets in error messages, e.g.
+            AutomationContext.redact
+    """
+
+    def __init__(
+        self,
+        path: str,
+        name: str = "automation",
+        service_name: str = "ftl-automation",
+        redact: Optional[Callable[[str], str]] = None,
+    ):
+        self.path = path
+        self.name = name
+        self.service_name = service_name
+        self.redact = redact
+        self.trace_id = os.urandom(16).hex()
+        # Span ids are sequential from a random start, unique in the trace
+        self._span_ids = itertools.count(int.from_bytes(os.urandom(7), "big") << 8)
+        self.root_id = next(self._span_ids)
+        # perf_counter() readings are converted to wall clock time on export
+        self._epoch_ns = time.time_ns() - time.perf_counter_ns()
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.spans: List[Tuple] = []
+        self._lock = threading.Lock()
+
+    def on_call_start(self, call: Call):
+        call.data["span_id"] = next(self._span_ids)
+
+    def on_call_end(self, call: Call):
+        parent = call.parent.data.get("span_id", self.root_id) if call.parent else self.root_id
+        self.spans.append((
+            call.data.get("span_id") or next(self._span_ids), parent, call.tool,
+            call.start, call.end, call.module, None, call.error,
+        ))
+
+    def on_host_result(self, call: Optional[Call], host: HostResult):
+        parent = call.data.get("span_id", self.root_id) if call is not None else self.root_id
+        failed = host.failed
+        # Keep only what the span needs, not the whole result
+        outcome = (host.host, host.changed, failed, host.gate_reused,
+                   str(host.result.get("msg", "failed")) if failed else None)
+        self.spans.append((
+            next(self._span_ids), parent, f"{host.module} {host.host}",
+            host.start, host.end, host.module, outcome, None,
+        ))
+
+    def _time(self, perf_counter: float) -> str:
+        return str(self._epoch_ns + int(perf_counter * 1e9))
+
+    def _span(self, span: Tuple) -> Dict[str, Any]:
+        span_id, parent_id, name, start, end, module, host, error = span
+        attributes = []
+        if module:
+            attributes.append(_attribute("ftl.module", module))
+        status = {"code": STATUS_OK}
+        if host is not None:
+            host_name, changed, failed, gate_reused, message = host
+            attributes.append(_attribute("ftl.host", host_name))
+            attributes.append(_attribute("ftl.changed", changed))
+            attributes.append(_attribute("ftl.failed", failed))
+            attributes.append(_attribute("ftl.gate_reused", gate_reused))
+            if failed:
+                status = {"code": STATUS_ERROR, "message": self._redact(message)}
+        if error is not None:
+            message = f"{type(error).__name__}: {error}"
+            status = {"code": STATUS_ERROR, "message": self._redact(message)}
+        otlp = {
+            "traceId": self.trace_id,
+            "spanId": f"{span_id:016x}",
+            "name": name,
+            "kind": SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": self._time(start),
+            "endTimeUnixNano": self._time(end if end is not None else start),
+            "attributes": attributes,
+            "status": status,
+        }
+        if parent_id is not None:
+            otlp["parentSpanId"] = f"{parent_id:016x}"
+        return otlp
+
+    def _redact(self, message: str) -> str:
+        return self.redact(message) if self.redact is not None else message
+
+    def export(self) -> Dict[str, Any]:
+        """Return the spans recorded so far as an OTLP ExportTraceServiceRequest."""
+        root = (self.root_id, None, self.name, self.start,
+                self.end if self.end is not None else time.perf_counter(), None, None, None)
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "ftl_automation"},
+                    "spans": [self._span(root)] + [self._span(span) for span in self.spans],
+                }],
+            }],
+        }
+
+    def finish(self):
+        """End the root span and append the trace to the file."""
+        with self._lock:
+            if self.end is not None:
+                return
+            self.end = time.perf_counter()
+            line = json.dumps(self.export(), separators=(",", ":")) + "\n"
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(line)
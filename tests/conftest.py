@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+import ftl_automation
+from ftl_automation import AutomationTool
+
+MODULES = os.path.join(os.path.dirname(__file__), "modules")
+
+INVENTORY = {
+    "all": {
+        "hosts": {
+            "localhost": {"ansible_connection": "local"},
+        }
+    }
+}
+
+FLEET = {
+    "all": {
+        "hosts": {
+            "web1": {"ansible_connection": "local"},
+            "web2": {"ansible_connection": "local"},
+        }
+    }
+}
+
+
+class PingTool(AutomationTool):
+    name = "ping"
+    module = "ping"
+
+    def __call__(self, data: str = "pong", sleep: float = 0):
+        return self.context.run_module(self.module, data=data, sleep=str(sleep))
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    """Keep the tool index and other caches out of the real ~/.cache."""
+    from ftl_automation import discovery
+
+    path = tmp_path / "cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(path))
+    # The process-wide index remembers the path it was created with
+    monkeypatch.setattr(discovery, "_default_index", None)
+    return path
+
+
+@pytest.fixture
+def ftl():
+    with ftl_automation.automation(inventory=INVENTORY, modules=[MODULES]) as context:
+        context._tools_dict["ping"] = PingTool(context)
+        yield context
+
+
+@pytest.fixture
+def fleet():
+    with ftl_automation.automation(inventory=FLEET, modules=[MODULES]) as context:
+        context._tools_dict["ping"] = PingTool(context)
+        yield context
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+# WANT_JSON
+import json
+import os
+import sys
+import time
+
+with open(sys.argv[1]) as f:
+    args = json.load(f)
+
+if "pidfile" in args:
+    with open(args["pidfile"], "w") as f:
+        f.write(str(os.getpid()))
+
+time.sleep(float(args.get("sleep", 0)))
+
+print(json.dumps(dict(changed=False, ping=args.get("data", "pong"))))
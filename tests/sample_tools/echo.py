@@ -0,0 +1,9 @@
+from ftl_automation import AutomationTool
+
+
+class EchoTool(AutomationTool):
+    name = "echo"
+    module = "ping"
+
+    def __call__(self, data: str = "pong"):
+        return self.context.run_module(self.module, data=data)
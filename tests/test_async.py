@@ -0,0 +1,114 @@
+import asyncio
+import time
+
+import ftl_automation
+from conftest import INVENTORY, MODULES, PingTool
+
+
+def test_run_module_sync(ftl):
+    result = ftl.run_module("ping", data="hello")
+    assert result["localhost"]["ping"] == "hello"
+
+
+def test_automation_async_gather():
+    async def main():
+        async with ftl_automation.automation_async(
+            inventory=INVENTORY, modules=[MODULES]
+        ) as ftl:
+            ftl._tools_dict["ping"] = PingTool(ftl)
+            return await asyncio.gather(
+                *(ftl.ping(data=str(i), sleep=0.5) for i in range(8))
+            )
+
+    loop = asyncio.new_event_loop()
+    start = loop.time()
+    results = loop.run_until_complete(main())
+    elapsed = loop.time() - start
+    loop.close()
+
+    assert [r["localhost"]["ping"] for r in results] == [str(i) for i in range(8)]
+    assert elapsed < 8 * 0.5
+
+
+def test_automation_async_complete():
+    async def main():
+        async with ftl_automation.automation_async(inventory=INVENTORY) as ftl:
+            await ftl.debug_tool(message="async")
+            await ftl.complete(message="done")
+        return True
+
+    assert asyncio.run(main())
+
+
+def test_submit_as_completed(ftl):
+    futures = [ftl.submit("ping", data=str(i), sleep=0.2) for i in range(4)]
+    futures.append(ftl.tools.ping.submit(data="proxy"))
+    done = [f.result() for f in ftl.as_completed(futures)]
+    ftl.wait(futures)
+    assert sorted(r["localhost"]["ping"] for r in done) == ["0", "1", "2", "3", "proxy"]
+
+
+def test_map_in_order_with_errors(ftl):
+    start = time.perf_counter()
+    results = ftl.ping.map(
+        [{"data": "a", "sleep": 0.3}, {"bogus": 1}, {"data": "c", "sleep": 0.3}],
+        max_concurrency=2,
+    )
+    elapsed = time.perf_counter() - start
+
+    assert results[0]["localhost"]["ping"] == "a"
+    assert isinstance(results[1], TypeError)
+    assert results[2]["localhost"]["ping"] == "c"
+    assert elapsed < 0.9
+    assert [r["localhost"]["ping"] for r in ftl.ping.starmap([("x",), ("y",)])] == ["x", "y"]
+
+
+def test_stream_yields_fast_hosts_first(fleet):
+    class SlowOnWeb1(PingTool):
+        def __call__(self, data="pong"):
+            slow = "web1" in self.context._target_inventory()["all"]["hosts"]
+            return super().__call__(data=data, sleep=0.5 if slow else 0)
+
+    fleet._tools_dict["slow"] = SlowOnWeb1(fleet)
+    hosts = [host for host, result in fleet.stream("slow", data="s")]
+    assert hosts == ["web2", "web1"]
+
+    streamed = dict(fleet.stream_module("ping", data="m"))
+    assert streamed == {"web1": {"changed": False, "ping": "m"}, "web2": {"changed": False, "ping": "m"}}
+
+
+def test_nested_tool_calls_do_not_exhaust_workers():
+    import threading
+
+    from ftl_automation import AutomationTool
+
+    class Outer(AutomationTool):
+        name = "outer"
+
+        def __call__(self, data):
+            ftl = self.context
+            mapped = ftl.ping.map([{"data": f"{data}{i}"} for i in range(3)])
+            submitted = ftl.submit("ping", data=f"{data}s").result()
+            streamed = dict(ftl.stream("ping", data=f"{data}t"))
+            return (
+                [r["localhost"]["ping"] for r in mapped],
+                submitted["localhost"]["ping"],
+                streamed["localhost"]["ping"],
+            )
+
+    results = []
+    with ftl_automation.automation(inventory=INVENTORY, modules=[MODULES], workers=2) as ftl:
+        ftl._tools_dict["ping"] = PingTool(ftl)
+        ftl._tools_dict["outer"] = Outer(ftl)
+        # Both workers run an outer call whose nested calls need workers too
+        thread = threading.Thread(
+            target=lambda: results.extend(ftl.outer.map([{"data": "a"}, {"data": "b"}]))
+        )
+        thread.start()
+        thread.join(timeout=30)
+        assert not thread.is_alive(), "nested tool calls deadlocked"
+
+    assert results == [
+        (["a0", "a1", "a2"], "as", "at"),
+        (["b0", "b1", "b2"], "bs", "bt"),
+    ]
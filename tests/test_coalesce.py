@@ -0,0 +1,196 @@
+import pytest
+
+import ftl_automation
+from ftl_automation import AutomationTool
+from ftl_automation.coalesce import split_package_result
+
+
+class FakeDnf(AutomationTool):
+    name = "dnf"
+
+    def __init__(self, context):
+        super().__init__(context)
+        self.calls = []
+
+    def __call__(self, name, state="present"):
+        self.calls.append((name, state))
+        if "broken" in name:
+            raise RuntimeError("no such package")
+        return {
+            "localhost": {
+                "changed": True,
+                "results": [f"Installed: {package}-1.0.x86_64" for package in name],
+            }
+        }
+
+
+@pytest.fixture
+def dnf():
+    with ftl_automation.automation(inventory={}) as context:
+        context._tools_dict["dnf"] = FakeDnf(context)
+        yield context, context._tools_dict["dnf"]
+
+
+def test_coalesce_consecutive_calls(dnf):
+    ftl, tool = dnf
+    with ftl.coalesce():
+        nginx = ftl.dnf(name="nginx", state="present")
+        git = ftl.dnf(name="git", state="present")
+        old = ftl.dnf(name="telnet", state="absent")
+        ftl.debug_tool(message="flushes pending calls")
+        assert tool.calls == [(["nginx", "git"], "present"), (["telnet"], "absent")]
+        later = ftl.tools.dnf(name="curl")
+
+    assert tool.calls[-1] == (["curl"], "present")
+    assert nginx["localhost"]["results"] == ["Installed: nginx-1.0.x86_64"]
+    assert git.get("localhost")["changed"] is True
+    assert old["localhost"]["results"] == ["Installed: telnet-1.0.x86_64"]
+    assert later.result()["localhost"]["changed"] is True
+
+
+def test_coalesce_reading_result_flushes(dnf):
+    ftl, tool = dnf
+    with ftl.coalesce():
+        result = ftl.dnf(name="nginx")
+        assert tool.calls == []
+        assert result["localhost"]["changed"]
+        assert tool.calls == [(["nginx"], "present")]
+
+
+def test_coalesce_error_raised_on_read(dnf):
+    ftl, tool = dnf
+    with ftl.coalesce():
+        broken = ftl.dnf(name="broken")
+        other = ftl.dnf(name="nginx")
+        with pytest.raises(RuntimeError):
+            broken.get("localhost")
+        with pytest.raises(RuntimeError):
+            other.result()
+
+
+def test_coalesce_unread_error_raised_on_exit(dnf):
+    ftl, tool = dnf
+    with pytest.raises(RuntimeError, match="no such package"):
+        with ftl.coalesce():
+            ftl.dnf(name="broken")
+    assert tool.calls == [(["broken"], "present")]
+
+
+def test_coalesce_unread_error_raised_on_complete(dnf):
+    ftl, tool = dnf
+    with pytest.raises(RuntimeError, match="no such package"):
+        with ftl.coalesce():
+            ftl.dnf(name="broken")
+            ftl.complete()
+
+
+def test_coalesce_interrupted_batch_does_not_hang():
+    from ftl_automation.coalesce import Coalescer
+
+    def dnf(name):
+        raise KeyboardInterrupt
+
+    coalescer = Coalescer()
+    result = coalescer.call("dnf", dnf, {"name": "nginx"})
+    with pytest.raises(KeyboardInterrupt):
+        coalescer.flush()
+    assert result.done()
+    with pytest.raises(KeyboardInterrupt):
+        result.result()
+
+
+def test_split_package_result():
+    result = {"changed": True, "results": ["Installed: a-1", "Installed: b-1"]}
+    assert split_package_result(result, "c") == {"changed": False, "results": []}
+
+
+def test_split_package_result_matches_whole_names():
+    result = {"changed": True, "results": [
+        "Installed: git-2.43.0-1.el9.x86_64",
+        "Installed: git-lfs-3.4.1-2.el9.x86_64",
+        "Installed: libgit2-1.7.1-1.el9.x86_64",
+        {"name": "git-core", "version": "2.43.0"},
+    ]}
+    assert split_package_result(result, "git")["results"] == [
+        "Installed: git-2.43.0-1.el9.x86_64",
+    ]
+    assert split_package_result(result, "git-lfs")["results"] == [
+        "Installed: git-lfs-3.4.1-2.el9.x86_64",
+    ]
+    assert len(split_package_result(result, "git-core")["results"]) == 1
+    assert split_package_result({"results": ["Installed nginx.x86_64"]}, "nginx>=1.20")[
+        "results"] == ["Installed nginx.x86_64"]
+
+
+def test_coalesce_flushes_when_block_raises(dnf):
+    ftl, tool = dnf
+    with pytest.raises(KeyError):
+        with ftl.coalesce():
+            nginx = ftl.dnf(name="nginx")
+            raise KeyError("boom")
+    assert tool.calls == [(["nginx"], "present")]
+    assert nginx["localhost"]["changed"]
+
+
+def test_coalescer_shared_between_threads():
+    import sys
+    import threading
+
+    from ftl_automation.coalesce import Coalescer
+
+    states = ["present", "absent", "latest"]
+    installed = []
+
+    def dnf(name, state):
+        installed.extend((package, state) for package in name)
+        return {"changed": True, "results": [f"{state}: {package}-1.0" for package in name]}
+
+    coalescer = Coalescer()
+    results = []
+
+    def caller(i):
+        for j in range(300):
+            results.append(coalescer.call("dnf", dnf, {"name": f"pkg{i}x{j}", "state": states[i]}))
+
+    def flusher():
+        for _ in range(300):
+            coalescer.flush()
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(3)]
+    threads += [threading.Thread(target=flusher) for _ in range(2)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads as often as possible
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    coalescer.flush()
+
+    # Every call ran exactly once, with its own arguments
+    assert sorted(installed) == sorted(
+        (f"pkg{i}x{j}", states[i]) for i in range(3) for j in range(300)
+    )
+    assert all(result.done() for result in results)
+
+
+def test_coalesce_async():
+    import asyncio
+
+    async def main():
+        async with ftl_automation.automation_async(inventory={}) as ftl:
+            tool = ftl._tools_dict["dnf"] = FakeDnf(ftl)
+            async with ftl.coalesce():
+                nginx = await ftl.dnf(name="nginx")
+                git = await ftl.dnf(name="git")
+                assert tool.calls == []
+                assert (await nginx)["localhost"]["results"] == ["Installed: nginx-1.0.x86_64"]
+                curl = await ftl.dnf(name="curl")
+                with pytest.raises(RuntimeError, match="await it"):
+                    curl["localhost"]
+            assert tool.calls == [(["nginx", "git"], "present"), (["curl"], "present")]
+            assert git["localhost"]["results"] == ["Installed: git-1.0.x86_64"]
+
+    asyncio.run(main())
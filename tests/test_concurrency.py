@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from ftl_automation.concurrency import ForkLimiter
+
+
+async def max_in_flight(limiter, host_groups):
+    in_flight = {"all": 0, "max": 0, "db": 0, "db_max": 0}
+
+    async def host(groups):
+        async with limiter.slot(groups):
+            in_flight["all"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["all"])
+            if "db" in groups:
+                in_flight["db"] += 1
+                in_flight["db_max"] = max(in_flight["db_max"], in_flight["db"])
+            await asyncio.sleep(0.01)
+            in_flight["all"] -= 1
+            if "db" in groups:
+                in_flight["db"] -= 1
+
+    await asyncio.gather(*(host(groups) for groups in host_groups))
+    return in_flight["max"], in_flight["db_max"]
+
+
+def test_fork_limiter_global_and_group():
+    hosts = [["web"]] * 20 + [["db", "web"]] * 10
+    limiter = ForkLimiter(forks=5, group_forks={"db": 2})
+    assert asyncio.run(max_in_flight(limiter, hosts)) == (5, 2)
+
+
+def test_fork_limiter_unlimited():
+    limiter = ForkLimiter()
+    assert not limiter
+    assert asyncio.run(max_in_flight(limiter, [["web"]] * 10)) == (10, 0)
+
+
+def test_fork_limiter_rejects_zero():
+    with pytest.raises(ValueError):
+        ForkLimiter(forks=0)
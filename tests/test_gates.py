@@ -0,0 +1,148 @@
+import asyncio
+import os
+import zipfile
+
+from faster_than_light.types import Gate
+
+from conftest import MODULES
+from ftl_automation.gates import GateArtifactCache, GatePool
+
+
+def test_gate_artifact_cache(tmp_path):
+    cache = GateArtifactCache(str(tmp_path / "gates"))
+
+    archive, key = cache.get_or_build(["ping"], [MODULES])
+    assert archive == cache.archive_path(key)
+    assert "ftl_gate/ping.py" in zipfile.ZipFile(archive).namelist()
+
+    os.utime(archive, (0, 0))
+    assert cache.get_or_build(["ping"], [MODULES]) == (archive, key)
+    assert os.stat(archive).st_mtime > 0
+
+    other, other_key = cache.get_or_build(["ping"], [MODULES], interpreter="/usr/bin/python3")
+    assert other_key != key
+
+    assert cache.evict(max_bytes=os.stat(other).st_size) == [archive]
+    assert [path for path, _, _ in cache.entries()] == [other]
+
+
+def test_gate_artifact_cache_key_tracks_content(tmp_path):
+    modules = tmp_path / "modules"
+    modules.mkdir()
+    (modules / "hello.py").write_text("print('v1')\n")
+    cache = GateArtifactCache(str(tmp_path / "gates"))
+
+    first = cache.key(["hello"], [str(modules)])
+    (modules / "hello.py").write_text("print('v2')\n")
+    assert cache.key(["hello"], [str(modules)]) != first
+
+
+class FakeConnection:
+    def __init__(self, hang=False):
+        self.closed = False
+        self.aborted = False
+        self.hang = hang
+        self.commands = []
+
+    def close(self):
+        self.closed = True
+
+    async def wait_closed(self):
+        if self.hang:
+            await asyncio.sleep(60)
+
+    def abort(self):
+        self.aborted = True
+
+    async def run(self, command):
+        self.commands.append(command)
+
+
+def fake_gate(hang=False):
+    return Gate(FakeConnection(hang), None, "/tmp")
+
+
+def test_gate_pool_lifecycle():
+    async def main():
+        pool = GatePool(idle_timeout=0.05)
+        first, second, idle, hung = fake_gate(), fake_gate(), fake_gate(), fake_gate(hang=True)
+
+        pool["web1"] = first
+        pool["web1"] = second
+        await asyncio.sleep(0)
+        assert first.conn.closed and not second.conn.closed
+
+        pool["idle"] = idle
+        await asyncio.sleep(0.1)
+        pool["web1"] = second
+        assert await pool.evict_idle() == ["idle"]
+        assert idle.conn.closed and list(pool) == ["web1"]
+
+        pool["hung"] = hung
+        assert await pool.close(timeout=0.1) == 2
+        assert second.conn.closed and hung.conn.aborted
+
+        late = fake_gate()
+        pool["web2"] = late
+        await asyncio.sleep(0)
+        assert late.conn.closed and "web2" not in pool
+
+    asyncio.run(main())
+
+
+def test_gate_pool_max_per_host():
+    async def main():
+        pool = GatePool(max_per_host=2)
+        in_flight = []
+
+        async def call():
+            async with pool.host_slot("web1"):
+                in_flight.append(1)
+                peak = len(in_flight)
+                await asyncio.sleep(0.01)
+                in_flight.pop()
+                return peak
+
+        return max(await asyncio.gather(*(call() for _ in range(6))))
+
+    assert asyncio.run(main()) == 2
+
+
+def test_prewarm_gates(monkeypatch, capsys):
+    import faster_than_light.ssh
+
+    import ftl_automation
+
+    connecting = []
+    peak = []
+
+    async def connect_gate(gate_builder, ssh_host, ssh_user, gate_cache, interpreter):
+        if ssh_host == "unreachable":
+            raise OSError("Connection refused")
+        connecting.append(ssh_host)
+        peak.append(connecting.count(ssh_host))
+        await asyncio.sleep(0.05)
+        connecting.remove(ssh_host)
+        return fake_gate()
+
+    monkeypatch.setattr(faster_than_light.ssh, "connect_gate", connect_gate)
+    inventory = {"all": {"hosts": {
+        "web1": {"ansible_host": "10.0.0.1"},
+        "web1-admin": {"ansible_host": "10.0.0.1", "ansible_user": "admin"},
+        "db1": {"ansible_host": "unreachable"},
+        "local": {"ansible_connection": "local"},
+    }}}
+    with ftl_automation.automation(
+        inventory=inventory,
+        modules=[MODULES],
+        use_gate=lambda interpreter: ("/tmp/gate.pyz", "key"),
+        prewarm=True,
+        max_connections_per_host=1,
+    ) as ftl:
+        assert len(ftl.gate_cache) == 2
+
+    out = capsys.readouterr().out
+    assert "Pre-warmed 2/3 hosts" in out
+    assert "Could not pre-warm db1: Connection refused" in out
+    # Both web1 aliases reach 10.0.0.1, which allows one connection at a time
+    assert max(peak) == 1
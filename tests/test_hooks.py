@@ -0,0 +1,47 @@
+import ftl_automation
+from ftl_automation import MetricsCollector
+from ftl_automation.hooks import InstrumentedTool
+
+from conftest import FLEET, MODULES, PingTool
+
+
+def test_no_hooks_leaves_tools_unwrapped(fleet):
+    assert type(fleet.ping) is PingTool
+
+
+def test_metrics_collector():
+    collector = MetricsCollector()
+    events = []
+    with ftl_automation.automation(inventory=FLEET, modules=[MODULES], hooks=[collector]) as ftl:
+        ftl._tools_dict["ping"] = PingTool(ftl)
+        ftl.hooks.register(
+            on_call_start=lambda call: events.append(("start", call.tool)),
+            on_host_result=lambda call, host: events.append((host.host, call.tool)),
+        )
+        assert isinstance(ftl.ping, InstrumentedTool)
+        ftl.ping(data="pong")
+        ftl.ping.map([{"data": "a"}, {"data": "b"}])
+        ftl.run_module("ping", data="direct")
+
+    summary = collector.summary()
+    ping = summary["ping"]
+    # The direct run_module call is reported under the module's name
+    assert ping["calls"] == 4
+    assert ping["hosts"] == 8
+    assert ping["errors"] == 0
+    assert ping["failed"] == 0
+    assert ping["bytes"] > 0
+    assert ping["host_latency_max"] <= ping["max_wall_time"]
+    assert ping["gate_hits"] + ping["gate_misses"] == 8
+    assert ("start", "ping") in events
+    assert events.count(("web1", "ping")) == 4
+    assert "ping" in collector.report()
+
+
+def test_hook_errors_do_not_break_calls(fleet, capsys):
+    def broken(call):
+        raise RuntimeError("boom")
+
+    fleet.hooks.register(on_call_end=broken)
+    assert set(fleet.ping()) == {"web1", "web2"}
+    assert "boom" in capsys.readouterr().out
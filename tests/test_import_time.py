@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Budget for the imports ftl_automation adds on top of interpreter startup.
+# Loading faster_than_light and rich eagerly took about 330ms; asyncio
+# alone accounts for most of the remaining cost.
+IMPORT_BUDGET_US = int(os.environ.get("FTL_IMPORT_BUDGET_US", 150_000))
+
+HEAVY = ("faster_than_light", "asyncssh", "rich", "yaml")
+
+
+def import_times(statement):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.rstrip()] = int(cumulative_us)
+    return times
+
+
+@pytest.mark.parametrize(
+    "statement",
+    ["import ftl_automation", "from ftl_automation import automation", "import ftl_automation.cli"],
+)
+def test_import_time(statement):
+    baseline = {name.strip() for name in import_times("pass")}
+    totals = []
+    for _ in range(3):
+        times = import_times(statement)
+        added = {name: us for name, us in times.items() if name.strip() not in baseline}
+
+        heavy = [name.strip() for name in added if name.strip().split(".")[0] in HEAVY]
+        assert not heavy, f"{statement} imports {heavy}"
+
+        # Top-level entries have no indentation; their cumulative times add
+        # up to the cost of the statement
+        totals.append(sum(us for name, us in added.items() if not name.startswith(" ")))
+
+    # The fastest run is the least disturbed by other load on the machine
+    assert min(totals) < IMPORT_BUDGET_US, f"{statement} took {min(totals)}us"
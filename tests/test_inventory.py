@@ -0,0 +1,146 @@
+import os
+import time
+
+from ftl_automation import inventory as inventory_module
+from ftl_automation import load_inventory
+from ftl_automation.inventory import cache_path, load_inventory_file
+
+
+def age(path, seconds=60):
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+def test_compiled_inventory_cache(tmp_path, monkeypatch):
+    path = tmp_path / "inventory.yml"
+    path.write_text("all:\n  hosts:\n    web1:\n      ansible_host: 10.0.0.1\n")
+    age(path)
+
+    assert load_inventory(str(path))["all"]["hosts"]["web1"]["ansible_host"] == "10.0.0.1"
+    assert os.path.exists(cache_path(str(path)))
+
+    def fail(data):
+        raise AssertionError("inventory was parsed")
+
+    with monkeypatch.context() as m:
+        m.setattr(inventory_module, "parse_inventory", fail)
+        assert load_inventory_file(str(path))["all"]["hosts"]["web1"]
+        # Touched without changing content: the hash still matches
+        os.utime(path)
+        assert load_inventory_file(str(path))["all"]["hosts"]["web1"]
+
+    path.write_text("all:\n  hosts:\n    web2: {}\n")
+    assert load_inventory_file(str(path)) == {"all": {"hosts": {"web2": {}}}}
+
+
+def test_inventory_cache_same_size_rewrite(tmp_path):
+    path = tmp_path / "inventory.yml"
+    path.write_text("all:\n  hosts:\n    web1: {}\n")
+    load_inventory_file(str(path))
+    # Same size, and possibly the same timestamp tick
+    path.write_text("all:\n  hosts:\n    web2: {}\n")
+    assert load_inventory_file(str(path)) == {"all": {"hosts": {"web2": {}}}}
+
+
+def test_load_inventory_without_cache(tmp_path):
+    path = tmp_path / "inventory.yml"
+    path.write_text("{}\n")
+    assert load_inventory(str(path), cache=False) == {}
+    assert not os.path.exists(cache_path(str(path)))
+
+
+FLEET = {
+    "web": {"hosts": {"web1": {}, "web2": {}, "canary1": {}}},
+    "prod": {"hosts": {"web1": {}, "db1": {}}},
+    "canary": {"hosts": {"canary1": {}}},
+}
+
+
+def test_host_patterns():
+    from ftl_automation.inventory import Inventory
+
+    inventory = Inventory(FLEET)
+    assert inventory.host_groups["web1"] == ["web", "prod"]
+    assert inventory.resolve("all") == {"web1", "web2", "canary1", "db1"}
+    assert inventory.resolve("web*:&prod:!canary") == {"web1"}
+    assert inventory.resolve("!canary") == {"web1", "web2", "db1"}
+    assert inventory.resolve("~^db,web2") == {"db1", "web2"}
+    assert inventory.resolve("can*") == {"canary1"}
+    assert inventory.resolve("unknown") == set()
+    assert inventory.limit("web:!canary") == {
+        "web": {"hosts": {"web1": {}, "web2": {}}},
+        "prod": {"hosts": {"web1": {}}},
+    }
+
+
+def test_automation_limit():
+    import ftl_automation
+    from conftest import MODULES
+
+    inventory = {"web": {"hosts": {
+        "web1": {"ansible_connection": "local"},
+        "web2": {"ansible_connection": "local"},
+        "canary1": {"ansible_connection": "local"},
+    }}}
+    with ftl_automation.automation(
+        inventory=inventory, modules=[MODULES], limit="web*,canary*"
+    ) as ftl:
+        assert list(ftl.run_module("ping")) == ["web1", "web2", "canary1"]
+        with ftl.options(limit="!canary*"):
+            assert list(ftl.run_module("ping")) == ["web1", "web2"]
+            with ftl.options(hosts=["web2", "canary1"]):
+                assert list(ftl.run_module("ping")) == ["web2"]
+        assert ftl.select("~1$") == ["web1", "canary1"]
+
+    result = ftl_automation.run_module(inventory, [MODULES], "ping", {}, limit="web2")
+    assert list(result) == ["web2"]
+
+
+def test_host_vars():
+    from ftl_automation.inventory import HostVars, Inventory
+
+    inventory = Inventory({
+        "all": {"vars": {"backup_root": "/backup", "app_port": 80}},
+        "web": {"vars": {"app_port": 8080}, "hosts": {"web1": {}, "web2": {"app_port": 9000}}},
+        "db": {"hosts": {"db1": {"db_name": "app"}}},
+    })
+    assert inventory.host_vars("web1") == {"backup_root": "/backup", "app_port": 8080}
+    assert inventory.host_vars("web2")["app_port"] == 9000
+    assert inventory.host_vars("db1") == {"backup_root": "/backup", "app_port": 80, "db_name": "app"}
+
+    hostvars = HostVars(inventory, {"app_port": 443})
+    view = hostvars["web1"]
+    assert view["app_port"] == 443
+    view["release"] = "v2"
+    assert "release" not in hostvars["web1"]
+    assert "release" not in inventory.host_vars("web1")
+
+    inventory.update_group("web", app_port=8081)
+    assert inventory.host_vars("web1")["app_port"] == 8081
+    assert inventory.host_vars("db1")["app_port"] == 80
+    inventory.update_host("db1", db_name="orders")
+    assert inventory.host_vars("db1")["db_name"] == "orders"
+
+
+def test_add_and_remove_hosts():
+    import ftl_automation
+
+    inventory = {"web": {"hosts": {"web1": {"ansible_connection": "local"}}}}
+    with ftl_automation.automation(inventory=inventory, extra_vars={"release": "v2"}) as ftl:
+        assert ftl.select("web*") == ["web1"]
+        index = ftl.inventory_index
+        ftl.add_host("web2", {"ansible_host": "10.0.0.2"}, groups=["web", "new"])
+        assert ftl.inventory_index is index
+        assert inventory["new"]["hosts"]["web2"] is inventory["web"]["hosts"]["web2"]
+        assert ftl.select("web*") == ["web1", "web2"]
+        assert ftl.select("new") == ["web2"]
+        assert ftl.hostvars["web2"]["release"] == "v2"
+
+        ftl.update_group("new", tier="canary")
+        assert ftl.hostvars["web2"]["tier"] == "canary"
+        assert "tier" not in ftl.hostvars["web1"]
+
+        ftl.remove_host("web1")
+        assert ftl.select("all") == ["web2"]
+        assert "web1" not in inventory["web"]["hosts"]
+        assert ftl.inventory_index is index
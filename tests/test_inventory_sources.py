@@ -0,0 +1,86 @@
+import json
+import sqlite3
+import stat
+
+import ftl_automation
+from ftl_automation.inventory_sources import (
+    DynamicInventory, FileSource, ScriptSource, inventory_source,
+)
+
+
+def write_script(path, inventory, counter):
+    path.write_text(
+        "#!/bin/sh\n"
+        f"echo run >> {counter}\n"
+        f"cat <<'EOF'\n{json.dumps(inventory)}\nEOF\n"
+    )
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+
+
+def test_merged_sources(tmp_path, cache_home):
+    counter = tmp_path / "runs"
+    script = tmp_path / "cloud.sh"
+    write_script(script, {
+        "web": ["web1", "web2"],
+        "prod": {"hosts": ["web1"], "vars": {"env": "prod"}},
+        "_meta": {"hostvars": {"web1": {"ansible_host": "10.0.0.1"}}},
+    }, counter)
+
+    fragments = tmp_path / "inventory.d"
+    fragments.mkdir()
+    (fragments / "10-web.yml").write_text("web:\n  hosts:\n    web1:\n      app_port: 8080\n")
+    (fragments / "20-db.yml").write_text("db:\n  hosts:\n    db1: {}\n")
+
+    database = tmp_path / "cmdb.db"
+    connection = sqlite3.connect(database)
+    connection.execute("CREATE TABLE inventory (host TEXT, group_name TEXT, vars TEXT)")
+    connection.executemany("INSERT INTO inventory VALUES (?, ?, ?)", [
+        ("db1", "db", '{"db_name": "orders"}'),
+        ("db1", "prod", None),
+    ])
+    connection.commit()
+    connection.close()
+
+    sources = DynamicInventory(
+        [str(script), str(fragments), str(database)], cache_dir=str(tmp_path / "cache")
+    )
+    inventory = sources.load()
+    assert inventory["web"]["hosts"]["web1"] == {"ansible_host": "10.0.0.1", "app_port": 8080}
+    assert inventory["prod"]["hosts"]["web1"] is inventory["web"]["hosts"]["web1"]
+    assert inventory["prod"]["vars"] == {"env": "prod"}
+    assert set(inventory["prod"]["hosts"]) == {"web1", "db1"}
+    assert inventory["db"]["hosts"]["db1"] == {"db_name": "orders"}
+
+    # The script's result is reused until the TTL expires
+    assert sources.load() == inventory
+    assert counter.read_text().count("run") == 1
+    sources.load(refresh=True)
+    assert counter.read_text().count("run") == 2
+
+    with ftl_automation.automation(inventory=[str(script), str(fragments)]) as ftl:
+        assert ftl.select("web") == ["web1", "web2"]
+        assert ftl.inventory_file is None
+    # Without a cache_dir the script's result is cached under XDG_CACHE_HOME
+    assert list((cache_home / "ftl-automation" / "inventory").glob("*.pickle"))
+
+
+def test_failed_source_uses_cached_result(tmp_path):
+    script = tmp_path / "cloud.sh"
+    write_script(script, {"web": ["web1"]}, tmp_path / "runs")
+    sources = DynamicInventory([ScriptSource(str(script))], ttl=0.01, cache_dir=str(tmp_path))
+    assert list(sources.load()["web"]["hosts"]) == ["web1"]
+
+    script.write_text("#!/bin/sh\nexit 1\n")
+    assert list(sources.load(refresh=True)["web"]["hosts"]) == ["web1"]
+    assert sources.errors
+
+
+def test_executable_yaml_is_static_file(tmp_path):
+    path = tmp_path / "inventory.yml"
+    path.write_text("web:\n  hosts:\n    web1:\n      ansible_connection: local\n")
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+
+    assert isinstance(inventory_source(str(path)), FileSource)
+    with ftl_automation.automation(inventory=str(path)) as ftl:
+        assert ftl.select("web") == ["web1"]
+        assert ftl.inventory_file == str(path)
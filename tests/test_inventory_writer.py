@@ -0,0 +1,63 @@
+import threading
+
+import yaml
+
+import ftl_automation
+from ftl_automation.inventory import load_inventory_file
+from ftl_automation.inventory_writer import InventoryWriter
+
+
+def test_parallel_additions_are_batched(tmp_path):
+    path = tmp_path / "inventory.yml"
+    path.write_text("all:\n  hosts:\n    existing: {}\n")
+    writer = InventoryWriter(str(path), delay=0.2, max_delay=5)
+
+    threads = [
+        threading.Thread(
+            target=writer.add_host,
+            args=(f"web{i:02d}", {"ansible_host": f"10.0.0.{i}"}, ["all", "web"]),
+        )
+        for i in range(50)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.close()
+
+    assert writer.flushes <= 2
+    inventory = yaml.safe_load(path.read_text())
+    assert len(inventory["all"]["hosts"]) == 51
+    assert inventory["web"]["hosts"]["web07"] == {"ansible_host": "10.0.0.7"}
+    # The compiled cache was refreshed with the write
+    assert load_inventory_file(str(path)) == inventory
+
+
+def test_writers_keep_each_others_changes(tmp_path):
+    path = tmp_path / "inventory.yml"
+    first = InventoryWriter(str(path))
+    second = InventoryWriter(str(path))
+    first.add_host("web1")
+    second.add_host("db1", groups=["db"])
+    second.update_group("db", backup_root="/backup")
+    first.close()
+    second.close()
+    first.remove_host("web1")
+    first.update_host("db1", db_name="orders")
+    first.close()
+
+    assert yaml.safe_load(path.read_text()) == {
+        "all": {"hosts": {}},
+        "db": {"hosts": {"db1": {"db_name": "orders"}}, "vars": {"backup_root": "/backup"}},
+    }
+
+
+def test_context_writes_back_inventory(tmp_path):
+    path = tmp_path / "inventory.yml"
+    with ftl_automation.automation(inventory=str(path)) as ftl:
+        ftl.add_host("web1", {"ansible_host": "10.0.0.1"}, groups=["web"])
+        assert ftl.select("web") == ["web1"]
+
+    assert yaml.safe_load(path.read_text()) == {
+        "web": {"hosts": {"web1": {"ansible_host": "10.0.0.1"}}}
+    }
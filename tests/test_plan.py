@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+import ftl_automation
+
+
+def test_plan_runs_independent_nodes_concurrently(fleet):
+    plan = fleet.plan()
+    a = plan.ping(data="a", sleep=0.5)
+    b = plan.ping(data="b", sleep=0.5)
+    c = plan.add("ping", data="c", after=[a, b])
+
+    start = time.perf_counter()
+    results = plan.run()
+    elapsed = time.perf_counter() - start
+
+    assert results[c]["web1"]["ping"] == "c"
+    assert c.started >= max(a.finished, b.finished)
+    assert elapsed < 1.5
+    assert plan.critical_path()[-1] is c
+
+
+def test_plan_pinned_hosts(fleet):
+    plan = fleet.plan()
+    first = plan.ping(data="first", hosts=["web1"])
+    other = plan.ping(data="other", hosts=["web2"])
+    second = plan.ping(data="second", hosts=["web1"])
+
+    results = plan.run()
+
+    assert second.after == [first]
+    assert other.after == []
+    assert list(results[second]) == ["web1"]
+
+
+def test_plan_skips_dependents_of_failures(fleet):
+    plan = fleet.plan()
+    bad = plan.ping(data="x", unknown=True)
+    skipped = plan.ping(after=[bad])
+    ok = plan.ping(data="ok")
+
+    with pytest.raises(ftl_automation.PlanError) as e:
+        plan.run()
+
+    assert e.value.failed == [bad]
+    assert e.value.skipped == [skipped]
+    assert ok.result["web1"]["ping"] == "ok"
+
+
+def test_plan_applies_tool_options():
+    from conftest import FLEET, MODULES, PingTool
+
+    with ftl_automation.automation(
+        inventory=FLEET, modules=[MODULES], tool_options={"ping": {"timeout": 0.2}}
+    ) as ftl:
+        ftl._tools_dict["ping"] = PingTool(ftl)
+        plan = ftl.plan()
+        slow = plan.ping(sleep=5)
+        fast = plan.add("ping", data="fast", after=[slow])
+
+        start = time.perf_counter()
+        results = plan.run()
+
+        assert time.perf_counter() - start < 2
+        assert results[slow]["web1"]["timed_out"]
+        assert results[fast]["web2"]["ping"] == "fast"
+
+
+def test_plan_run_on_event_loop_raises():
+    import asyncio
+
+    async def main():
+        async with ftl_automation.automation_async(inventory={}) as ftl:
+            plan = ftl.plan()
+            plan.debug_tool(message="never runs")
+            with pytest.raises(RuntimeError, match="await plan.run_async"):
+                plan.run()
+
+    asyncio.run(main())
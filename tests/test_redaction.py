@@ -0,0 +1,46 @@
+import io
+
+import ftl_automation
+from ftl_automation.redaction import MASK, Redactor
+
+
+def test_redactor():
+    redactor = Redactor(["hunter2", "hunter22", "s3cr3t-token", "x", None])
+    assert redactor.redact("pw=hunter22 pw=hunter2, token s3cr3t-token.") == (
+        f"pw={MASK} pw={MASK}, token {MASK}."
+    )
+    # Too short to mask
+    assert redactor.redact("x marks the spot") == "x marks the spot"
+    assert redactor.redact_data({"stdout": ["hunter2"], "rc": 0, "pair": ("a", "hunter2")}) == {
+        "stdout": [MASK], "rc": 0, "pair": ("a", MASK),
+    }
+    assert not Redactor([])
+    assert Redactor([]).redact("hunter2") == "hunter2"
+
+
+def test_redactor_many_secrets():
+    secrets = [f"token-{i:04d}-{'abcdef'[i % 6]}" for i in range(500)] + ["a.b*c", "(paren)"]
+    redactor = Redactor(secrets)
+    text = " ".join(secrets) + " token-9999-z a.bbc"
+    assert redactor.redact(text) == " ".join([MASK] * len(secrets)) + " token-9999-z a.bbc"
+
+
+def test_print_masks_secrets(monkeypatch):
+    from rich.console import Console
+
+    monkeypatch.setenv("DB_PASSWORD", "hunter2")
+    output = io.StringIO()
+    with ftl_automation.automation(
+        inventory={}, secrets=["DB_PASSWORD"], console=Console(file=output)
+    ) as ftl:
+        ftl.print("not yet looked up: hunter2")
+        password = ftl.secrets["DB_PASSWORD"]
+        ftl.print(f"Module execution result: {{'stdout': '{password}'}}")
+        ftl.print({"stdout": password})
+        ftl.debug_tool(f"connecting with {password}")
+        assert ftl.redact({"msg": password}) == {"msg": MASK}
+
+    lines = output.getvalue().splitlines()
+    assert "hunter2" in lines[0]
+    assert "hunter2" not in "\n".join(lines[1:])
+    assert MASK in lines[1]
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+import ftl_automation
+from conftest import FLEET, MODULES, PingTool
+from ftl_automation import RetryBudget, RetryPolicy
+
+
+def test_retry_policy_run():
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionResetError("reset")
+        return "ok"
+
+    policy = RetryPolicy(retries=3, backoff=0)
+    assert asyncio.run(policy.run(flaky)) == "ok"
+    assert len(calls) == 3
+
+    calls.clear()
+    with pytest.raises(ConnectionResetError):
+        asyncio.run(RetryPolicy(retries=1, backoff=0).run(flaky))
+    assert len(calls) == 2
+
+    async def broken():
+        raise ValueError("not transient")
+
+    with pytest.raises(ValueError):
+        asyncio.run(policy.run(broken))
+
+
+def test_retry_policy_delay():
+    policy = RetryPolicy(backoff=1.0, max_backoff=5.0, jitter=False)
+    assert [policy.delay(n) for n in range(4)] == [1.0, 2.0, 4.0, 5.0]
+    jittered = RetryPolicy(backoff=1.0, max_backoff=5.0)
+    assert all(0 <= jittered.delay(3) <= 5.0 for _ in range(20))
+
+
+def test_retry_budget():
+    budget = RetryBudget(ratio=0.5, min_retries=1)
+    assert budget.try_spend()
+    assert not budget.try_spend()
+    budget.record_attempt()
+    budget.record_attempt()
+    assert budget.try_spend()
+    assert not budget.try_spend()
+
+
+def test_retry_per_tool_with_budget():
+    results = []
+
+    def retry_on(result):
+        results.append(result)
+        return True
+
+    with ftl_automation.automation(
+        inventory=FLEET,
+        modules=[MODULES],
+        retry_budget=RetryBudget(ratio=0, min_retries=3),
+        tool_options={"ping": {"retry": RetryPolicy(retries=5, backoff=0, retry_on=retry_on)}},
+    ) as ftl:
+        ftl._tools_dict["ping"] = PingTool(ftl)
+        result = ftl.ping(data="x")
+        assert result["web1"]["ping"] == result["web2"]["ping"] == "x"
+        # Two first attempts plus the three retries the budget allows
+        assert len(results) == 5
+        assert ftl.retry_budget.retries == 3
+
+        results.clear()
+        with ftl.options(retry=None):
+            ftl.run_module("ping")
+        assert results == []
@@ -0,0 +1,67 @@
+import asyncio
+
+import ftl_automation
+from ftl_automation import Runtime, shared_runtime
+from conftest import INVENTORY, MODULES
+
+
+def test_contexts_share_runtime():
+    runtime = shared_runtime()
+    with ftl_automation.automation(inventory=INVENTORY, modules=[MODULES], runtime=runtime) as a:
+        with ftl_automation.automation(inventory={}, runtime=runtime) as b:
+            assert a.loop is b.loop
+            assert a.gate_cache is b.gate_cache
+        assert not runtime.closed
+        assert shared_runtime() is runtime
+        assert a.run_module("ping")["localhost"]["ping"] == "pong"
+
+    assert runtime.closed
+    assert not runtime.thread.is_alive()
+    assert shared_runtime() is not runtime
+    shared_runtime().acquire().release()
+
+
+def test_async_context_on_thread_runtime():
+    async def main(runtime):
+        async with ftl_automation.automation_async(
+            inventory=INVENTORY, modules=[MODULES], runtime=runtime
+        ) as ftl:
+            return await ftl.run_module_async("ping", data="bridged")
+
+    with Runtime() as runtime:
+        result = asyncio.run(main(runtime))
+        assert not runtime.closed
+    assert runtime.closed
+    assert result["localhost"]["ping"] == "bridged"
+
+
+def test_shared_pool_keys_gates_by_target(monkeypatch):
+    import faster_than_light.module
+    import faster_than_light.ssh
+    from faster_than_light.types import Gate
+
+    from test_gates import FakeConnection
+
+    connects = []
+
+    async def connect_gate(gate_builder, ssh_host, ssh_user, gate_cache, interpreter):
+        connects.append(ssh_host)
+        return Gate(FakeConnection(), ssh_host, "/tmp")
+
+    async def run_through_gate(gate_process, module, module_name, module_args):
+        return {"address": gate_process}
+
+    monkeypatch.setattr(faster_than_light.ssh, "connect_gate", connect_gate)
+    monkeypatch.setattr(faster_than_light.module, "run_module_through_gate", run_through_gate)
+
+    staging = {"all": {"hosts": {"web1": {"ansible_host": "10.0.0.1"}}}}
+    prod = {"all": {"hosts": {"web1": {"ansible_host": "10.0.1.1"}}}}
+    with Runtime() as runtime:
+        options = dict(modules=[MODULES], gate_cache_dir=False, runtime=runtime)
+        with ftl_automation.automation(inventory=staging, **options) as a:
+            with ftl_automation.automation(inventory=prod, **options) as b:
+                assert a.run_module("ping")["web1"]["address"] == "10.0.0.1"
+                assert b.run_module("ping")["web1"]["address"] == "10.0.1.1"
+                assert a.run_module("ping")["web1"]["address"] == "10.0.0.1"
+                assert b.run_module("ping")["web1"]["address"] == "10.0.1.1"
+    assert connects == ["10.0.0.1", "10.0.1.1"]
@@ -0,0 +1,85 @@
+import stat
+import sys
+import time
+
+import pytest
+
+import ftl_automation
+from ftl_automation import CommandProvider, EnvProvider, FileProvider, SecretError, Secrets
+from ftl_automation.secret_providers import encrypt_secrets_file
+
+
+def slow_command(tmp_path, delay=0.3):
+    log = tmp_path / "lookups"
+    script = tmp_path / "get-secret"
+    script.write_text(
+        "#!/bin/sh\n"
+        f"echo \"$1\" >> {log}\n"
+        f"sleep {delay}\n"
+        "case \"$1\" in missing) exit 1;; esac\n"
+        "echo \"value-of-$1\"\n"
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return f"{script} {{name}}", log
+
+
+def test_lazy_batched_lookup(tmp_path):
+    command, log = slow_command(tmp_path)
+    names = [f"token{i}" for i in range(20)] + ["missing"]
+    secrets = Secrets(names, [CommandProvider(command)])
+    assert not log.exists()
+
+    start = time.perf_counter()
+    assert secrets["token3"] == "value-of-token3"
+    # All 21 lookups ran concurrently, not in 21 x 0.3s
+    assert time.perf_counter() - start < 3
+    assert secrets["missing"] is None
+    assert dict(secrets)["token19"] == "value-of-token19"
+    assert len(log.read_text().split()) == 21
+
+    with pytest.raises(KeyError):
+        secrets["undeclared"]
+
+
+def test_provider_order_and_ttl(tmp_path, monkeypatch):
+    command, log = slow_command(tmp_path, delay=0)
+    monkeypatch.setenv("APP_TOKEN", "from-env")
+    secrets = Secrets(["TOKEN", "OTHER"], [EnvProvider("APP_"), CommandProvider(command)], ttl=0.05)
+    assert secrets["TOKEN"] == "from-env"
+    assert secrets["OTHER"] == "value-of-OTHER"
+    assert log.read_text().split() == ["OTHER"]
+
+    monkeypatch.setenv("APP_TOKEN", "rotated")
+    assert secrets["TOKEN"] == "from-env"
+    time.sleep(0.1)
+    assert secrets["TOKEN"] == "rotated"
+
+
+def test_encrypted_file(tmp_path, monkeypatch):
+    fernet = pytest.importorskip("cryptography.fernet")
+    key = fernet.Fernet.generate_key()
+    path = tmp_path / "secrets.enc"
+    encrypt_secrets_file(str(path), {"DB_PASSWORD": "hunter2"}, key)
+    assert b"hunter2" not in path.read_bytes()
+
+    monkeypatch.setenv("FTL_SECRETS_KEY", key.decode())
+    with ftl_automation.automation(
+        inventory={}, secrets=["DB_PASSWORD"], secret_providers=[FileProvider(str(path))]
+    ) as ftl:
+        assert ftl.secrets["DB_PASSWORD"] == "hunter2"
+
+
+def test_encrypted_file_without_cryptography(tmp_path, monkeypatch):
+    path = tmp_path / "secrets.enc"
+    path.write_bytes(b"not decrypted")
+    monkeypatch.setitem(sys.modules, "cryptography", None)
+    monkeypatch.setitem(sys.modules, "cryptography.fernet", None)
+    with pytest.raises(SecretError, match="pip install ftl-automation"):
+        FileProvider(str(path), key="unused").get("DB_PASSWORD")
+
+
+def test_environment_default(monkeypatch):
+    monkeypatch.setenv("LINODE_TOKEN", "abc")
+    with ftl_automation.automation(inventory={}, secrets=["LINODE_TOKEN", "UNSET_TOKEN"]) as ftl:
+        assert ftl.secrets["LINODE_TOKEN"] == "abc"
+        assert ftl.secrets.get("UNSET_TOKEN") is None
@@ -0,0 +1,123 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import ftl_automation
+from conftest import INVENTORY, MODULES, PingTool
+from test_gates import fake_gate
+from ftl_automation.core import discard_gate
+from ftl_automation.gates import KILL_SESSIONS, GatePool
+
+needs_proc = pytest.mark.skipif(not os.path.isdir("/proc"), reason="reads /proc")
+
+
+def running(pid):
+    """Whether a process exists and is not a zombie waiting to be reaped."""
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                if f.read().rsplit(")", 1)[1].split()[0] == "Z":
+                    return False
+        except FileNotFoundError:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def test_options_timeout(fleet):
+    start = time.perf_counter()
+    with fleet.options(timeout=0.3):
+        results = fleet.ping(sleep=5)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 2
+    assert set(results) == {"web1", "web2"}
+    for result in results.values():
+        assert result["failed"] and result["timed_out"]
+
+    # The context carries on after a timeout
+    assert fleet.ping(data="again")["web1"]["ping"] == "again"
+
+
+def test_tool_options_override_default():
+    with ftl_automation.automation(
+        inventory=INVENTORY, modules=[MODULES], timeout=0.3
+    ) as ftl:
+        ftl._tools_dict["ping"] = PingTool(ftl)
+        assert ftl.ping(sleep=1)["localhost"]["timed_out"]
+
+        slow = ftl.ping.options(timeout=5)
+        assert slow(sleep=1)["localhost"]["ping"] == "pong"
+        assert slow.submit(sleep=1).result()["localhost"]["ping"] == "pong"
+        assert slow.options(timeout=None)(data="x")["localhost"]["ping"] == "x"
+
+
+def test_discard_gate():
+    pool = GatePool(idle_timeout=None)
+    gate = pool["web1"] = fake_gate()
+    discard_gate(pool, "web1")
+    assert "web1" not in pool
+    assert gate.conn.aborted
+
+    cache = {"web1": fake_gate()}
+    gate = cache["web1"]
+    discard_gate(cache, "web1")
+    assert cache == {}
+    assert gate.conn.aborted
+
+
+def test_discard_gate_kills_remote_module():
+    async def main():
+        pool = GatePool(idle_timeout=None)
+        gate = pool["web1"] = fake_gate()
+        discard_gate(pool, "web1")
+        await pool.close()
+        assert gate.conn.commands == [KILL_SESSIONS]
+        assert gate.conn.aborted
+
+        gate = fake_gate()
+        discard_gate({"web1": gate}, "web1")
+        await asyncio.sleep(0.1)
+        assert gate.conn.commands == [KILL_SESSIONS]
+        assert gate.conn.aborted
+
+    asyncio.run(main())
+
+
+@needs_proc
+def test_timed_out_local_module_is_killed(tmp_path):
+    pidfile = tmp_path / "pid"
+    with ftl_automation.automation(inventory=INVENTORY, modules=[MODULES]) as ftl:
+        with ftl.options(timeout=1):
+            result = ftl.run_module("ping", sleep="30", pidfile=str(pidfile))
+        assert result["localhost"]["timed_out"]
+        assert not running(int(pidfile.read_text()))
+
+
+@needs_proc
+def test_kill_sessions_kills_other_sessions():
+    # Stands in for sshd, which runs each session of a connection in its
+    # own process group as a child of the connection's process
+    sshd = """
+import subprocess, sys
+gate = subprocess.Popen(
+    ["sh", "-c", "sleep 60 & echo $!; wait"],
+    stdout=subprocess.PIPE, text=True, start_new_session=True,
+)
+module = gate.stdout.readline().strip()
+subprocess.run(["sh", "-c", sys.argv[1]], start_new_session=True, check=True)
+gate.wait(timeout=5)
+print(gate.returncode, module)
+"""
+    output = subprocess.run(
+        [sys.executable, "-c", sshd, KILL_SESSIONS],
+        stdout=subprocess.PIPE, text=True, timeout=30, check=True,
+    ).stdout
+    returncode, module = output.split()
+    assert int(returncode) == -9
+    assert not running(int(module))
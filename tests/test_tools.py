@@ -0,0 +1,95 @@
+import sys
+
+import pytest
+
+import ftl_automation
+from conftest import INVENTORY, MODULES
+
+
+def test_tools_load_on_first_use():
+    sys.modules.pop("sample_tools.echo", None)
+    with ftl_automation.automation(
+        inventory=INVENTORY,
+        modules=[MODULES],
+        tools=["echo", "missing"],
+        tool_packages=["sample_tools"],
+    ) as ftl:
+        assert "sample_tools.echo" not in sys.modules
+        assert set(ftl.tools) >= {"echo", "missing", "complete"}
+
+        assert ftl.echo(data="lazy")["localhost"]["ping"] == "lazy"
+        assert "sample_tools.echo" in sys.modules
+        assert ftl.echo is ftl.tools.echo
+
+        assert "missing" not in ftl.tools
+        assert ftl.get_tool("missing") is None
+
+
+def test_tool_index(tmp_path, monkeypatch):
+    from ftl_automation import discovery
+    from ftl_automation.discovery import ToolIndex
+
+    path = str(tmp_path / "tools.json")
+    index = ToolIndex(path)
+    assert index.lookup("echo", ["sample_tools"]) == "sample_tools.echo:EchoTool"
+    assert index.lookup("nope", ["sample_tools", "not_a_package"]) is None
+
+    # A fresh process answers from the file without scanning or probing
+    def fail(*args):
+        raise AssertionError("index was rebuilt")
+
+    monkeypatch.setattr(discovery, "scan_package", fail)
+    monkeypatch.setattr(discovery, "probe_package", fail)
+    index = ToolIndex(path)
+    assert index.lookup("echo", ["sample_tools"]) == "sample_tools.echo:EchoTool"
+    assert index.lookup("nope", ["sample_tools"]) is None
+
+
+def test_tool_index_invalidated_by_package_change(tmp_path, monkeypatch):
+    from ftl_automation.discovery import ToolIndex
+
+    package = tmp_path / "pkg" / "extra_tools"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    monkeypatch.syspath_prepend(str(tmp_path / "pkg"))
+
+    path = str(tmp_path / "tools.json")
+    assert ToolIndex(path).lookup("greet", ["extra_tools"]) is None
+
+    (package / "greet.py").write_text("class Greet:\n    name = 'greet'\n")
+    assert ToolIndex(path).lookup("greet", ["extra_tools"]) == "extra_tools.greet:Greet"
+
+
+def test_tool_index_only_matches_module_of_tool_name(tmp_path, monkeypatch):
+    from ftl_automation.discovery import ToolIndex
+
+    package = tmp_path / "pkg" / "helper_tools"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (package / "helpers.py").write_text("class Greet:\n    name = 'greet'\n")
+    monkeypatch.syspath_prepend(str(tmp_path / "pkg"))
+
+    assert ToolIndex(str(tmp_path / "tools.json")).lookup("greet", ["helper_tools"]) is None
+
+
+def test_load_tool_reports_import_errors_in_tool_module(tmp_path, monkeypatch):
+    from ftl_automation.tools import ToolRegistry, load_tool
+
+    package = tmp_path / "pkg" / "broken_tools"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (package / "deploy.py").write_text(
+        "import not_installed_dependency\n\n"
+        "class Deploy:\n    name = 'deploy'\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path / "pkg"))
+
+    with pytest.raises(ImportError, match="not_installed_dependency"):
+        load_tool("deploy", None, ["broken_tools"])
+    assert load_tool("missing", None, ["broken_tools"]) is None
+
+    tools = ToolRegistry()
+    tools.register_by_name(["deploy"], None, ["broken_tools"])
+    for _ in range(2):
+        with pytest.raises(ImportError, match="not_installed_dependency"):
+            tools["deploy"]
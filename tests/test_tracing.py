@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+import ftl_automation
+from ftl_automation.tracing import STATUS_ERROR, STATUS_OK
+
+from conftest import FLEET, MODULES, PingTool
+
+
+class FailingTool(PingTool):
+    name = "failing"
+
+    def __call__(self, reason: str):
+        raise ValueError(reason)
+
+
+def test_trace_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("API_TOKEN", "s3cr3t-value")
+    path = tmp_path / "traces" / "run.jsonl"
+    with ftl_automation.automation(
+        inventory=FLEET, modules=[MODULES], trace=str(path), secrets=["API_TOKEN"]
+    ) as ftl:
+        ftl._tools_dict["ping"] = PingTool(ftl)
+        ftl._tools_dict["failing"] = FailingTool(ftl)
+        ftl.ping(data="pong")
+        with pytest.raises(ValueError):
+            ftl.failing(reason=f"bad token {ftl.secrets['API_TOKEN']}")
+        ftl.run_module("ping", data="direct")
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 1
+    request = json.loads(lines[0])
+    spans = request["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    by_id = {span["spanId"]: span for span in spans}
+    root, = [span for span in spans if "parentSpanId" not in span]
+    assert root["name"] == "automation"
+    assert {span["traceId"] for span in spans} == {root["traceId"]}
+
+    calls = [span for span in spans if span.get("parentSpanId") == root["spanId"]]
+    assert [span["name"] for span in calls] == ["ping", "failing", "ping"]
+    failed = calls[1]
+    assert failed["status"]["code"] == STATUS_ERROR
+    assert "s3cr3t-value" not in failed["status"]["message"]
+
+    hosts = [span for span in spans if by_id.get(span.get("parentSpanId")) in calls]
+    assert sorted(span["name"] for span in hosts) == ["ping web1", "ping web1", "ping web2", "ping web2"]
+    for span in hosts:
+        parent = by_id[span["parentSpanId"]]
+        assert parent["startTimeUnixNano"] <= span["startTimeUnixNano"]
+        assert int(span["endTimeUnixNano"]) <= int(parent["endTimeUnixNano"])
+        assert span["status"]["code"] == STATUS_OK
+    assert int(root["endTimeUnixNano"]) >= max(int(span["endTimeUnixNano"]) for span in spans)